@@ -1,9 +1,20 @@
-import re # Módulo para expressões regulares, usado para extrair informações das linhas do log.
 import pandas as pd # Biblioteca para manipulação e análise de dados, usada para criar DataFrames e exportar para Excel.
 from datetime import datetime # Módulo para trabalhar com datas e horas, usado para nomear o arquivo de saída.
-from time import sleep # Módulo para pausar a execução, usado para controlar o ritmo das requisições a APIs.
-import requests # Módulo para fazer requisições HTTP, usado para consultar as APIs de geolocalização.
 import os # Módulo para interagir com o sistema operacional, usado para verificar a existência do arquivo.
+import argparse # Módulo para ler as opções da linha de comando (ex.: --resume).
+import getpass # Senha da API do RouterOS, pedida no terminal quando não vem da variável de ambiente.
+import numpy as np # Arrays da leitura colunar (opção --colunar).
+from geolocalizacao import consultar_em_paralelo, configurar_cache, configurar_base_offline, resumo_latencias # Motor de consultas, cache e base offline de geolocalização.
+from sessoes_http import resumo_conexoes # Estatísticas de reaproveitamento das conexões HTTP com as APIs.
+from saude_provedores import resumo_saude # Estado do disjuntor, taxa de erro e latência de cada provedor.
+from enderecos import PAIS_ENDERECO_ESPECIAL, int_para_ip # Valor do campo País para endereços privados/reservados e conversão de IPs.
+from diario_consultas import DiarioConsultas # Diário em disco dos resultados, para retomar execuções interrompidas.
+from estado_incremental import EstadoExportacao, comparar_exportacoes # Estado da última exportação, para o modo incremental.
+from leitor_routeros import ler_registros, data_da_exportacao # Leitor em fluxo das linhas da exportação do Mikrotik e data em que ela foi gerada.
+from api_routeros import ClienteRouterOS, ler_enderecos # Leitura das listas direto do roteador pela API do RouterOS.
+from leitor_colunar import ler_exportacao_colunar, decodificar_timeouts # Leitura da exportação inteira em arrays NumPy e conversão dos timeouts em segundos.
+from registros import TabelaEntradas, coluna_categorica, colunas_geolocalizacao, EMAIL_NAO_DISPONIVEL # Entradas do relatório em colunas com valores codificados.
+from historico import HistoricoPortascan, ARQUIVO_HISTORICO_PADRAO # Histórico das execuções, para consultas de tendência sem abrir os relatórios.
 
 # --- Configurações Iniciais ---
 
@@ -12,183 +23,279 @@ import os # Módulo para interagir com o sistema operacional, usado para verific
 # ou forneça o caminho completo para ele.
 file_path = "portascan-list.txt"
 
+# Arquivo do cache persistente de geolocalização, compartilhado com os outros scripts.
+# IPs já consultados em execuções anteriores são lidos dele, sem nenhuma requisição HTTP.
+arquivo_cache = "geolocalizacao_cache.sqlite3"
+# Validade de cada resultado guardado no cache, em dias. Depois disso o IP é consultado de novo.
+ttl_cache_dias = 30
+# Enviar os IPs ao endpoint em lote do ip-api.com (100 IPs por requisição) antes da consulta individual.
+usar_lote_ip_api = True
+# Requisições de reforço (hedge): se uma API demorar mais que o seu p95 recente, a próxima API
+# da cadeia é consultada em paralelo e vale a primeira resposta válida. Reduz a latência de cauda
+# em listas longas, ao custo de requisições extras (até ~10% a mais, ver FRACAO_HEDGE em
+# geolocalizacao.py) na cota limitada do ipstack e do ip-api.com. Desativado por padrão.
+usar_hedge = False
+# Base de geolocalização offline (CSV com faixas de IP: inicio,fim,cidade,estado,pais,cep,provedor).
+# Deixe como None para usar apenas as APIs. Com "primaria", a base é consultada antes das APIs;
+# com "fallback", apenas os IPs que nenhuma API localizar são procurados nela.
+arquivo_base_offline = None # Ex.: "base_geolocalizacao.csv"
+posicao_base_offline = "primaria"
+
+# Opções da linha de comando. Com '--resume', os IPs já gravados no diário de uma execução
+# interrompida são reaproveitados e apenas os que faltam são consultados; '--descartar-diario'
+# começa do zero mesmo com um diário de uma execução interrompida.
+parser = argparse.ArgumentParser(description="Relatório de geolocalização da lista PORTASCAN exportada do Mikrotik.")
+parser.add_argument("--resume", action="store_true", help="retomar a execução anterior a partir do diário de consultas")
+parser.add_argument("--descartar-diario", action="store_true", help="descartar o diário de uma execução interrompida em vez de retomá-la")
+parser.add_argument("--diario", help="arquivo do diário de consultas (padrão: <arquivo de entrada>.diario.jsonl)")
+parser.add_argument("--incremental", action="store_true", help="consultar apenas as entradas novas desde a última exportação processada")
+parser.add_argument("--estado", help="arquivo de estado do modo incremental (padrão: <arquivo de entrada>.estado.json)")
+parser.add_argument("--colunar", action="store_true", help="ler a exportação em arrays NumPy e montar o relatório sem um objeto Python por entrada")
+# Com '--routeros', as entradas vêm direto do roteador pela API (porta 8728, ou 8729 com --tls),
+# sem exportar o arquivo e copiá-lo com o WinSCP. A senha vem da variável de ambiente ROUTEROS_SENHA
+# ou é pedida no terminal.
+parser.add_argument("--routeros", metavar="HOST", help="ler as address-lists pela API do RouterOS em vez do arquivo exportado")
+parser.add_argument("--usuario", default="admin", help="usuário da API do RouterOS (padrão: admin)")
+parser.add_argument("--porta", type=int, help="porta da API do RouterOS (padrão: 8728, ou 8729 com --tls)")
+parser.add_argument("--tls", action="store_true", help="usar o serviço api-ssl do RouterOS")
+# Abas de expiração: entradas que expiram nas próximas N horas e distribuição do tempo de bloqueio
+# restante, contados a partir de '--referencia' (padrão: o momento da execução).
+parser.add_argument("--expirando-horas", type=float, default=24, help="janela da aba de entradas expirando, em horas (padrão: 24)")
+parser.add_argument("--referencia", type=datetime.fromisoformat, help="data/hora de referência para o tempo restante (ex.: \"2025-01-31 12:00:00\")")
+# Cada execução acrescenta as entradas enriquecidas ao histórico, particionado pela data da exportação.
+parser.add_argument("--historico", default=ARQUIVO_HISTORICO_PADRAO, help=f"histórico das execuções (padrão: {ARQUIVO_HISTORICO_PADRAO})")
+parser.add_argument("--sem-historico", action="store_true", help="não gravar esta execução no histórico")
+argumentos = parser.parse_args()
+if argumentos.routeros and argumentos.colunar:
+    parser.error("--colunar lê o arquivo exportado e não pode ser usado com --routeros")
+if argumentos.resume and argumentos.descartar_diario:
+    parser.error("--resume e --descartar-diario não podem ser usados juntos")
+
+# Nome base dos arquivos auxiliares: o arquivo de entrada, ou o roteador quando a leitura é pela API.
+origem = f"routeros-{argumentos.routeros}" if argumentos.routeros else file_path
+# Diário (checkpoint) com cada IP localizado, gravado à medida que as consultas terminam.
+# É apagado depois que o relatório é salvo com sucesso.
+arquivo_diario = argumentos.diario or f"{origem}.diario.jsonl"
+# Estado da última exportação processada (entradas e resultados), usado pelo modo incremental.
+arquivo_estado = argumentos.estado or f"{origem}.estado.json"
+
 # Verificar se o arquivo de entrada existe antes de prosseguir com a leitura.
-if not os.path.exists(file_path):
+if not argumentos.routeros and not os.path.exists(file_path):
     print(f"Erro: O arquivo '{file_path}' não foi encontrado.")
     # Sair do script se o arquivo não for encontrado para evitar erros futuros.
     exit()
 
-# Expressão regular para extrair informações da linha de log do Mikrotik.
-# O padrão busca por:
-# 1. "PORTASCAN " (texto literal)
-# 2. ([\d\.]+) - Captura o endereço IP (grupo 1: um ou mais dígitos/pontos).
-# 3. \s+ - Um ou mais espaços em branco.
-# 4. (\d{4}-\d{2}-\d{2}) - Captura a data no formato AAAA-MM-DD (grupo 2).
-# 5. \s+ - Um ou mais espaços em branco.
-# 6. ([\d:]+) - Captura a hora no formato HH:MM:SS (grupo 3).
-# 7. (?:\s+([\d\w]+))? - Grupo não capturante (?:...) que significa que o conteúdo é opcional (?...).
-#    \s+ - Um ou mais espaços em branco.
-#    ([\d\w]+) - Captura o Timeout (grupo 4: um ou mais dígitos/letras), se presente.
-pattern = r"PORTASCAN\s+([\d\.]+)\s+(\d{4}-\d{2}-\d{2})\s+([\d:]+)(?:\s+([\d\w]+))?"
-
-# Lista para armazenar os dados de cada entrada de log após a extração.
-dados = []
+# Um diário com resultados é de uma execução interrompida: sem '--resume' ele seria truncado, e as
+# consultas já feitas, perdidas. É preciso escolher entre retomar e descartar.
+if not argumentos.resume and not argumentos.descartar_diario and DiarioConsultas(arquivo_diario).tem_resultados():
+    print(
+        f"Erro: O diário '{arquivo_diario}' tem resultados de uma execução interrompida. "
+        "Use --resume para retomá-la ou --descartar-diario para começar do zero."
+    )
+    raise SystemExit(1)
+
+# Entradas extraídas (IP, data, hora e timeout), guardadas em colunas: cada valor repetido é
+# guardado uma vez e cada entrada guarda só o código dele.
+entradas = TabelaEntradas()
+# IPs distintos do relatório, na ordem em que aparecem (ou em ordem numérica, na leitura colunar).
+ips_relatorio = []
+# Chave (lista, IP, CREATION-TIME) de cada entrada, comparada com a exportação anterior no modo incremental.
+chaves_atuais = set()
 
 # --- Leitura e Validação do Arquivo ---
 
-# Abrir o arquivo no modo de leitura ('r'). O 'with' garante que o arquivo seja fechado automaticamente.
-with open(file_path, "r") as arquivo:
-    # Iterar sobre cada linha do arquivo.
-    for linha in arquivo:
-        # Tentar encontrar o padrão da expressão regular na linha atual.
-        match = re.search(pattern, linha)
-        if match:
-            # Se houver correspondência, extrair os grupos capturados.
-            ip = match.group(1)
-            data = match.group(2)
-            hora = match.group(3)
-            # O timeout é opcional; se o grupo 4 não for encontrado, define como "Sem Timeout".
-            timeout = match.group(4) if match.group(4) else "Sem Timeout"
-            # Adicionar um dicionário com os dados extraídos à lista 'dados'.
-            # Inicializamos 'Provedor' e 'Email Provedor' com valores padrão.
-            dados.append({
-                "IP": ip,
-                "Data": data,
-                "Hora": hora,
-                "Timeout": timeout,
-                "Provedor": "Desconhecido", # Novo campo para o nome do provedor, inicializado.
-                "Email Provedor": "Não disponível via API de Geolocalização" # Novo campo para e-mail, com nota.
-            })
-        else:
-            # Se a linha não corresponder ao formato esperado, ela é ignorada e uma mensagem de aviso é impressa.
-            print(f"Linha ignorada (formato inválido): {linha.strip()}")
+# Linhas que não são entradas da lista (cabeçalho, comentários, formato inválido) são ignoradas com um aviso.
+def avisar_linha_ignorada(numero_linha, linha):
+    print(f"Linha ignorada (formato inválido): {linha.strip()}")
+
+# Entradas da API com algum campo inválido são ignoradas da mesma forma.
+def avisar_entrada_ignorada(numero, atributos):
+    print(f"Entrada ignorada (formato inválido): {atributos}")
+
+if argumentos.colunar:
+    # Leitura colunar: a exportação inteira vira arrays NumPy (IP uint32, prefixo uint8, criação
+    # datetime64 e código da lista). O filtro das listas PORTASCAN é uma máscara sobre os códigos,
+    # e só os IPs distintos são convertidos em texto para as consultas.
+    exportacao = ler_exportacao_colunar(file_path)
+    selecionadas = exportacao.mascara_listas(lambda nome: "PORTASCAN" in nome) & ~np.isnat(exportacao.criacao)
+    print(
+        f"Entradas ignoradas: {len(exportacao) - int(selecionadas.sum())} fora das listas PORTASCAN ou sem data, "
+        f"{exportacao.hosts} nomes de host, {exportacao.rejeitadas} linhas com formato inválido."
+    )
+    exportacao = exportacao.filtrar(selecionadas)
+    valores_ips, indices_ips = np.unique(exportacao.ips, return_inverse=True)
+    ips_relatorio = [int_para_ip(int(valor)) for valor in valores_ips]
+    # Chaves (lista, IP, CREATION-TIME) de todas as entradas, como no leitor em fluxo: elas são
+    # gravadas no estado ao final de toda execução, e não só das incrementais.
+    criacoes_texto = np.datetime_as_string(exportacao.criacao, unit="s")
+    chaves_atuais = {
+        (exportacao.listas[codigo], ips_relatorio[indice], criacao.replace("T", " "))
+        for codigo, indice, criacao in zip(exportacao.codigos_lista.tolist(), indices_ips.tolist(), criacoes_texto)
+    }
+else:
+    # O leitor percorre o arquivo em fluxo, uma linha por vez, e gera um registro por entrada
+    # (número, flags, lista, endereço/prefixo ou host, data, hora, timeout e comentário ';;;').
+    # Pela API, as respostas do '/ip/firewall/address-list/print' viram os mesmos registros.
+    # Apenas os endereços IP das listas PORTASCAN (ex.: PORTASCAN, API_PORTASCAN) com data de
+    # criação entram no relatório.
+    cliente = None
+    if argumentos.routeros:
+        senha = os.environ.get("ROUTEROS_SENHA")
+        if senha is None:
+            senha = getpass.getpass(f"Senha de {argumentos.usuario}@{argumentos.routeros}: ")
+        cliente = ClienteRouterOS(argumentos.routeros, argumentos.usuario, senha, argumentos.porta, argumentos.tls)
+        cliente.conectar()
+        registros = ler_enderecos(cliente, ao_ignorar=avisar_entrada_ignorada)
+    else:
+        registros = ler_registros(file_path, ao_ignorar=avisar_linha_ignorada)
+    for registro in registros:
+        if "PORTASCAN" not in registro.lista or registro.endereco is None or registro.data is None:
+            print(f"Entrada ignorada (lista {registro.lista}): {registro.host or f'{registro.endereco}/{registro.prefixo}'}")
+            continue
+        # O timeout é opcional; se não estiver presente, define como "Sem Timeout".
+        timeout = registro.timeout if registro.timeout else "Sem Timeout"
+        chaves_atuais.add((registro.lista, registro.endereco, f"{registro.data} {registro.hora}"))
+        # A geolocalização não é guardada por entrada: ela é ligada a cada IP distinto ao montar o DataFrame.
+        entradas.adicionar(registro.endereco, registro.data, registro.hora, timeout)
+    if cliente is not None:
+        cliente.fechar()
+    ips_relatorio = entradas.ips()
 
 # Verificar se algum dado válido foi encontrado e processado no arquivo.
-if not dados:
+if not ips_relatorio:
     print("Erro: Nenhum dado válido foi encontrado no arquivo.")
     # Sair do script se não houver dados para processar.
     exit()
 
-# --- Funções para Consultar Múltiplas APIs de Geolocalização ---
-
-# Função para consultar a API ipwhois.app (agora ipwhois.io).
-# Retorna Cidade, Estado, País, CEP e Provedor.
-def consultar_geolocalizacao_api1(ip):
-    try:
-        # Faz uma requisição GET para a API ipwhois.app com o IP fornecido.
-        # Define um timeout de 10 segundos para a requisição para evitar travamentos.
-        response = requests.get(f"https://ipwhois.app/json/{ip}", timeout=10)
-        # Verifica se a requisição foi bem-sucedida (código de status HTTP 200).
-        if response.status_code == 200:
-            # Converte a resposta JSON da API em um dicionário Python.
-            data = response.json()
-            # Retorna os campos relevantes, usando "Desconhecida" se o campo não existir.
-            # O campo 'isp' contém o nome do provedor.
-            return (
-                data.get("city", "Desconhecida"),
-                data.get("region", "Desconhecida"),
-                data.get("country", "Desconhecido"),
-                data.get("zip", "Desconhecido"),
-                data.get("isp", "Desconhecido"), # Extrai o nome do provedor (ISP)
-            )
-    except Exception as e:
-        # Em caso de qualquer erro (conexão, JSON inválido, etc.), imprime uma mensagem de erro.
-        print(f"Erro na API 1 (ipwhois.app) para {ip}: {e}")
-    # Retorna valores padrão "Desconhecido" para todos os campos em caso de falha.
-    return "Desconhecida", "Desconhecida", "Desconhecido", "Desconhecido", "Desconhecido"
-
-# Função para consultar a API ipstack.com.
-# Requer uma chave de API (access_key) para funcionar.
-def consultar_geolocalizacao_api2(ip):
-    try:
-        # ATENÇÃO: Substitua "SUA_CHAVE_DE_API" pela sua chave de API real do ipstack.com.
-        # Sem uma chave válida, esta API não funcionará corretamente ou retornará erros.
-        access_key = "SUA_CHAVE_DE_API" # <-- SUBSTITUA PELA SUA CHAVE DE API
-        # Faz uma requisição GET para a API ipstack.com.
-        response = requests.get(f"http://api.ipstack.com/{ip}?access_key={access_key}", timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            # ipstack pode ter o ISP em 'connection.isp' ou 'organization'. Tentamos ambos.
-            isp_name = data.get("connection", {}).get("isp", data.get("organization", "Desconhecido"))
-            return (
-                data.get("city", "Desconhecida"),
-                data.get("region_name", "Desconhecida"),
-                data.get("country_name", "Desconhecido"),
-                data.get("zip", "Desconhecido"),
-                isp_name,
-            )
-    except Exception as e:
-        print(f"Erro na API 2 (ipstack.com) para {ip}: {e}")
-    return "Desconhecida", "Desconhecida", "Desconhecido", "Desconhecido", "Desconhecido"
-
-# Função para consultar a API ip-api.com.
-# Esta API é geralmente gratuita para uso não comercial e não requer uma chave de API.
-def consultar_geolocalizacao_api3(ip):
-    try:
-        # Faz uma requisição GET para a API ip-api.com, solicitando explicitamente os campos necessários.
-        response = requests.get(f"http://ip-api.com/json/{ip}?fields=city,regionName,country,zip,isp,org", timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            # ip-api.com pode retornar o nome do provedor no campo 'isp' ou 'org'. Priorizamos 'isp'.
-            isp_name = data.get("isp", data.get("org", "Desconhecido"))
-            return (
-                data.get("city", "Desconhecida"),
-                data.get("regionName", "Desconhecida"),
-                data.get("country", "Desconhecido"),
-                data.get("zip", "Desconhecido"),
-                isp_name,
-            )
-    except Exception as e:
-        print(f"Erro na API 3 (ip-api.com) para {ip}: {e}")
-    return "Desconhecida", "Desconhecida", "Desconhecido", "Desconhecido", "Desconhecido"
-
-# Função principal para consultar geolocalização de um IP, tentando várias APIs em sequência.
-# Itera pelas funções de consulta até encontrar um resultado válido (onde o País não é "Desconhecido").
-def consultar_geolocalizacao(ip):
-    # Lista de funções de API a serem tentadas. A ordem pode ser ajustada conforme a preferência.
-    for consulta in [consultar_geolocalizacao_api1, consultar_geolocalizacao_api2, consultar_geolocalizacao_api3]:
-        # Tenta consultar a API e desempacota os resultados em variáveis.
-        cidade, estado, pais, cep, provedor = consulta(ip)
-        # Se o país não for "Desconhecido", consideramos que a consulta foi bem-sucedida para este IP.
-        if pais != "Desconhecido":
-            # Retorna os dados encontrados pela primeira API bem-sucedida.
-            return cidade, estado, pais, cep, provedor
-    # Se todas as APIs falharem em fornecer dados válidos para o país, retorna valores padrão.
-    return "Desconhecida", "Desconhecida", "Desconhecido", "Desconhecido", "Desconhecido"
-
 # --- Processamento dos IPs e Busca de Geolocalização ---
 
-# Iterar sobre cada entrada de IP na lista 'dados' para enriquecer com informações de geolocalização.
-# 'enumerate' é usado para obter o índice (idx) e o valor (entrada) de cada item.
-for idx, entrada in enumerate(dados, start=1):
-    ip = entrada["IP"]
-    # Imprimir o progresso do processamento.
-    print(f"Processando IP {idx}/{len(dados)}: {ip}")
-    # Chamar a função principal de geolocalização para o IP atual.
-    cidade, estado, pais, cep, provedor = consultar_geolocalizacao(ip)
-    # Atualizar o dicionário 'entrada' com as informações obtidas das APIs.
-    entrada["Cidade"] = cidade
-    entrada["Estado"] = estado
-    entrada["País"] = pais
-    entrada["CEP"] = cep
-    entrada["Provedor"] = provedor # Adiciona o nome do provedor
-    # 'Província' e 'Bairro' são mapeados para 'Estado' e 'Cidade' para compatibilidade ou granularidade.
-    entrada["Província"] = estado
-    entrada["Bairro"] = cidade if cidade != "Desconhecida" else "Desconhecido"
-    # Pausar a execução por 1 segundo entre as requisições. Isso é crucial para
-    # não exceder os limites de taxa de requisições impostos pelas APIs gratuitas/freemium.
-    sleep(1)
+# Retomar a partir do diário, se pedido: os IPs já localizados não são consultados de novo.
+diario = DiarioConsultas(arquivo_diario)
+resultados = diario.carregar() if argumentos.resume else {}
+if argumentos.resume:
+    print(f"Retomando execução: {len(resultados)} IPs recuperados do diário '{arquivo_diario}'.")
+
+# Modo incremental: compara as entradas com as da última exportação processada. Os IPs das
+# entradas que continuam na lista reaproveitam o resultado guardado no estado; apenas os das
+# entradas adicionadas (e os que antes não foram localizados) passam pelo motor de consultas.
+estado_exportacao = EstadoExportacao(arquivo_estado)
+if argumentos.incremental:
+    chaves_anteriores, resultados_anteriores = estado_exportacao.carregar()
+    adicionadas, removidas = comparar_exportacoes(chaves_anteriores, chaves_atuais)
+    ips_adicionados = {ip for _, ip, _ in adicionadas}
+    for _, ip, _ in chaves_atuais - adicionadas:
+        anterior = resultados_anteriores.get(ip)
+        if ip not in ips_adicionados and anterior is not None and anterior[2] != "Desconhecido":
+            resultados.setdefault(ip, anterior)
+    print(
+        f"Modo incremental: {len(adicionadas)} entradas adicionadas, {len(removidas)} removidas, "
+        f"{len(chaves_atuais) - len(adicionadas)} mantidas desde a última exportação."
+    )
+
+# Função chamada pelo motor de consultas a cada IP finalizado: grava o resultado no diário
+# (apenas IPs localizados, para que os demais sejam tentados de novo ao retomar) e imprime o progresso.
+def mostrar_progresso(ip, resultado, concluidos, total):
+    if resultado[2] != "Desconhecido":
+        diario.registrar(ip, resultado)
+    print(f"Processado IP {concluidos}/{total}: {ip} ({resultado[2]})")
+
+# Carregar a base offline, se configurada, e colocá-la na cadeia de provedores.
+if arquivo_base_offline:
+    base = configurar_base_offline(arquivo_base_offline, posicao=posicao_base_offline)
+    print(f"Base offline carregada: {len(base)} faixas de IP ({posicao_base_offline}).")
+
+# Ativar o cache em disco: IPs já conhecidos não chegam a fazer requisições HTTP.
+cache = configurar_cache(arquivo_cache, ttl=ttl_cache_dias * 24 * 60 * 60)
+
+# Consultar todos os IPs que ainda não estão no diário de forma concorrente. O módulo
+# 'geolocalizacao' mantém várias consultas em andamento ao mesmo tempo, respeitando o limite
+# de requisições simultâneas de cada provedor, e consulta cada IP repetido apenas uma vez.
+# O diário fica aberto durante as consultas e é fechado mesmo se elas forem interrompidas.
+with diario.abrir(continuar=argumentos.resume):
+    resultados.update(consultar_em_paralelo(
+        [ip for ip in ips_relatorio if ip not in resultados],
+        ao_concluir=mostrar_progresso,
+        usar_lote_api3=usar_lote_ip_api,
+        usar_hedge=usar_hedge,
+    ))
+
+# Endereços privados/reservados (ex.: listas "bogons" e "suporte") são classificados sem consulta às APIs.
+especiais = sum(1 for resultado in resultados.values() if resultado[2] == PAIS_ENDERECO_ESPECIAL)
+print(f"Endereços privados/reservados classificados localmente: {especiais}")
+
+# Exibir quantos IPs vieram do cache e quantos precisaram ser consultados nas APIs,
+# quantas requisições reaproveitaram conexões já abertas e a saúde de cada provedor.
+print(cache.resumo())
+print(resumo_latencias())
+print(resumo_conexoes())
+print(resumo_saude())
 
 # --- Criação do DataFrame e Geração de Relatórios ---
 
-# Criar um DataFrame do pandas a partir da lista de dicionários 'dados'.
-# Este DataFrame será a base para todos os relatórios.
-df = pd.DataFrame(dados)
+if argumentos.colunar:
+    # DataFrame montado direto dos arrays: os resultados são alinhados aos IPs distintos e
+    # expandidos para as entradas pelos índices de 'np.unique', sem um dicionário por entrada.
+    criacoes, indices_criacao = np.unique(exportacao.criacao, return_inverse=True)
+    textos_criacao = np.datetime_as_string(criacoes, unit="s")
+    timeouts, indices_timeout = np.unique(exportacao.timeouts, return_inverse=True)
+    df = pd.DataFrame({
+        "IP": pd.Categorical.from_codes(indices_ips, categories=ips_relatorio),
+        "Data": coluna_categorica([texto[:10] for texto in textos_criacao], indices_criacao),
+        "Hora": coluna_categorica([texto[11:] for texto in textos_criacao], indices_criacao),
+        "Timeout": coluna_categorica([timeout.decode() or "Sem Timeout" for timeout in timeouts], indices_timeout),
+        **colunas_geolocalizacao([resultados[ip] for ip in ips_relatorio], indices_ips),
+    }, copy=False)
+else:
+    # DataFrame montado das colunas codificadas das entradas: a geolocalização de cada IP distinto
+    # é expandida para as entradas pelos códigos do IP. Este DataFrame é a base de todos os relatórios.
+    df = entradas.dataframe(resultados)
+
+# --- Timeouts e Expiração ---
+
+# Timeout de cada entrada em segundos e data de expiração (CREATION-TIME + timeout), calculados
+# sobre as colunas inteiras: cada texto de timeout distinto é decodificado uma vez e expandido
+# para as entradas pelos códigos do 'factorize'. Entradas sem timeout ficam sem expiração.
+referencia = pd.Timestamp(argumentos.referencia or datetime.now()).floor("s")
+codigos_timeout, textos_timeout = pd.factorize(df["Timeout"])
+segundos_timeout = decodificar_timeouts(np.asarray(textos_timeout, dtype=str))[codigos_timeout]
+criacao = pd.to_datetime(df["Data"].astype(str) + " " + df["Hora"].astype(str), format="%Y-%m-%d %H:%M:%S")
+sem_timeout = segundos_timeout < 0
+expiracao = criacao + pd.to_timedelta(np.where(sem_timeout, 0, segundos_timeout), unit="s")
+expiracao = expiracao.mask(sem_timeout)
+restante_horas = ((expiracao - referencia).dt.total_seconds() / 3600).clip(lower=0).round(2)
+df["Timeout (s)"] = pd.array(np.where(sem_timeout, 0, segundos_timeout), dtype="Int64")
+df.loc[sem_timeout, "Timeout (s)"] = pd.NA
+df["Expira em"] = expiracao
+df["Bloqueio Restante (h)"] = restante_horas
+
+# Entradas que expiram nas próximas N horas, da mais próxima para a mais distante.
+limite_expiracao = referencia + pd.Timedelta(hours=argumentos.expirando_horas)
+expirando = (
+    df.loc[(expiracao >= referencia) & (expiracao < limite_expiracao),
+           ["IP", "Data", "Hora", "Timeout", "Expira em", "Bloqueio Restante (h)", "País", "Provedor"]]
+    .sort_values("Expira em", kind="stable")
+)
+
+# Distribuição do tempo de bloqueio restante em faixas (entradas já expiradas e sem timeout à parte).
+faixas_restante = pd.cut(
+    restante_horas,
+    bins=[-np.inf, 0, 1, 6, 24, 7 * 24, 30 * 24, np.inf],
+    labels=["Expirado", "Até 1 hora", "1 a 6 horas", "6 a 24 horas", "1 a 7 dias", "7 a 30 dias", "Mais de 30 dias"],
+)
+tempo_restante = (
+    faixas_restante.cat.add_categories("Sem Timeout").fillna("Sem Timeout")
+    .value_counts(sort=False)
+    .rename_axis("Bloqueio Restante")
+    .reset_index(name="Quantidade")
+    .assign(Percentual=lambda x: (x["Quantidade"] / len(df)) * 100)
+)
 
+# Nos agrupamentos, 'observed=True' mantém apenas as combinações que existem nos dados
+# (com as colunas categóricas, o padrão seria gerar todas as combinações).
 # Resumo por País: Agrupa os dados por 'País' e calcula a quantidade de IPs,
 # o número de estados únicos e o número de cidades únicas em cada país.
 resumo_pais = (
-    df.groupby("País")
+    df.groupby("País", observed=True)
     .agg(
         Quantidade=("País", "size"), # Conta o número de ocorrências de cada país.
         Estados_Uniquos=("Estado", lambda x: len(set(x))), # Conta estados únicos dentro de cada país.
@@ -199,14 +306,14 @@ resumo_pais = (
 
 # Estados por País: Agrupa os dados por 'País' e 'Estado' e conta a quantidade de IPs em cada estado.
 estados_por_pais = (
-    df.groupby(["País", "Estado"])
+    df.groupby(["País", "Estado"], observed=True)
     .agg(Quantidade=("Estado", "size")) # Conta o número de IPs para cada combinação de País e Estado.
     .reset_index()
 )
 
 # Bairros por Estado e País: Agrupa os dados por 'País', 'Estado' e 'Bairro' e conta a quantidade de IPs.
 bairros_por_estado_pais = (
-    df.groupby(["País", "Estado", "Bairro"])
+    df.groupby(["País", "Estado", "Bairro"], observed=True)
     .agg(Quantidade=("Bairro", "size")) # Conta o número de IPs para cada combinação de País, Estado e Bairro.
     .reset_index()
 )
@@ -214,11 +321,11 @@ bairros_por_estado_pais = (
 # NOVO: Resumo por Provedor: Agrupa os dados por 'Provedor' e conta a quantidade de IPs.
 # Também tenta listar e-mails únicos, embora a maioria será "Não disponível..."
 resumo_provedor = (
-    df.groupby("Provedor")
+    df.groupby("Provedor", observed=True)
     .agg(
         Quantidade=("Provedor", "size"), # Conta o número de IPs para cada provedor.
         # Coleta e-mails únicos, filtrando os valores padrão de "Não disponível...".
-        Emails_de_Contato=("Email Provedor", lambda x: ", ".join(sorted(set(e for e in x if e != "Não disponível via API de Geolocalização" and e != "Desconhecido"))))
+        Emails_de_Contato=("Email Provedor", lambda x: ", ".join(sorted(set(e for e in x if e != EMAIL_NAO_DISPONIVEL and e != "Desconhecido"))))
     )
     .reset_index()
 )
@@ -231,7 +338,7 @@ total_ips = len(df)
 
 # Porcentagem por País: Calcula o percentual de IPs para cada país em relação ao total.
 porcentagem_pais = (
-    df.groupby("País")
+    df.groupby("País", observed=True)
     .agg(Quantidade=("País", "size"))
     .assign(Percentual=lambda x: (x["Quantidade"] / total_ips) * 100) # Adiciona uma nova coluna 'Percentual'.
     .reset_index()
@@ -239,7 +346,7 @@ porcentagem_pais = (
 
 # Porcentagem por Estado: Calcula o percentual de IPs para cada estado em relação ao total.
 porcentagem_estado = (
-    df.groupby(["País", "Estado"])
+    df.groupby(["País", "Estado"], observed=True)
     .agg(Quantidade=("Estado", "size"))
     .assign(Percentual=lambda x: (x["Quantidade"] / total_ips) * 100)
     .reset_index()
@@ -247,7 +354,7 @@ porcentagem_estado = (
 
 # NOVO: Porcentagem por Provedor: Calcula o percentual de IPs para cada provedor em relação ao total.
 porcentagem_provedor = (
-    df.groupby("Provedor")
+    df.groupby("Provedor", observed=True)
     .agg(Quantidade=("Provedor", "size"))
     .assign(Percentual=lambda x: (x["Quantidade"] / total_ips) * 100)
     .reset_index()
@@ -260,7 +367,7 @@ localizacao_resumo = {
     "Coluna": colunas,
     "Localizados (%)": [
         # Calcula a porcentagem de IPs onde o valor do campo NÃO é "Desconhecida" ou "Não disponível...".
-        100 - ((df[coluna].isin(["Desconhecida", "Não disponível via API de Geolocalização"])).sum() / total_ips * 100) for coluna in colunas
+        100 - ((df[coluna].isin(["Desconhecida", EMAIL_NAO_DISPONIVEL])).sum() / total_ips * 100) for coluna in colunas
     ],
 }
 df_localizacao_resumo = pd.DataFrame(localizacao_resumo)
@@ -283,8 +390,22 @@ with pd.ExcelWriter(arquivo_saida, engine="openpyxl") as writer:
     porcentagem_estado.to_excel(writer, sheet_name="Porcentagem por Estado", index=False) # Percentual de IPs por estado.
     porcentagem_provedor.to_excel(writer, sheet_name="Porcentagem por Provedor", index=False) # NOVO: Percentual de IPs por provedor.
     df_localizacao_resumo.to_excel(writer, sheet_name="Resumo de Localização", index=False) # Resumo da completude dos dados de localização.
+    expirando.to_excel(writer, sheet_name=f"Expirando em {argumentos.expirando_horas:g}h", index=False) # Entradas que expiram na janela pedida.
+    tempo_restante.to_excel(writer, sheet_name="Tempo de Bloqueio Restante", index=False) # Distribuição do tempo restante de bloqueio.
 
 print(f"Relatório salvo com sucesso em: {arquivo_saida}")
+# Com o relatório salvo, o diário da execução não é mais necessário.
+diario.concluir()
+# Guardar o estado desta exportação para que a próxima execução incremental consulte só as novidades.
+estado_exportacao.salvar(chaves_atuais, {ip: resultados[ip] for ip in ips_relatorio})
+# Acrescentar as entradas enriquecidas ao histórico, com a data em que a exportação foi gerada
+# (linha "# ... by RouterOS" do arquivo; pela API, ou sem essa linha, o momento da execução).
+if not argumentos.sem_historico:
+    exportado_em = (None if argumentos.routeros else data_da_exportacao(file_path)) or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    historico = HistoricoPortascan(argumentos.historico)
+    execucao = historico.acrescentar_dataframe(exportado_em, df, origem=origem, script="10G.py")
+    historico.fechar()
+    print(f"Histórico: {len(df)} entradas da exportação de {exportado_em} gravadas em '{argumentos.historico}' (execução {execucao}).")
 print("\n--- Informação Importante sobre 'Email Provedor' ---")
 print("As APIs de geolocalização gratuitas/freemium utilizadas neste script (ipwhois.app, ipstack.com, ip-api.com) geralmente não fornecem o e-mail de contato do provedor (comumente chamado de 'abuse contact').")
 print("Essa informação é tipicamente obtida através de consultas WHOIS, que são um processo diferente do lookup de geolocalização.")
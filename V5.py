@@ -1,10 +1,11 @@
 import re
 import pandas as pd
 from datetime import datetime
-from time import sleep
-import requests
 import os
-from openpyxl import Workbook, load_workbook
+from cache_geolocalizacao import CacheGeolocalizacao
+from saude_provedores import provedor_disponivel, resumo_saude
+from geolocalizacao import consultar_geolocalizacao_api1, consultar_geolocalizacao_api2, consultar_geolocalizacao_api3
+from openpyxl import load_workbook
 from openpyxl.styles import Alignment, PatternFill, Font
 from openpyxl.utils import get_column_letter
 
@@ -56,79 +57,35 @@ if not dados:
     print("Erro: Nenhum dado válido foi encontrado no arquivo.")
     exit()
 
-# Funções para consultar múltiplas APIs
-def consultar_geolocalizacao_api1(ip):
-    try:
-        response = requests.get(f"https://ipwhois.app/json/{ip}", timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            return (
-                data.get("city", "Desconhecida"),
-                data.get("region", "Desconhecida"),
-                data.get("country", "Desconhecido"),
-                data.get("zip", "Desconhecido"),
-            )
-    except Exception as e:
-        print(f"Erro na API 1 para {ip}: {e}")
-    return "Desconhecida", "Desconhecida", "Desconhecido", "Desconhecido"
+# Cadeia de APIs, com o nome de cada uma no disjuntor (ver saude_provedores.py). As consultas são as
+# de geolocalizacao.py, que já tratam o "success": false do ipstack como falha do provedor.
+# Nenhum teste é feito na inicialização: uma API que começar a falhar é retirada
+# da cadeia automaticamente e testada de novo depois de algum tempo.
+apis = [
+    (consultar_geolocalizacao_api1, "api1"),
+    (consultar_geolocalizacao_api2, "api2"),
+    (consultar_geolocalizacao_api3, "api3"),
+]
 
-def consultar_geolocalizacao_api2(ip):
-    try:
-        access_key = "SUA_CHAVE_DE_API"
-        response = requests.get(f"http://api.ipstack.com/{ip}?access_key={access_key}", timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            return (
-                data.get("city", "Desconhecida"),
-                data.get("region_name", "Desconhecida"),
-                data.get("country_name", "Desconhecido"),
-                data.get("zip", "Desconhecido"),
-            )
-    except Exception as e:
-        print(f"Erro na API 2 para {ip}: {e}")
-    return "Desconhecida", "Desconhecida", "Desconhecido", "Desconhecido"
-
-def consultar_geolocalizacao_api3(ip):
-    try:
-        response = requests.get(f"http://ip-api.com/json/{ip}?fields=city,regionName,country,zip", timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            return (
-                data.get("city", "Desconhecida"),
-                data.get("regionName", "Desconhecida"),
-                data.get("country", "Desconhecido"),
-                data.get("zip", "Desconhecido"),
-            )
-    except Exception as e:
-        print(f"Erro na API 3 para {ip}: {e}")
-    return "Desconhecida", "Desconhecida", "Desconhecido", "Desconhecido"
-
-def testar_disponibilidade_apis():
-    apis_disponiveis = []
-    test_ips = ["8.8.8.8"]  # IP de teste
-
-    for api_func in [consultar_geolocalizacao_api1, consultar_geolocalizacao_api2, consultar_geolocalizacao_api3]:
-        try:
-            cidade, estado, pais, cep = api_func(test_ips[0])
-            if pais != "Desconhecido":
-                apis_disponiveis.append(api_func)
-        except Exception as e:
-            print(f"API indisponível: {api_func.__name__}, erro: {e}")
-
-    return apis_disponiveis
-
-# Atualiza a função de consulta para usar somente APIs disponíveis
-apis_disponiveis = testar_disponibilidade_apis()
-if not apis_disponiveis:
-    print("Erro: Nenhuma API está disponível para consulta. Verifique sua conexão ou as APIs configuradas.")
-    exit()
+# Cache persistente compartilhado com os demais scripts (ver cache_geolocalizacao.py)
+cache = CacheGeolocalizacao()
 
 def consultar_geolocalizacao(ip):
-    for consulta in apis_disponiveis:
-        cidade, estado, pais, cep = consulta(ip)
+    # Consultar primeiro o cache em disco; as APIs só são chamadas quando o IP não está nele
+    em_cache = cache.obter(ip)
+    if em_cache is not None:
+        return em_cache[:4]
+    resultado = "Desconhecida", "Desconhecida", "Desconhecido", "Desconhecido"
+    for consulta, nome in apis:
+        if not provedor_disponivel(nome):
+            continue
+        cidade, estado, pais, cep, provedor = consulta(ip)
         if pais != "Desconhecido":
-            return cidade, estado, pais, cep
-    return "Desconhecida", "Desconhecida", "Desconhecido", "Desconhecido"
+            resultado = cidade, estado, pais, cep
+            # O provedor (ISP) não entra no relatório deste script, mas fica guardado no cache
+            cache.gravar(ip, resultado + (provedor,))
+            break
+    return resultado
 
 # Processar IPs e buscar geolocalização
 for entrada in dados:
@@ -141,7 +98,9 @@ for entrada in dados:
     entrada["CEP"] = cep
     entrada["Província"] = estado
     entrada["Bairro"] = cidade if cidade != "Desconhecida" else "Desconhecido"
-    sleep(1)
+
+print(cache.resumo())
+print(resumo_saude())
 
 # Criar um DataFrame do pandas
 df = pd.DataFrame(dados)
@@ -0,0 +1,264 @@
+import argparse  # Opções da linha de comando (fonte do log, tamanho do lote, intervalo do resumo).
+import os  # Detecção de rotação/truncamento do arquivo de log acompanhado.
+import queue  # Fila limitada entre a thread que lê o log e o laço que consulta a geolocalização.
+import re  # Extração da lista e do IP de origem de cada linha de log.
+import socket  # Recepção do syslog remoto do roteador (UDP).
+import threading  # A leitura do log roda em uma thread separada.
+import time  # Espera dos lotes, intervalo dos resumos e latência de cada entrada.
+from collections import (  # Contadores, IPs recentes (LRU) e janela de latências.
+    Counter,
+    OrderedDict,
+    deque,
+)
+from datetime import datetime  # Data/hora das entradas quando o log não traz o ano.
+
+from geolocalizacao import (  # Mesmo motor de consultas do 10G.py.
+    RESULTADO_DESCONHECIDO,
+    configurar_cache,
+    consultar_em_paralelo,
+    resumo_latencias,
+)
+from leitor_routeros import (  # Mesmo registro das leituras em lote.
+    _PADRAO_IPV4,
+    MESES,
+    RegistroEndereco,
+)
+
+# --- Acompanhamento ao Vivo da Lista PORTASCAN ---
+
+# Linha de log de uma regra de firewall com log=yes e log-prefix com o nome da lista, como a regra
+# que adiciona o IP à PORTASCAN (action=add-src-to-address-list). Exemplo, recebido por syslog:
+#   <134>Dec 30 21:50:21 192.168.88.1 firewall,info PORTASCAN input: in:ether1 out:(unknown 0),
+#   src-mac 00:11:22:33:44:55, proto TCP (SYN), 198.51.100.7:54321->192.168.88.1:22, len 44
+# A lista é a primeira palavra que contém o marcador; o IP é a origem da conexão ("IP:porta->").
+_PADRAO_ORIGEM = re.compile(r"((?:\d{1,3}\.){3}\d{1,3})(?::\d+)?->")
+_PADRAO_DATA_SYSLOG = re.compile(r"^(?:<\d+>)?([A-Za-z]{3}) +(\d{1,2}) (\d\d:\d\d:\d\d)")
+
+# Monta um RegistroEndereco, no mesmo formato das leituras em lote, a partir de uma linha de log.
+# Retorna None se a linha não for de uma lista com o 'marcador' ou não tiver um IP de origem válido.
+# O syslog não informa o ano: a data usa o ano atual (ou o anterior, se ficaria no futuro).
+def registro_do_log(linha, numero_linha, marcador="PORTASCAN", agora=None):
+    if marcador not in linha:
+        return None
+    lista = next((palavra for palavra in linha.split() if marcador in palavra), None)
+    origem = _PADRAO_ORIGEM.search(linha)
+    if lista is None or origem is None or not _PADRAO_IPV4.fullmatch(origem.group(1)):
+        return None
+    lista = lista.strip(":,")
+    agora = agora or datetime.now()
+    data, hora = agora.strftime("%Y-%m-%d"), agora.strftime("%H:%M:%S")
+    carimbo = _PADRAO_DATA_SYSLOG.match(linha)
+    if carimbo and carimbo.group(1).lower() in MESES:
+        mes, dia = MESES[carimbo.group(1).lower()], int(carimbo.group(2))
+        ano = agora.year - (1 if (mes, dia) > (f"{agora.month:02d}", agora.day) else 0)
+        data, hora = f"{ano}-{mes}-{dia:02d}", carimbo.group(3)
+    return RegistroEndereco(numero_linha, numero_linha, "D", lista, origem.group(1), 32, None, data, hora, None, None)
+
+# --- Fontes do Log ---
+
+# Falha na leitura da fonte do log (arquivo, syslog), levantada pelo laço principal.
+class ErroLeituraFonte(Exception):
+    pass
+
+# Acompanha um arquivo de log que cresce (como 'tail -F'): começa pelo fim do arquivo, a menos que
+# 'do_inicio=True', e reabre o arquivo do começo quando ele é rotacionado ou truncado.
+def seguir_arquivo(caminho, do_inicio=False, intervalo=0.2):
+    while True:
+        with open(caminho, "r", encoding="utf-8", errors="replace") as arquivo:
+            if not do_inicio:
+                arquivo.seek(0, os.SEEK_END)
+            # Depois de uma rotação, o arquivo novo é lido desde o começo.
+            do_inicio = True
+            pendente = ""
+            while True:
+                trecho = arquivo.readline()
+                if trecho:
+                    pendente += trecho
+                    if pendente.endswith("\n"):
+                        yield pendente
+                        pendente = ""
+                    continue
+                time.sleep(intervalo)
+                try:
+                    estado = os.stat(caminho)
+                except FileNotFoundError:
+                    continue
+                if estado.st_ino != os.fstat(arquivo.fileno()).st_ino or estado.st_size < arquivo.tell():
+                    break
+
+# Recebe as mensagens de syslog (UDP) enviadas pelo roteador (/system logging action, target=remote).
+def receber_syslog(endereco="0.0.0.0", porta=514):
+    conexao = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    conexao.bind((endereco, porta))
+    try:
+        while True:
+            dados, _ = conexao.recvfrom(65535)
+            yield from dados.decode("utf-8", errors="replace").splitlines()
+    finally:
+        conexao.close()
+
+# --- Contadores em Memória ---
+
+# Contadores por país e por provedor, atualizados a cada lote. A memória fica limitada: os
+# contadores crescem com a quantidade de países/provedores, os IPs recentes ficam em uma janela
+# LRU de 'limite_ips' entradas e as latências nas últimas 'limite_latencias' medições.
+class ContadoresAoVivo:
+    def __init__(self, limite_ips=100_000, limite_latencias=10_000):
+        self.paises = Counter()
+        self.provedores = Counter()
+        self.entradas = 0
+        self.repetidas = 0
+        self.limite_ips = limite_ips
+        self.recentes = OrderedDict() # ip -> resultado, do mais antigo para o mais recente
+        self.latencias = deque(maxlen=limite_latencias)
+
+    # Resultado de um IP visto recentemente, ou None. Um IP repetido volta para o fim da janela.
+    def resultado_recente(self, ip):
+        resultado = self.recentes.get(ip)
+        if resultado is not None:
+            self.recentes.move_to_end(ip)
+        return resultado
+
+    # Conta uma entrada já enriquecida. Cada IP conta uma vez enquanto estiver na janela de recentes;
+    # novas linhas do mesmo IP (vários pacotes do mesmo scanner) contam como repetidas.
+    def contar(self, ip, resultado, chegada):
+        self.latencias.append(time.monotonic() - chegada)
+        if ip in self.recentes:
+            self.repetidas += 1
+            self.recentes.move_to_end(ip)
+            return False
+        self.recentes[ip] = resultado
+        if len(self.recentes) > self.limite_ips:
+            self.recentes.popitem(last=False)
+        self.entradas += 1
+        self.paises[resultado[2]] += 1
+        self.provedores[resultado[4]] += 1
+        return True
+
+    def resumo(self, quantidade=10):
+        linhas = [f"--- {datetime.now():%Y-%m-%d %H:%M:%S}: {self.entradas} IPs novos, {self.repetidas} repetidos ---"]
+        if self.latencias:
+            ordenadas = sorted(self.latencias)
+            p50 = ordenadas[len(ordenadas) // 2]
+            p95 = ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * 0.95))]
+            linhas.append(f"Latência do log até a contagem: p50 {p50:.2f} s, p95 {p95:.2f} s")
+        linhas.append("Países: " + ", ".join(f"{pais} ({total})" for pais, total in self.paises.most_common(quantidade)))
+        linhas.append("Provedores: " + ", ".join(f"{provedor} ({total})" for provedor, total in self.provedores.most_common(quantidade)))
+        return "\n".join(linhas)
+
+# --- Laço Principal ---
+
+# Lê as linhas da 'fonte' em uma thread e as envia em micro-lotes ao motor de consultas: um lote
+# é fechado com 'tamanho_lote' IPs ou 'espera_lote' segundos depois da primeira entrada, o que
+# vier primeiro. IPs da janela de recentes não são consultados de novo. 'ao_contar(registro,
+# resultado, novo)' é chamado para cada entrada enriquecida; o resumo é impresso a cada
+# 'intervalo_resumo' segundos. Com 'duracao', para depois desse tempo (em segundos). Se a leitura
+# da fonte falhar, o lote pendente é processado e ErroLeituraFonte é levantado; se a fonte
+# terminar, o acompanhamento termina também.
+def acompanhar(fonte, marcador="PORTASCAN", contadores=None, tamanho_lote=50, espera_lote=1.0,
+               intervalo_resumo=30.0, duracao=None, ao_contar=None, usar_lote_api3=True, usar_hedge=False):
+    contadores = contadores or ContadoresAoVivo()
+    # Fila limitada: se as consultas ficarem para trás, a leitura do log espera em vez de acumular memória.
+    fila = queue.Queue(maxsize=10 * tamanho_lote)
+
+    # O fim da fonte chega ao laço principal como (None, erro), com erro None se a fonte terminou.
+    # Erros de leitura (OSError, inclusive os do socket) e de decodificação (ValueError) são
+    # repassados; qualquer outro erro é mostrado pela thread e chega como uma interrupção da leitura.
+    def ler_fonte():
+        erro = ErroLeituraFonte("leitura interrompida por um erro inesperado")
+        try:
+            for numero_linha, linha in enumerate(fonte, start=1):
+                registro = registro_do_log(linha, numero_linha, marcador)
+                if registro is not None:
+                    fila.put((registro, time.monotonic()))
+            erro = None
+        except (OSError, ValueError) as excecao:
+            erro = excecao
+        finally:
+            fila.put((None, erro))
+
+    threading.Thread(target=ler_fonte, daemon=True).start()
+    fim = time.monotonic() + duracao if duracao else None
+    proximo_resumo = time.monotonic() + intervalo_resumo
+    lote = []
+    fonte_encerrada, erro_fonte = False, None
+    while not fonte_encerrada and (fim is None or time.monotonic() < fim):
+        # Espera a próxima entrada até o prazo do lote (ou do resumo, ou do fim) vencer.
+        prazos = [proximo_resumo] + ([lote[0][1] + espera_lote] if lote else []) + ([fim] if fim else [])
+        try:
+            registro, chegada = fila.get(timeout=max(0.0, min(prazos) - time.monotonic()))
+            if registro is None:
+                fonte_encerrada, erro_fonte = True, chegada
+            else:
+                lote.append((registro, chegada))
+        except queue.Empty:
+            pass
+        if lote and (len(lote) >= tamanho_lote or time.monotonic() >= lote[0][1] + espera_lote):
+            _processar_lote(lote, contadores, ao_contar, usar_lote_api3, usar_hedge)
+            lote = []
+        if time.monotonic() >= proximo_resumo:
+            print(contadores.resumo(), flush=True)
+            proximo_resumo = time.monotonic() + intervalo_resumo
+    if lote:
+        _processar_lote(lote, contadores, ao_contar, usar_lote_api3, usar_hedge)
+    if isinstance(erro_fonte, ErroLeituraFonte):
+        raise erro_fonte
+    if erro_fonte is not None:
+        raise ErroLeituraFonte(f"{type(erro_fonte).__name__}: {erro_fonte}") from erro_fonte
+    return contadores
+
+# Os resultados do lote ficam em um dicionário local: os IPs já vistos são copiados da janela de
+# recentes antes das consultas, porque a contagem dos IPs novos pode tirá-los da janela LRU.
+def _processar_lote(lote, contadores, ao_contar, usar_lote_api3, usar_hedge):
+    resultados = {}
+    novos = []
+    for registro, _ in lote:
+        recente = contadores.resultado_recente(registro.endereco)
+        if recente is not None:
+            resultados[registro.endereco] = recente
+        else:
+            novos.append(registro.endereco)
+    if novos:
+        resultados.update(consultar_em_paralelo(novos, usar_lote_api3=usar_lote_api3, usar_hedge=usar_hedge))
+    for registro, chegada in lote:
+        resultado = resultados.get(registro.endereco, RESULTADO_DESCONHECIDO)
+        novo = contadores.contar(registro.endereco, resultado, chegada)
+        if ao_contar is not None:
+            ao_contar(registro, resultado, novo)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Acompanha ao vivo as entradas novas da lista PORTASCAN e as localiza.")
+    fonte = parser.add_mutually_exclusive_group(required=True)
+    fonte.add_argument("--arquivo", help="arquivo de log que cresce (ex.: /var/log/mikrotik.log)")
+    fonte.add_argument("--syslog", metavar="PORTA", type=int, help="receber o syslog remoto do roteador nesta porta UDP")
+    parser.add_argument("--do-inicio", action="store_true", help="ler o arquivo desde o começo, e não só as linhas novas")
+    parser.add_argument("--marcador", default="PORTASCAN", help="texto que identifica a lista no log (padrão: PORTASCAN)")
+    parser.add_argument("--lote", type=int, default=50, help="IPs por micro-lote de consultas (padrão: 50)")
+    parser.add_argument("--espera", type=float, default=1.0, help="espera máxima, em segundos, para fechar um lote (padrão: 1)")
+    parser.add_argument("--resumo", type=float, default=30.0, help="intervalo entre os resumos, em segundos (padrão: 30)")
+    parser.add_argument("--duracao", type=float, help="encerrar depois desse número de segundos (padrão: sem limite)")
+    argumentos = parser.parse_args()
+
+    # Mesmo cache persistente dos relatórios: scanners já conhecidos não geram requisições.
+    configurar_cache("geolocalizacao_cache.sqlite3", ttl=30 * 24 * 60 * 60)
+    linhas = seguir_arquivo(argumentos.arquivo, argumentos.do_inicio) if argumentos.arquivo else receber_syslog(porta=argumentos.syslog)
+
+    def mostrar(registro, resultado, novo):
+        if novo:
+            cidade, estado, pais, _, provedor = resultado
+            print(f"{registro.data} {registro.hora} {registro.lista} {registro.endereco}: {cidade}/{estado}/{pais} - {provedor}", flush=True)
+
+    try:
+        contadores = acompanhar(
+            linhas, argumentos.marcador, tamanho_lote=argumentos.lote, espera_lote=argumentos.espera,
+            intervalo_resumo=argumentos.resumo, duracao=argumentos.duracao, ao_contar=mostrar,
+        )
+    except KeyboardInterrupt:
+        contadores = None
+    except ErroLeituraFonte as erro:
+        print(f"Erro na leitura do log: {erro}")
+        print(resumo_latencias())
+        raise SystemExit(1)
+    if contadores is not None:
+        print(contadores.resumo())
+    print(resumo_latencias())
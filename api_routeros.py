@@ -0,0 +1,325 @@
+import argparse  # Opções da linha de comando (roteador, usuário, lista, modo de acompanhamento).
+import contextlib  # Bloco with sem arquivo de gravação quando --gravar não é usado.
+import getpass  # Pede a senha no terminal quando ela não vem da variável de ambiente.
+import hashlib  # Resposta MD5 do login antigo (RouterOS anterior à 6.43).
+import json  # Gravação das sentenças recebidas, para reproduzi-las depois no simulador.
+import os  # Senha pela variável de ambiente ROUTEROS_SENHA.
+import socket  # Conexão TCP com a API do RouterOS.
+import ssl  # API com TLS (api-ssl, porta 8729).
+import sys  # Saída dos eventos do modo de acompanhamento.
+
+from leitor_routeros import (  # Mesmo registro e mesmas validações da exportação em texto.
+    FLAGS_PADRAO,
+    _montar_registro,
+)
+
+# --- Cliente da API do RouterOS ---
+
+# Portas padrão dos serviços 'api' e 'api-ssl' do RouterOS.
+PORTA_API = 8728
+PORTA_API_TLS = 8729
+
+# Caminho do menu das address-lists na API (equivalente a '/ip firewall address-list').
+MENU_ENDERECOS = "/ip/firewall/address-list"
+
+# Erro devolvido pelo roteador (!trap ou !fatal) ou falha do protocolo.
+class ErroRouterOS(Exception):
+    pass
+
+# Codifica o tamanho de uma palavra da API: 1 a 5 bytes, conforme o tamanho.
+def _codificar_tamanho(tamanho):
+    if tamanho < 0x80:
+        return bytes([tamanho])
+    if tamanho < 0x4000:
+        return (tamanho | 0x8000).to_bytes(2, "big")
+    if tamanho < 0x200000:
+        return (tamanho | 0xC00000).to_bytes(3, "big")
+    if tamanho < 0x10000000:
+        return (tamanho | 0xE0000000).to_bytes(4, "big")
+    return b"\xf0" + tamanho.to_bytes(4, "big")
+
+# Codifica uma sentença: cada palavra precedida do tamanho e uma palavra vazia no final.
+def codificar_sentenca(palavras):
+    dados = bytearray()
+    for palavra in palavras:
+        codificada = palavra.encode("utf-8")
+        dados += _codificar_tamanho(len(codificada)) + codificada
+    dados += b"\x00"
+    return bytes(dados)
+
+# Conexão com a API do RouterOS. Uso:
+#   with ClienteRouterOS("192.168.88.1", "admin", "senha") as cliente:
+#       for registro in ler_enderecos(cliente, {"PORTASCAN"}):
+#           ...
+# Com 'tls=True' usa o serviço api-ssl (porta 8729). O certificado só é verificado com
+# 'verificar_certificado=True': o api-ssl costuma usar um certificado autoassinado do próprio roteador.
+# 'gravacao', se informado, é um arquivo aberto onde cada sentença recebida é gravada em JSON Lines,
+# no formato lido pelo simulador (simulador_routeros.py).
+class ClienteRouterOS:
+    def __init__(self, host, usuario, senha, porta=None, tls=False, timeout=10, verificar_certificado=False, gravacao=None):
+        self.host = host
+        self.usuario = usuario
+        self.senha = senha
+        self.porta = porta or (PORTA_API_TLS if tls else PORTA_API)
+        self.tls = tls
+        self.timeout = timeout
+        self.verificar_certificado = verificar_certificado
+        self.gravacao = gravacao
+        self._conexao = None
+        self._buffer = b""
+        self._proxima_tag = 0
+        self._pedido_atual = None
+
+    def __enter__(self):
+        self.conectar()
+        return self
+
+    def __exit__(self, *erro):
+        self.fechar()
+
+    # Abre a conexão e faz o login. RouterOS 6.43+ aceita usuário e senha diretamente; versões
+    # anteriores respondem com um desafio (=ret=) que precisa de uma resposta MD5.
+    def conectar(self):
+        conexao = socket.create_connection((self.host, self.porta), timeout=self.timeout)
+        if self.tls:
+            contexto = ssl.create_default_context()
+            if not self.verificar_certificado:
+                contexto.check_hostname = False
+                contexto.verify_mode = ssl.CERT_NONE
+            conexao = contexto.wrap_socket(conexao, server_hostname=self.host)
+        self._conexao = conexao
+        resposta = self._executar_simples("/login", {"name": self.usuario, "password": self.senha})
+        desafio = resposta.get("ret")
+        if desafio:
+            digest = hashlib.md5(b"\x00" + self.senha.encode("utf-8") + bytes.fromhex(desafio)).hexdigest()
+            self._executar_simples("/login", {"name": self.usuario, "response": "00" + digest})
+
+    # Tempo máximo de espera por dados do roteador; None espera sem limite (modo de acompanhamento).
+    def definir_timeout(self, segundos):
+        self._conexao.settimeout(segundos)
+
+    def fechar(self):
+        if self._conexao is not None:
+            self._conexao.close()
+            self._conexao = None
+
+    def _receber(self, quantidade):
+        while len(self._buffer) < quantidade:
+            dados = self._conexao.recv(65536)
+            if not dados:
+                raise ErroRouterOS("Conexão encerrada pelo roteador.")
+            self._buffer += dados
+        parte, self._buffer = self._buffer[:quantidade], self._buffer[quantidade:]
+        return parte
+
+    def _ler_tamanho(self):
+        primeiro = self._receber(1)[0]
+        if primeiro < 0x80:
+            return primeiro
+        if primeiro < 0xC0:
+            return ((primeiro & 0x3F) << 8) | self._receber(1)[0]
+        if primeiro < 0xE0:
+            return ((primeiro & 0x1F) << 16) | int.from_bytes(self._receber(2), "big")
+        if primeiro < 0xF0:
+            return ((primeiro & 0x0F) << 24) | int.from_bytes(self._receber(3), "big")
+        return int.from_bytes(self._receber(4), "big")
+
+    def enviar(self, palavras):
+        self._conexao.sendall(codificar_sentenca(palavras))
+
+    # Lê a próxima sentença do roteador como lista de palavras (ex.: ["!re", "=address=1.2.3.4", ...]).
+    def ler_sentenca(self):
+        palavras = []
+        while True:
+            tamanho = self._ler_tamanho()
+            if tamanho == 0:
+                break
+            palavras.append(self._receber(tamanho).decode("utf-8", errors="replace"))
+        if self.gravacao is not None:
+            self.gravacao.write(json.dumps({"pedido": self._pedido_atual, "resposta": palavras}, ensure_ascii=False) + "\n")
+        return palavras
+
+    # Executa um comando e gera os atributos de cada resposta '!re' como dicionário, até o '!done'.
+    # 'atributos' vira "=nome=valor" e 'consultas' vira "?nome=valor" (filtro feito no roteador).
+    # Um '!trap' ou '!fatal' vira ErroRouterOS. Se o gerador for fechado antes do '!done'
+    # (ex.: modo de acompanhamento interrompido), o comando é cancelado no roteador.
+    def executar(self, comando, atributos=None, consultas=None):
+        self._proxima_tag += 1
+        tag = str(self._proxima_tag)
+        palavras = [comando]
+        palavras += [f"={nome}={valor}" for nome, valor in (atributos or {}).items()]
+        palavras += [f"?{nome}={valor}" for nome, valor in (consultas or {}).items()]
+        # O pedido é gravado sem a tag e sem a senha do login.
+        self._pedido_atual = [palavra for palavra in palavras if not palavra.startswith(("=password=", "=response="))]
+        palavras.append(f".tag={tag}")
+        self.enviar(palavras)
+        concluido = False
+        try:
+            while True:
+                tipo, campos = _separar_resposta(self.ler_sentenca())
+                if campos.pop(".tag", tag) != tag:
+                    continue
+                if tipo == "!re":
+                    yield campos
+                elif tipo == "!done":
+                    concluido = True
+                    if campos:
+                        yield campos
+                    return
+                elif tipo in ("!trap", "!fatal"):
+                    concluido = True
+                    raise ErroRouterOS(f"{comando}: {campos.get('message', tipo)}")
+        finally:
+            if not concluido and self._conexao is not None:
+                try:
+                    self._cancelar(tag)
+                except (OSError, ErroRouterOS):
+                    self.fechar()
+
+    # Cancela um comando em andamento e descarta as respostas dele até o '!done'.
+    def _cancelar(self, tag):
+        self._pedido_atual = ["/cancel", f"=tag={tag}"]
+        self.enviar(self._pedido_atual)
+        pendentes = 2 # o '!done' do comando cancelado e o do próprio /cancel
+        while pendentes:
+            tipo, _ = _separar_resposta(self.ler_sentenca())
+            if tipo in ("!done", "!fatal"):
+                pendentes -= 1
+
+    # Executa um comando que responde apenas com '!done' (ex.: /login) e retorna os atributos dele.
+    def _executar_simples(self, comando, atributos):
+        resposta = {}
+        for campos in self.executar(comando, atributos):
+            resposta.update(campos)
+        return resposta
+
+# Divide a sentença no tipo ("!re", "!done", ...) e nos atributos "=nome=valor" / ".tag=...".
+def _separar_resposta(palavras):
+    if not palavras:
+        raise ErroRouterOS("Sentença vazia recebida do roteador.")
+    campos = {}
+    for palavra in palavras[1:]:
+        if palavra.startswith("="):
+            nome, _, valor = palavra[1:].partition("=")
+            campos[nome] = valor
+        elif palavra.startswith(".tag="):
+            campos[".tag"] = palavra[len(".tag="):]
+    return palavras[0], campos
+
+# --- Entradas das Address-Lists ---
+
+# Converte os atributos de uma entrada da API em RegistroEndereco, com as mesmas validações da
+# exportação em texto. 'numero' é a posição da entrada (como a coluna "#" do print), e 'linha'
+# fica igual a ela. Retorna None se algum campo for inválido.
+def registro_da_api(atributos, numero):
+    flags = ""
+    if atributos.get("disabled") == "true":
+        flags += "X"
+    if atributos.get("dynamic") == "true":
+        flags += "D"
+    numero_e_flags = [str(numero), flags] if flags else [str(numero)]
+    return _montar_registro(
+        numero + 1, numero_e_flags, atributos.get("list", ""), atributos.get("address", ""),
+        atributos.get("creation-time"), atributos.get("timeout"), "".join(FLAGS_PADRAO),
+        atributos.get("comment") or None,
+    )
+
+# Gera um RegistroEndereco por entrada de '/ip/firewall/address-list/print', à medida que as
+# respostas chegam, para as mesmas etapas usadas com a exportação em texto (leitor_routeros.py).
+# Com 'listas', cada lista é pedida ao roteador com um filtro "?list=", sem trafegar as outras.
+# 'ao_ignorar(numero, atributos)' recebe as entradas que não puderam ser interpretadas.
+def ler_enderecos(cliente, listas=None, ao_ignorar=None):
+    numero = 0
+    for consultas in ([{"list": lista} for lista in sorted(listas)] if listas else [None]):
+        for atributos in cliente.executar(f"{MENU_ENDERECOS}/print", consultas=consultas):
+            registro = registro_da_api(atributos, numero)
+            if registro is None:
+                if ao_ignorar is not None:
+                    ao_ignorar(numero, atributos)
+            else:
+                yield registro
+            numero += 1
+
+# Modo de acompanhamento: lê as entradas atuais e depois fica escutando as mudanças com o comando
+# 'listen' do RouterOS. Gera pares (evento, registro), com evento "existente" (leitura inicial),
+# "adicionada", "alterada" ou "removida". O roteador informa a remoção só com o '.id' (=.dead=yes),
+# então o registro removido vem do que já foi lido. Só termina quando o gerador é fechado ou a
+# conexão cai; ao fechar, o 'listen' é cancelado no roteador.
+def seguir_enderecos(cliente, listas=None):
+    conhecidas = {}
+    numero = 0
+    for atributos in cliente.executar(f"{MENU_ENDERECOS}/print"):
+        registro = registro_da_api(atributos, numero)
+        numero += 1
+        if registro is not None and (not listas or registro.lista in listas):
+            conhecidas[atributos.get(".id")] = registro
+            yield "existente", registro
+    # Entre uma mudança e outra a conexão pode ficar parada por horas.
+    cliente.definir_timeout(None)
+    for atributos in cliente.executar(f"{MENU_ENDERECOS}/listen"):
+        identificador = atributos.get(".id")
+        if atributos.get(".dead") in ("yes", "true"):
+            registro = conhecidas.pop(identificador, None)
+            if registro is not None:
+                yield "removida", registro
+            continue
+        registro = registro_da_api(atributos, numero)
+        numero += 1
+        if registro is None or (listas and registro.lista not in listas):
+            continue
+        evento = "alterada" if identificador in conhecidas else "adicionada"
+        conhecidas[identificador] = registro
+        yield evento, registro
+
+# Grava os registros no formato de '/ip firewall address-list print', lido por ler_registros():
+# com isso, a saída da API pode substituir o arquivo copiado do roteador nos scripts existentes.
+def salvar_exportacao(registros, caminho):
+    registros = list(registros)
+    largura_numero = max([len(str(registro.numero)) for registro in registros] + [1])
+    largura_lista = max([len(registro.lista) for registro in registros] + [len("LIST")])
+    enderecos = [registro.host or (f"{registro.endereco}/{registro.prefixo}" if registro.prefixo != 32 else registro.endereco) for registro in registros]
+    largura_endereco = max([len(endereco) for endereco in enderecos] + [len("ADDRESS")])
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        arquivo.write("Flags: " + "; ".join(f"{letra} - {nome}" for letra, nome in FLAGS_PADRAO.items()) + "\n")
+        arquivo.write("Columns: LIST, ADDRESS, CREATION-TIME, TIMEOUT\n")
+        arquivo.write(f"{'#':>{largura_numero}}    {'LIST':<{largura_lista}}  {'ADDRESS':<{largura_endereco}}  {'CREATION-TIME':<19}  TIMEOUT\n")
+        for registro, endereco in zip(registros, enderecos):
+            if registro.comentario:
+                arquivo.write(f";;; {registro.comentario}\n")
+            criacao = f"{registro.data} {registro.hora}" if registro.data else ""
+            linha = f"{registro.numero:>{largura_numero}} {registro.flags:<2} {registro.lista:<{largura_lista}}  {endereco:<{largura_endereco}}  {criacao:<19}  {registro.timeout or ''}"
+            arquivo.write(linha.rstrip() + "\n")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lê as address-lists do Mikrotik pela API do RouterOS.")
+    parser.add_argument("host", help="endereço do roteador")
+    parser.add_argument("--usuario", default="admin", help="usuário da API (padrão: admin)")
+    parser.add_argument("--porta", type=int, help="porta da API (padrão: 8728, ou 8729 com --tls)")
+    parser.add_argument("--tls", action="store_true", help="usar o serviço api-ssl")
+    parser.add_argument("--lista", action="append", help="lista a ler (pode repetir); padrão: todas")
+    parser.add_argument("--saida", default="portascan-list.txt", help="arquivo no formato do print (padrão: portascan-list.txt)")
+    parser.add_argument("--seguir", action="store_true", help="acompanhar as mudanças das listas até Ctrl+C")
+    parser.add_argument("--gravar", help="gravar as sentenças recebidas em JSON Lines, para o simulador")
+    argumentos = parser.parse_args()
+
+    # A senha vem da variável de ambiente ROUTEROS_SENHA ou é pedida no terminal.
+    senha = os.environ.get("ROUTEROS_SENHA")
+    if senha is None:
+        senha = getpass.getpass(f"Senha de {argumentos.usuario}@{argumentos.host}: ")
+    listas = set(argumentos.lista) if argumentos.lista else None
+    with (
+        open(argumentos.gravar, "w", encoding="utf-8") if argumentos.gravar else contextlib.nullcontext() as gravacao,
+        ClienteRouterOS(argumentos.host, argumentos.usuario, senha, argumentos.porta, argumentos.tls, gravacao=gravacao) as cliente,
+    ):
+        if argumentos.seguir:
+            try:
+                for evento, registro in seguir_enderecos(cliente, listas):
+                    print(f"{evento:<10} {registro.lista:<20} {registro.endereco or registro.host} {registro.timeout or ''}", flush=True)
+            except KeyboardInterrupt:
+                pass
+        else:
+            def avisar(numero, atributos):
+                print(f"Entrada ignorada (formato inválido): {atributos}", file=sys.stderr)
+            registros = list(ler_enderecos(cliente, listas, avisar))
+            salvar_exportacao(registros, argumentos.saida)
+            print(f"{len(registros)} entradas salvas em: {argumentos.saida}")
@@ -0,0 +1,113 @@
+import numpy as np  # Arrays ordenados de inícios/fins das faixas e busca binária vetorizada (searchsorted).
+import pandas as pd  # Leitura do CSV da base e codificação das colunas de texto em categorias.
+
+from enderecos import (  # Conversão de endereços IPv4 para inteiros de 32 bits.
+    ip_para_int,
+    ips_para_uint32,
+)
+
+# --- Base de Geolocalização Offline ---
+
+# Nomes de colunas aceitos no CSV da base para cada campo. O CSV deve ter cabeçalho;
+# os endereços de início/fim podem estar em texto ("1.0.0.0") ou como inteiros (16777216).
+COLUNAS_ACEITAS = {
+    "inicio": ["inicio", "start", "ip_from", "start_ip", "network_start"],
+    "fim": ["fim", "end", "ip_to", "end_ip", "network_end"],
+    "cidade": ["cidade", "city", "city_name"],
+    "estado": ["estado", "region", "region_name", "stateprov"],
+    "pais": ["pais", "país", "country", "country_name"],
+    "cep": ["cep", "zip", "zip_code", "postcode"],
+    "provedor": ["provedor", "isp", "organization", "org"],
+}
+
+# Valor usado quando o campo não existe no CSV ou está vazio, na mesma convenção das APIs.
+VALORES_PADRAO = {
+    "cidade": "Desconhecida",
+    "estado": "Desconhecida",
+    "pais": "Desconhecido",
+    "cep": "Desconhecido",
+    "provedor": "Desconhecido",
+}
+
+CAMPOS = ["cidade", "estado", "pais", "cep", "provedor"]
+
+# Base local de faixas IPv4 (início/fim → cidade, estado, país, CEP, provedor).
+# As faixas ficam em arrays uint32 ordenados e cada consulta é uma busca binária,
+# então milhões de IPs são resolvidos sem nenhuma requisição de rede.
+class BaseGeolocalizacaoOffline:
+    def __init__(self, caminho, separador=","):
+        # Lê só o cabeçalho para descobrir quais colunas do CSV correspondem a cada campo.
+        cabecalho = pd.read_csv(caminho, sep=separador, nrows=0).columns
+        colunas = {coluna.strip().lower(): coluna for coluna in cabecalho}
+        encontradas = {}
+        for campo, nomes in COLUNAS_ACEITAS.items():
+            for nome in nomes:
+                if nome in colunas:
+                    encontradas[campo] = colunas[nome]
+                    break
+        if "inicio" not in encontradas or "fim" not in encontradas:
+            raise ValueError(f"A base '{caminho}' precisa das colunas de início e fim da faixa (ex.: inicio,fim).")
+
+        # As colunas de texto já são lidas como categorias pelo leitor de CSV: cada nome de país,
+        # estado ou provedor é guardado uma única vez, e cada faixa guarda apenas um código inteiro.
+        tipos = {encontradas[campo]: "category" for campo in CAMPOS if campo in encontradas}
+        tabela = pd.read_csv(
+            caminho,
+            sep=separador,
+            usecols=list(encontradas.values()),
+            dtype=tipos,
+            keep_default_na=False,
+            skipinitialspace=True,
+        )
+
+        inicios = self._para_uint32(tabela[encontradas["inicio"]])
+        ordem = np.argsort(inicios, kind="stable")
+        self.inicios = inicios[ordem]
+        self.fins = self._para_uint32(tabela[encontradas["fim"]])[ordem]
+
+        self.codigos = {}
+        self.categorias = {}
+        for campo in CAMPOS:
+            if campo not in encontradas:
+                self.codigos[campo] = np.zeros(len(ordem), dtype=np.int32)
+                self.categorias[campo] = [VALORES_PADRAO[campo]]
+                continue
+            categorico = tabela[encontradas[campo]].cat
+            self.codigos[campo] = categorico.codes.to_numpy().astype(np.int32)[ordem]
+            self.categorias[campo] = [str(nome).strip() or VALORES_PADRAO[campo] for nome in categorico.categories]
+
+    # Aceita os endereços como inteiros ou como texto IPv4.
+    @staticmethod
+    def _para_uint32(serie):
+        if pd.api.types.is_integer_dtype(serie):
+            return serie.to_numpy().astype(np.uint32)
+        return ips_para_uint32(serie.astype(str).str.strip())
+
+    def __len__(self):
+        return len(self.inicios)
+
+    # Retorna, para um array uint32 de IPs, o índice da faixa de cada um (-1 quando fora da base).
+    def localizar_faixas(self, ips_uint32):
+        posicoes = np.searchsorted(self.inicios, ips_uint32, side="right") - 1
+        validas = posicoes >= 0
+        posicoes_validas = np.where(validas, posicoes, 0)
+        validas &= ips_uint32 <= self.fins[posicoes_validas]
+        return np.where(validas, posicoes, -1)
+
+    # Consulta um único IP. Retorna (cidade, estado, pais, cep, provedor) ou None se não estiver na base.
+    def consultar(self, ip):
+        posicao = self.localizar_faixas(np.array([ip_para_int(ip)], dtype=np.uint32))[0]
+        if posicao < 0:
+            return None
+        return tuple(self.categorias[campo][self.codigos[campo][posicao]] for campo in CAMPOS)
+
+    # Consulta vários IPs de uma vez. Retorna um dicionário {ip: resultado} apenas com os IPs encontrados.
+    def consultar_varios(self, ips):
+        ips = list(ips)
+        posicoes = self.localizar_faixas(ips_para_uint32(ips))
+        encontrados = np.flatnonzero(posicoes >= 0)
+        colunas = [
+            np.asarray(self.categorias[campo], dtype=object)[self.codigos[campo][posicoes[encontrados]]]
+            for campo in CAMPOS
+        ]
+        return {ips[i]: resultado for i, resultado in zip(encontrados, zip(*colunas))}
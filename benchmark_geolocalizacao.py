@@ -0,0 +1,180 @@
+import argparse  # Módulo para ler os parâmetros do benchmark pela linha de comando.
+import json  # Módulo para montar as respostas JSON do provedor simulado.
+import random  # Módulo para sortear quais respostas do provedor simulado serão lentas.
+import threading  # Módulo para executar o servidor simulado em segundo plano.
+import time  # Módulo para medir o tempo de cada modo de consulta.
+from http.server import (  # Servidor HTTP local que imita as APIs.
+    BaseHTTPRequestHandler,
+    ThreadingHTTPServer,
+)
+from time import (
+    sleep,  # Usado para simular a latência das APIs e a pausa do laço serial antigo.
+)
+
+import geolocalizacao  # Módulo com as funções de consulta e o motor concorrente.
+import limitador_taxa  # Limites de taxa por provedor, liberados para o provedor simulado.
+import sessoes_http  # Estatísticas de reaproveitamento das conexões HTTP.
+from enderecos import (
+    classificar_varios,  # Conferência de que os IPs sintéticos são públicos e chegam ao provedor simulado.
+)
+
+# --- Provedor Simulado ---
+
+# Servidor HTTP local que responde no formato das APIs individuais (GET /<api>/json/<ip>, com os
+# campos de ipwhois.app, ipstack.com e ip-api.com) e do endpoint em lote do ip-api.com (POST /batch),
+# aguardando 'latencia' segundos antes de cada resposta para imitar a rede real. Uma fração
+# 'fracao_lenta' das respostas individuais demora 'latencia_lenta' segundos (cauda de latência).
+# No lote, IPs terminados em 0 voltam com "status": "fail", simulando falhas parciais.
+class ProvedorSimulado(BaseHTTPRequestHandler):
+    # HTTP/1.1 mantém a conexão aberta entre requisições (keep-alive), como as APIs reais.
+    protocol_version = "HTTP/1.1"
+    # Cabeçalhos e corpo saem em escritas separadas; sem isso o algoritmo de Nagle atrasa cada resposta.
+    disable_nagle_algorithm = True
+    latencia = 0.05
+    fracao_lenta = 0.0
+    latencia_lenta = 2.0
+    requisicoes = 0
+    _trava = threading.Lock()
+
+    def do_GET(self):
+        self._contar()
+        sleep(self.latencia_lenta if random.random() < self.fracao_lenta else self.latencia)
+        ip = self.path.split("?")[0].rsplit("/", 1)[-1]
+        self._responder(200, {
+            "ip": ip,
+            "city": "Cidade Simulada",
+            "region": "Estado Simulado",
+            "region_name": "Estado Simulado",
+            "regionName": "Estado Simulado",
+            "country": "País Simulado",
+            "country_name": "País Simulado",
+            "zip": "00000-000",
+            "isp": "Provedor Simulado",
+        })
+
+    def do_POST(self):
+        self._contar()
+        sleep(self.latencia)
+        ips = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        # O ip-api.com recusa lotes com mais de 100 IPs.
+        if len(ips) > 100:
+            self._responder(422, {"message": "too many queries"})
+            return
+        itens = []
+        for ip in ips:
+            if ip.endswith("0"):
+                itens.append({"status": "fail", "message": "invalid query", "query": ip})
+            else:
+                itens.append({
+                    "status": "success",
+                    "query": ip,
+                    "city": "Cidade Simulada",
+                    "regionName": "Estado Simulado",
+                    "country": "País Simulado",
+                    "zip": "00000-000",
+                    "isp": "Provedor Simulado",
+                })
+        self._responder(200, itens)
+
+    def _contar(self):
+        with self._trava:
+            ProvedorSimulado.requisicoes += 1
+
+    def _responder(self, status, conteudo):
+        corpo = json.dumps(conteudo).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    # Silencia o log padrão do servidor para não poluir a saída do benchmark.
+    def log_message(self, *args):
+        pass
+
+# Inicia o provedor simulado em uma porta livre e aponta para ele as três APIs e o lote da API 3.
+# 'manipulador' permite usar uma subclasse de ProvedorSimulado com outras respostas (ex.: nos testes).
+def iniciar_provedor_simulado(latencia, manipulador=ProvedorSimulado):
+    manipulador.latencia = latencia
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), manipulador)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    endereco = f"http://127.0.0.1:{servidor.server_address[1]}"
+    geolocalizacao.URL_API1 = endereco + "/api1/json/{ip}"
+    geolocalizacao.URL_API2 = endereco + "/api2/json/{ip}?access_key={access_key}"
+    geolocalizacao.URL_API3 = endereco + "/api3/json/{ip}"
+    geolocalizacao.URL_API3_LOTE = endereco + "/batch"
+    # O provedor simulado não tem limite de taxa; o benchmark mede apenas o custo das consultas.
+    for provedor in ("api1", "api2", "api3", "api3_lote"):
+        limitador_taxa.LIMITES_TAXA[provedor] = (10000.0, 10000)
+    return servidor
+
+# Gera uma lista de IPs sintéticos distintos na faixa pública 11.0.0.0/8. Os IPs não podem estar
+# em enderecos.FAIXAS_ESPECIAIS: esses são classificados localmente e nunca chegariam ao provedor
+# simulado, e o benchmark não mediria nenhuma requisição.
+def gerar_ips(quantidade):
+    ips = [f"11.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}" for n in range(quantidade)]
+    especiais = classificar_varios(ips)
+    if especiais:
+        raise ValueError(f"IPs sintéticos em faixas especiais: {list(especiais)[:3]}")
+    return ips
+
+# --- Modos de Consulta ---
+
+# Reproduz o laço original do 10G.py: um IP por vez, seguido de sleep(pausa).
+def laco_serial(ips, pausa):
+    for ip in ips:
+        geolocalizacao.consultar_geolocalizacao(ip)
+        sleep(pausa)
+
+def motor_concorrente(ips, max_threads, usar_lote_api3=False, usar_hedge=False):
+    resultados = geolocalizacao.consultar_em_paralelo(ips, max_threads=max_threads, usar_lote_api3=usar_lote_api3, usar_hedge=usar_hedge)
+    # Todos os IPs, inclusive os que falharam dentro de um lote, devem voltar localizados.
+    nao_localizados = [ip for ip in ips if resultados[ip][2] == "Desconhecido"]
+    if nao_localizados:
+        print(f"ATENÇÃO: {len(nao_localizados)} IPs não localizados (ex.: {nao_localizados[:3]})")
+
+def medir(descricao, funcao, quantidade):
+    ProvedorSimulado.requisicoes = 0
+    inicio = time.perf_counter()
+    funcao()
+    duracao = time.perf_counter() - inicio
+    print(f"{descricao:<45} {quantidade:>7} IPs  {duracao:>8.2f} s  {quantidade / duracao:>9.1f} IPs/s  {ProvedorSimulado.requisicoes:>7} requisições")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do motor de geolocalização contra um provedor simulado local.")
+    parser.add_argument("--ips", type=int, default=500, help="Quantidade de IPs consultados pelo motor concorrente.")
+    parser.add_argument("--amostra-serial", type=int, default=10, help="Quantidade de IPs consultados pelo laço serial.")
+    parser.add_argument("--pausa-serial", type=float, default=1.0, help="Pausa entre IPs no laço serial (o 10G.py usava 1 s).")
+    parser.add_argument("--latencia", type=float, default=0.05, help="Latência simulada de cada resposta, em segundos.")
+    parser.add_argument("--threads", type=int, default=geolocalizacao.MAX_THREADS_PADRAO, help="Threads do motor concorrente.")
+    parser.add_argument("--fracao-lenta", type=float, default=0.03, help="Fração das respostas lentas no teste de latência de cauda.")
+    parser.add_argument("--latencia-lenta", type=float, default=2.0, help="Latência das respostas lentas, em segundos.")
+    args = parser.parse_args()
+
+    servidor = iniciar_provedor_simulado(args.latencia)
+    print(f"Provedor simulado em {geolocalizacao.URL_API1} (latência {args.latencia * 1000:.0f} ms)\n")
+
+    medir(f"Laço serial com sleep({args.pausa_serial:g})", lambda: laco_serial(gerar_ips(args.amostra_serial), args.pausa_serial), args.amostra_serial)
+    medir("Laço serial sem pausa", lambda: laco_serial(gerar_ips(args.amostra_serial), 0), args.amostra_serial)
+    medir(f"Motor concorrente ({args.threads} threads)", lambda: motor_concorrente(gerar_ips(args.ips), args.threads), args.ips)
+    medir("Motor concorrente + lote ip-api", lambda: motor_concorrente(gerar_ips(args.ips), args.threads, usar_lote_api3=True), args.ips)
+
+    # Latência de cauda: com uma fração de respostas lentas, compara a cadeia sequencial
+    # (espera cada provedor) com as requisições de reforço (hedge) entre provedores.
+    # Usa tantas threads quanto o limite de conexões simultâneas da API 1, para que a
+    # latência medida seja a do provedor e não a da fila do semáforo.
+    threads_latencia = geolocalizacao.LIMITE_SIMULTANEAS["api1"]
+    print(f"\nLatência de cauda: {args.fracao_lenta:.0%} das respostas demoram {args.latencia_lenta:g} s")
+    ProvedorSimulado.fracao_lenta = args.fracao_lenta
+    ProvedorSimulado.latencia_lenta = args.latencia_lenta
+    for descricao, usar_hedge in [("Cadeia sequencial", False), ("Cadeia com hedge", True)]:
+        geolocalizacao.latencias_consultas.clear()
+        medir(descricao, lambda usar_hedge=usar_hedge: motor_concorrente(gerar_ips(args.ips), threads_latencia, usar_hedge=usar_hedge), args.ips)
+        print(f"    {geolocalizacao.resumo_latencias()}")
+    ProvedorSimulado.fracao_lenta = 0.0
+
+    print()
+    print(sessoes_http.resumo_conexoes())
+
+    servidor.shutdown()
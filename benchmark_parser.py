@@ -0,0 +1,172 @@
+import argparse  # Módulo para ler os parâmetros do benchmark pela linha de comando.
+import os  # Módulo para montar o caminho e apagar o arquivo sintético.
+import random  # Módulo para sortear endereços, listas e horários das linhas sintéticas.
+import re  # Módulo de expressões regulares, usado na leitura antiga (uma busca sem compilar por linha).
+import tempfile  # Diretório temporário onde a exportação sintética é gerada.
+import time  # Módulo para medir o tempo de cada leitura.
+from concurrent.futures import (
+    ProcessPoolExecutor,  # Cada leitura roda em um processo próprio, para medir o pico de memória.
+)
+from concurrent.futures.process import (
+    BrokenProcessPool,  # Processo encerrado pelo sistema (ex.: falta de memória).
+)
+from functools import (
+    partial,  # Fixa a quantidade de processos da leitura de vários arquivos.
+)
+
+import numpy as np  # Remoção de IPs repetidos na leitura colunar.
+
+from leitor_colunar import ler_exportacao_colunar  # Leitura colunar avaliada.
+from leitor_routeros import (  # Leitor em fluxo avaliado.
+    filtrar_listas,
+    ler_em_paralelo,
+    ler_registros,
+    remover_repetidos,
+)
+
+try:
+    import resource  # Pico de memória do processo (disponível apenas em Linux/macOS).
+except ImportError:
+    resource = None
+
+# --- Exportação Sintética ---
+
+LISTAS = ["PORTASCAN", "PORTASCAN", "PORTASCAN", "API_PORTASCAN", "blocked-scanners", "Blocked", "bogons"]
+
+# Gera um arquivo no formato de '/ip firewall address-list print' com 'quantidade' linhas de entrada,
+# intercaladas com comentários ';;;', como nas exportações reais.
+def gerar_exportacao(caminho, quantidade, semente=42):
+    aleatorio = random.Random(semente)
+    with open(caminho, "w") as arquivo:
+        arquivo.write("# 2024-12-30 21:50:21 by RouterOS 7.16.2\n")
+        arquivo.write("Flags: D - DYNAMIC\n")
+        arquivo.write("Columns: LIST, ADDRESS, CREATION-TIME, TIMEOUT\n")
+        # As colunas ficam alinhadas ao cabeçalho, como no RouterOS: a largura do número acompanha a maior entrada.
+        largura = len(str(quantidade - 1))
+        arquivo.write(f"{'#':>{largura}}   {'LIST':<34} {'ADDRESS':<19} {'CREATION-TIME':<19}  TIMEOUT\n")
+        bloco = []
+        for numero in range(quantidade):
+            if numero % 50 == 0:
+                bloco.append(";;; Lista de IPs bloqueados por escaneamento\n")
+            lista = aleatorio.choice(LISTAS)
+            flags = "D" if lista.endswith("PORTASCAN") else " "
+            ip = f"{aleatorio.randint(1, 223)}.{aleatorio.randint(0, 255)}.{aleatorio.randint(0, 255)}.{aleatorio.randint(1, 254)}"
+            data = f"2024-12-{aleatorio.randint(1, 30):02d} {aleatorio.randint(0, 23):02d}:{aleatorio.randint(0, 59):02d}:{aleatorio.randint(0, 59):02d}"
+            timeout = f"{aleatorio.randint(1, 4)}w{aleatorio.randint(0, 6)}d{aleatorio.randint(0, 23)}h" if flags == "D" else ""
+            bloco.append(f"{numero:>{largura}} {flags} {lista:<34} {ip:<19} {data}  {timeout}\n")
+            if len(bloco) >= 100000:
+                arquivo.writelines(bloco)
+                bloco = []
+        arquivo.writelines(bloco)
+
+# --- Leituras Comparadas ---
+
+# Leitura usada pelo V6.py: 're.search' sem compilar em cada linha e todos os registros em uma lista de dicionários.
+def leitura_antiga(caminho):
+    pattern = r"(PORTASCAN|API_PORTASCAN|PORTASCAN1|bogons|Blocked|blocked-scanners)\s+([\d\.]+)\s+(\d{4}-\d{2}-\d{2})?\s*([\d:]+)?\s*([\d\w]+)?"
+    dados = []
+    with open(caminho, "r") as arquivo:
+        for linha_num, linha in enumerate(arquivo, start=1):
+            match = re.search(pattern, linha)
+            if match:
+                dados.append({
+                    "Linha Original": linha_num,
+                    "Tipo": match.group(1),
+                    "IP": match.group(2),
+                    "Data": match.group(3) if match.group(3) else "Data Ausente",
+                    "Hora": match.group(4) if match.group(4) else "Hora Ausente",
+                    "Timeout": match.group(5) if match.group(5) else "Sem Timeout",
+                })
+    return len(dados)
+
+# Leitor em fluxo: os registros são consumidos à medida que são gerados, sem lista intermediária.
+def leitura_em_fluxo(caminho):
+    return sum(1 for _ in ler_registros(caminho))
+
+# Leitor em fluxo com as etapas de filtro por lista e remoção de IPs repetidos.
+def leitura_em_fluxo_com_etapas(caminho):
+    registros = filtrar_listas(ler_registros(caminho), {"PORTASCAN", "API_PORTASCAN"})
+    return sum(1 for _ in remover_repetidos(registros))
+
+# Leitura colunar: a exportação inteira em arrays NumPy, sem um objeto Python por entrada.
+def leitura_colunar(caminho):
+    return len(ler_exportacao_colunar(caminho))
+
+# Leitura colunar com o filtro por lista (máscara sobre os códigos) e a remoção de IPs repetidos.
+def leitura_colunar_com_etapas(caminho):
+    exportacao = ler_exportacao_colunar(caminho)
+    selecionadas = exportacao.filtrar(exportacao.mascara_listas(lambda nome: nome in {"PORTASCAN", "API_PORTASCAN"}))
+    return len(np.unique(selecionadas.ips))
+
+# Vários arquivos de exportação lidos por 'processos' processos, juntados na ordem dos arquivos.
+def leitura_de_varios_arquivos(caminhos, processos):
+    return sum(1 for _ in ler_em_paralelo(caminhos, {"PORTASCAN", "API_PORTASCAN"}, processos=processos))
+
+# Executa a leitura no processo atual e devolve (registros, segundos, pico de memória em MB ou None).
+def _executar(funcao, caminho):
+    inicio = time.perf_counter()
+    registros = funcao(caminho)
+    duracao = time.perf_counter() - inicio
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if resource else None
+    return registros, duracao, pico
+
+def medir(descricao, funcao, caminho, linhas):
+    # Um processo novo por leitura: o pico de memória de uma não contamina a medição da outra.
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        try:
+            registros, duracao, pico = executor.submit(_executar, funcao, caminho).result()
+        except BrokenProcessPool:
+            print(f"{descricao:<32} interrompido pelo sistema (provavelmente sem memória)")
+            return
+    memoria = f"{pico:.0f} MB" if pico is not None else "-"
+    print(f"{descricao:<32} {registros:>10} registros  {duracao:7.2f} s  {linhas / duracao:>12,.0f} linhas/s  pico {memoria}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dos leitores (em fluxo e colunar) das exportações do RouterOS.")
+    parser.add_argument("--linhas", type=int, default=10_000_000, help="Quantidade de linhas de entrada da exportação sintética.")
+    parser.add_argument("--arquivo", help="Usar uma exportação existente em vez de gerar uma sintética.")
+    parser.add_argument("--sem-leitura-antiga", action="store_true", help="Não medir a leitura antiga, que guarda tudo na memória.")
+    parser.add_argument("--varios-arquivos", type=int, help="Dividir as linhas em N exportações e medir a leitura em paralelo (V6.py).")
+    args = parser.parse_args()
+
+    # Diretório com muitas exportações (vários dias/roteadores): compara um processo com um por núcleo.
+    if args.varios_arquivos:
+        diretorio = tempfile.mkdtemp()
+        por_arquivo = max(1, args.linhas // args.varios_arquivos)
+        print(f"Gerando {args.varios_arquivos} exportações sintéticas com {por_arquivo} entradas cada...")
+        caminhos = [os.path.join(diretorio, f"portascan-list{numero}.txt") for numero in range(args.varios_arquivos)]
+        for numero, caminho in enumerate(caminhos):
+            gerar_exportacao(caminho, por_arquivo, semente=numero)
+        linhas = por_arquivo * args.varios_arquivos
+        try:
+            medir("Vários arquivos, 1 processo", partial(leitura_de_varios_arquivos, processos=1), caminhos, linhas)
+            processos = os.cpu_count() or 1
+            medir(f"Vários arquivos, {processos} processos", partial(leitura_de_varios_arquivos, processos=processos), caminhos, linhas)
+        finally:
+            for caminho in caminhos:
+                os.remove(caminho)
+            os.rmdir(diretorio)
+        raise SystemExit
+
+    diretorio = None
+    caminho = args.arquivo
+    if caminho is None:
+        diretorio = tempfile.mkdtemp()
+        caminho = os.path.join(diretorio, "exportacao_sintetica.txt")
+        print(f"Gerando exportação sintética com {args.linhas} entradas...")
+        gerar_exportacao(caminho, args.linhas)
+    with open(caminho, "r") as arquivo:
+        linhas = sum(1 for _ in arquivo)
+    print(f"Arquivo: {caminho} ({os.path.getsize(caminho) / 1024 / 1024:.0f} MB, {linhas} linhas)")
+
+    try:
+        if not args.sem_leitura_antiga:
+            medir("Regex por linha (V6.py)", leitura_antiga, caminho, linhas)
+        medir("Leitor em fluxo", leitura_em_fluxo, caminho, linhas)
+        medir("Leitor em fluxo + filtro/dedupe", leitura_em_fluxo_com_etapas, caminho, linhas)
+        medir("Leitura colunar", leitura_colunar, caminho, linhas)
+        medir("Leitura colunar + filtro/dedupe", leitura_colunar_com_etapas, caminho, linhas)
+    finally:
+        if diretorio is not None:
+            os.remove(caminho)
+            os.rmdir(diretorio)
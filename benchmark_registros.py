@@ -0,0 +1,102 @@
+import argparse  # Módulo para ler os parâmetros do benchmark pela linha de comando.
+import random  # Módulo para sortear IPs, horários, timeouts e resultados de geolocalização.
+import time  # Módulo para medir o tempo de cada representação.
+from concurrent.futures import (
+    ProcessPoolExecutor,  # Cada representação é medida em um processo próprio.
+)
+
+import pandas as pd  # DataFrame do relatório montado a partir de cada representação.
+
+from registros import (  # Representação compacta avaliada.
+    EMAIL_NAO_DISPONIVEL,
+    TabelaEntradas,
+)
+
+try:
+    import resource  # Pico de memória do processo (disponível apenas em Linux/macOS).
+except ImportError:
+    resource = None
+
+# --- Entradas Sintéticas ---
+
+PAISES = ["China", "United States", "Russia", "Brazil", "Netherlands", "Germany", "Desconhecido"]
+PROVEDORES = ["Chinanet", "DigitalOcean", "Amazon.com", "Google LLC", "OVH SAS", "Hetzner", "Desconhecido"]
+
+# Gera 'quantidade' entradas (IP, data, hora, timeout), como as do 10G.py, com IPs repetidos em
+# parte das entradas (o mesmo scanner em várias listas e dias).
+def gerar_entradas(quantidade, semente=42):
+    aleatorio = random.Random(semente)
+    distintos = max(1, quantidade * 3 // 4)
+    for _ in range(quantidade):
+        numero = aleatorio.randrange(distintos)
+        ip = f"{1 + numero % 223}.{numero >> 8 & 255}.{numero >> 16 & 255}.{1 + numero % 254}"
+        data = f"2024-12-{aleatorio.randint(1, 30):02d}"
+        hora = f"{aleatorio.randint(0, 23):02d}:{aleatorio.randint(0, 59):02d}:{aleatorio.randint(0, 59):02d}"
+        timeout = f"{aleatorio.randint(1, 4)}w{aleatorio.randint(0, 6)}d{aleatorio.randint(0, 23)}h" if aleatorio.random() < 0.8 else "Sem Timeout"
+        yield ip, data, hora, timeout
+
+# Resultado sintético da geolocalização de um IP: (cidade, estado, país, cep, provedor). Como nas
+# respostas das APIs, cada resultado tem os seus próprios objetos de texto.
+def resultado_sintetico(ip):
+    aleatorio = random.Random(ip)
+    pais = aleatorio.choice(PAISES)
+    if pais == "Desconhecido":
+        return ("Desconhecida", "Desconhecido", "Desconhecido", "Desconhecido", "Desconhecido")
+    return (f"Cidade {aleatorio.randint(1, 500)}", f"Estado {aleatorio.randint(1, 50)}", pais, f"{aleatorio.randint(0, 99999):05d}", aleatorio.choice(PROVEDORES))
+
+# --- Representações Comparadas ---
+
+# Formato antigo do 10G.py: um dicionário com 12 chaves por entrada, completado com a geolocalização
+# e convertido em DataFrame.
+def dicionarios(quantidade):
+    dados = []
+    for ip, data, hora, timeout in gerar_entradas(quantidade):
+        dados.append({"IP": ip, "Data": data, "Hora": hora, "Timeout": timeout, "Provedor": "Desconhecido", "Email Provedor": EMAIL_NAO_DISPONIVEL})
+    resultados = {ip: resultado_sintetico(ip) for ip in dict.fromkeys(entrada["IP"] for entrada in dados)}
+    for entrada in dados:
+        cidade, estado, pais, cep, provedor = resultados[entrada["IP"]]
+        entrada.update({"Cidade": cidade, "Estado": estado, "País": pais, "CEP": cep, "Provedor": provedor})
+        entrada["Província"] = estado
+        entrada["Bairro"] = cidade if cidade != "Desconhecida" else "Desconhecido"
+    return pd.DataFrame(dados)
+
+# Colunas codificadas (registros.TabelaEntradas): a geolocalização é guardada uma vez por IP distinto,
+# com os valores repetidos compartilhados entre os resultados, como faz 'consultar_em_paralelo'.
+def tabela_compacta(quantidade):
+    entradas = TabelaEntradas()
+    for ip, data, hora, timeout in gerar_entradas(quantidade):
+        entradas.adicionar(ip, data, hora, timeout)
+    valores = {}
+    resultados = {
+        ip: tuple(valores.setdefault(valor, valor) for valor in resultado_sintetico(ip))
+        for ip in entradas.ips()
+    }
+    return entradas.dataframe(resultados)
+
+# Monta o DataFrame no processo atual e devolve (entradas, segundos, aumento do pico de memória em MB
+# ou None, memória do DataFrame em MB). O pico já atingido pelo interpretador e pelo pandas é descontado.
+def _executar(funcao, quantidade):
+    inicial = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None
+    inicio = time.perf_counter()
+    df = funcao(quantidade)
+    duracao = time.perf_counter() - inicio
+    pico = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - inicial) / 1024 if resource else None
+    return len(df), duracao, pico, df.memory_usage(deep=True).sum() / 1024 / 1024
+
+def medir(descricao, funcao, quantidade):
+    # Um processo novo por representação: a memória de uma não contamina a medição da outra.
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        linhas, duracao, pico, memoria_df = executor.submit(_executar, funcao, quantidade).result()
+    memoria = f"{pico:8.0f} MB" if pico is not None else "       -"
+    print(f"{descricao:<28} {linhas:>10} entradas  {duracao:7.2f} s  pico {memoria}  DataFrame {memoria_df:8.0f} MB")
+    return pico
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de memória das representações das entradas enriquecidas do 10G.py.")
+    parser.add_argument("--entradas", type=int, default=1_000_000, help="Quantidade de entradas sintéticas.")
+    args = parser.parse_args()
+
+    pico_antigo = medir("Dicionário por entrada", dicionarios, args.entradas)
+    pico_novo = medir("Colunas codificadas", tabela_compacta, args.entradas)
+    if pico_antigo and pico_novo:
+        print(f"Redução do pico de memória: {pico_antigo / pico_novo:.1f}x")
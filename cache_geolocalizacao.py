@@ -0,0 +1,117 @@
+import sqlite3  # Banco de dados local usado para guardar os resultados das consultas entre execuções.
+import threading  # Módulo para proteger a conexão quando várias threads consultam o cache.
+import time  # Módulo para registrar o momento de cada consulta e calcular a validade (TTL).
+
+# --- Configurações do Cache ---
+
+# Arquivo SQLite compartilhado por todos os scripts (10G.py, V6.py, V5.py, ok10e.py...).
+ARQUIVO_CACHE_PADRAO = "geolocalizacao_cache.sqlite3"
+
+# Tempo de validade padrão de cada resultado guardado: 30 dias, em segundos.
+TTL_PADRAO = 30 * 24 * 60 * 60
+
+# Validades menores para os resultados incompletos, que também são servidos pelo cache (uma nova
+# execução sobre a mesma exportação não volta às APIs), mas são consultados de novo mais cedo:
+# IP que nenhuma API localizou (país "Desconhecido"), 1 dia, e IP localizado sem o nome do provedor, 7 dias.
+TTL_NEGATIVO_PADRAO = 24 * 60 * 60
+TTL_SEM_PROVEDOR_PADRAO = 7 * 24 * 60 * 60
+
+# Colunas gravadas, na ordem dos valores dos INSERTs.
+COLUNAS = "ip, cidade, estado, pais, cep, provedor, consultado_em, validade"
+
+# Cache persistente em disco dos resultados de geolocalização, indexado pelo IP.
+# Guarda a tupla normalizada (cidade, estado, pais, cep, provedor) e o momento da consulta.
+# Resultados mais antigos que a validade são tratados como ausentes e consultados novamente. A
+# validade depende do resultado (completo, sem provedor ou não localizado), a não ser que tenha
+# sido informada na gravação (coluna 'validade', em segundos).
+class CacheGeolocalizacao:
+    def __init__(self, caminho=ARQUIVO_CACHE_PADRAO, ttl=TTL_PADRAO, ttl_negativo=TTL_NEGATIVO_PADRAO, ttl_sem_provedor=TTL_SEM_PROVEDOR_PADRAO):
+        self.caminho = caminho
+        self.ttl = ttl
+        self.ttl_negativo = ttl_negativo
+        self.ttl_sem_provedor = ttl_sem_provedor
+        # Contadores de acertos (IP encontrado e válido) e faltas (IP ausente ou expirado).
+        self.acertos = 0
+        self.faltas = 0
+        self._trava = threading.Lock()
+        # 'check_same_thread=False' permite usar a mesma conexão a partir do pool de threads;
+        # o acesso é serializado pela trava acima.
+        self._conexao = sqlite3.connect(caminho, timeout=30, check_same_thread=False)
+        # O modo WAL permite que vários scripts leiam o cache enquanto outro grava.
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.execute(
+            """CREATE TABLE IF NOT EXISTS geolocalizacao (
+                ip TEXT PRIMARY KEY,
+                cidade TEXT,
+                estado TEXT,
+                pais TEXT,
+                cep TEXT,
+                provedor TEXT,
+                consultado_em REAL,
+                validade REAL
+            )"""
+        )
+        # Caches criados antes da coluna 'validade' ganham a coluna vazia (validade pelo resultado).
+        colunas = {linha[1] for linha in self._conexao.execute("PRAGMA table_info(geolocalizacao)")}
+        if "validade" not in colunas:
+            self._conexao.execute("ALTER TABLE geolocalizacao ADD COLUMN validade REAL")
+        self._conexao.commit()
+
+    # Validade, em segundos, de um resultado gravado sem validade própria.
+    def _validade(self, resultado):
+        if resultado[2] == "Desconhecido":
+            return self.ttl_negativo
+        if resultado[4] == "Desconhecido":
+            return min(self.ttl, self.ttl_sem_provedor)
+        return self.ttl
+
+    # Retorna a tupla (cidade, estado, pais, cep, provedor) guardada para o IP, ou None. Um IP não
+    # localizado também é um acerto: volta com o país "Desconhecido" enquanto estiver na validade.
+    def obter(self, ip):
+        agora = time.time()
+        with self._trava:
+            linha = self._conexao.execute(
+                "SELECT cidade, estado, pais, cep, provedor, consultado_em, validade FROM geolocalizacao WHERE ip = ?",
+                (ip,),
+            ).fetchone()
+            if linha is None or agora - linha[5] > (linha[6] if linha[6] is not None else self._validade(linha)):
+                self.faltas += 1
+                return None
+            self.acertos += 1
+            return tuple(linha[:5])
+
+    # Guarda (ou substitui) o resultado de um IP com o momento atual. 'validade', se informada,
+    # substitui a validade pelo tipo de resultado (em segundos).
+    def gravar(self, ip, resultado, validade=None):
+        with self._trava:
+            self._conexao.execute(
+                f"INSERT OR REPLACE INTO geolocalizacao ({COLUNAS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (ip, *resultado, time.time(), validade),
+            )
+            self._conexao.commit()
+
+    # Guarda vários resultados de uma vez ({ip: tupla}), com o momento atual, em uma única transação.
+    # Com 'substituir=False', os IPs que já estão no cache mantêm o resultado guardado.
+    # Retorna quantos IPs foram gravados.
+    def gravar_varios(self, resultados, substituir=True, validade=None):
+        agora = time.time()
+        comando = "INSERT OR REPLACE" if substituir else "INSERT OR IGNORE"
+        with self._trava:
+            antes = self._conexao.total_changes
+            self._conexao.executemany(
+                f"{comando} INTO geolocalizacao ({COLUNAS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ((ip, *resultado, agora, validade) for ip, resultado in resultados.items()),
+            )
+            self._conexao.commit()
+            return self._conexao.total_changes - antes
+
+    # Texto com os contadores de acertos e faltas, para exibir ao final da execução.
+    def resumo(self):
+        total = self.acertos + self.faltas
+        percentual = (self.acertos / total * 100) if total else 0
+        return f"Cache de geolocalização: {self.acertos} acertos, {self.faltas} faltas ({percentual:.1f}% de acerto)"
+
+    def fechar(self):
+        with self._trava:
+            self._conexao.close()
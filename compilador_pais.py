@@ -0,0 +1,95 @@
+import argparse  # Base de faixas, política (países e estados) e opções do script gerado.
+import os  # Verificação da base informada.
+import time  # Tempo de cada etapa da compilação.
+
+import numpy as np  # Seleção das faixas por código de país/estado e contagem de endereços.
+
+from base_offline import (
+    BaseGeolocalizacaoOffline,  # Mesma base de faixas usada pela geolocalização offline.
+)
+from enderecos import (  # Junção das faixas e decomposição em blocos CIDR.
+    faixas_para_cidrs,
+    unir_faixas,
+)
+from gerador_bloqueio import (  # Mesma política e formato de script.
+    descricao_regra,
+    escrever_script,
+    montar_politica,
+)
+
+# --- Compilador de Faixas de País/Estado em Blocos CIDR ---
+
+# Nome padrão da address-list do bloqueio de países inteiros.
+LISTA_PADRAO = "BLOQUEIO_PAIS"
+
+# Máscara das faixas da base selecionadas por cada regra da política (ver gerador_bloqueio.montar_politica).
+# A comparação é feita uma vez por nome distinto de país/estado e aplicada aos códigos de todas as
+# faixas de uma vez. Cada faixa fica só na primeira regra que a seleciona.
+def selecionar_faixas(base, regras):
+    paises = np.array([str(nome).casefold() for nome in base.categorias["pais"]], dtype=object)
+    estados = np.array([str(nome).casefold() for nome in base.categorias["estado"]], dtype=object)
+    livres = np.ones(len(base), dtype=bool)
+    mascaras = []
+    for tipo, nome, pais in regras:
+        if tipo == "País":
+            mascara = np.isin(base.codigos["pais"], np.flatnonzero(paises == nome.casefold()))
+        else:
+            mascara = np.isin(base.codigos["estado"], np.flatnonzero(estados == nome.casefold()))
+            if pais:
+                mascara &= np.isin(base.codigos["pais"], np.flatnonzero(paises == pais.casefold()))
+        mascara &= livres
+        livres &= ~mascara
+        mascaras.append(mascara)
+    return mascaras
+
+# Compila as faixas de cada regra no menor conjunto de blocos CIDR que as cobre exatamente.
+# Retorna [(redes, prefixos)] e [(regra, faixas da base, faixas após a junção, blocos, endereços)].
+def compilar(base, regras):
+    blocos, contagens = [], []
+    for regra, mascara in zip(regras, selecionar_faixas(base, regras)):
+        inicios, fins = unir_faixas(base.inicios[mascara], base.fins[mascara])
+        redes, prefixos = faixas_para_cidrs(inicios, fins)
+        blocos.append((redes, prefixos))
+        contagens.append((regra, int(mascara.sum()), len(inicios), len(redes), int((fins - inicios + 1).sum())))
+    return blocos, contagens
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compila as faixas de IP de países/estados inteiros em um script .rsc de blocos CIDR.")
+    parser.add_argument("base", help="CSV de faixas de IP (inicio,fim,cidade,estado,pais,...), o mesmo formato da base offline")
+    parser.add_argument("--pais", action="append", default=[], help="bloquear todas as faixas deste país (pode repetir)")
+    parser.add_argument("--estado", action="append", default=[], help="bloquear todas as faixas deste estado, ou País/Estado (pode repetir)")
+    parser.add_argument("--listar", action="store_true", help="listar os países da base com a quantidade de faixas e sair")
+    parser.add_argument("--lista", default=LISTA_PADRAO, help=f"address-list de destino (padrão: {LISTA_PADRAO})")
+    parser.add_argument("--timeout", help="timeout das entradas no roteador (ex.: 4w); sem ele, as entradas são permanentes")
+    parser.add_argument("--substituir", action="store_true", help="remover as entradas atuais da lista antes de adicionar as novas")
+    parser.add_argument("--saida", default="bloqueio_pais.rsc", help="script gerado (padrão: bloqueio_pais.rsc)")
+    argumentos = parser.parse_args()
+    if not argumentos.listar and not argumentos.pais and not argumentos.estado:
+        parser.error("informe ao menos um --pais ou --estado (ou --listar)")
+    if not os.path.exists(argumentos.base):
+        print(f"Erro: O arquivo '{argumentos.base}' não foi encontrado.")
+        raise SystemExit(1)
+
+    inicio = time.perf_counter()
+    base = BaseGeolocalizacaoOffline(argumentos.base)
+    print(f"Base carregada: {len(base)} faixas de IP em {time.perf_counter() - inicio:.1f} s.")
+
+    if argumentos.listar:
+        quantidades = np.bincount(base.codigos["pais"], minlength=len(base.categorias["pais"]))
+        for codigo in np.argsort(-quantidades, kind="stable"):
+            print(f"{base.categorias['pais'][codigo]:<40} {quantidades[codigo]:>10} faixas")
+        raise SystemExit
+
+    inicio = time.perf_counter()
+    regras = montar_politica(argumentos.pais, argumentos.estado)
+    blocos, contagens = compilar(base, regras)
+    duracao = time.perf_counter() - inicio
+    escrever_script(argumentos.saida, regras, blocos, argumentos.lista, argumentos.timeout, argumentos.substituir, origem="compilador_pais.py")
+
+    for regra, faixas, unidas, quantidade_blocos, enderecos in contagens:
+        aviso = "  (nenhuma faixa encontrada: confira o nome com --listar)" if faixas == 0 else ""
+        print(f"{descricao_regra(regra):<40} {faixas:>9} faixas -> {unidas:>9} após a junção -> {quantidade_blocos:>9} blocos CIDR ({enderecos} endereços){aviso}")
+    total_faixas = sum(faixas for _, faixas, _, _, _ in contagens)
+    total_blocos = sum(quantidade for _, _, _, quantidade, _ in contagens)
+    print(f"{'Total':<40} {total_faixas:>9} faixas -> {total_blocos:>9} blocos CIDR, compilados em {duracao:.2f} s")
+    print(f"Script salvo em: {argumentos.saida} (importe no roteador com /import file-name={os.path.basename(argumentos.saida)})")
@@ -0,0 +1,67 @@
+import json  # Cada resultado é gravado como uma linha JSON independente (formato JSON Lines).
+import os  # Módulo para verificar e remover o arquivo do diário.
+import threading  # Módulo para proteger o arquivo quando várias threads registram resultados.
+
+# --- Diário de Consultas (Checkpoint) ---
+
+# Diário em disco dos resultados de geolocalização de uma execução longa.
+# Cada IP localizado é acrescentado ao arquivo assim que a consulta termina, e o arquivo
+# é descarregado (flush) a cada linha: se o script cair ou a rede cair no meio da lista,
+# uma nova execução com '--resume' recarrega o diário e consulta apenas os IPs que faltam.
+class DiarioConsultas:
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._arquivo = None
+        self._modo = "w"
+        self._trava = threading.Lock()
+
+    # Lê os resultados já gravados. Retorna um dicionário {ip: (cidade, estado, pais, cep, provedor)}.
+    # Uma última linha incompleta (gravação interrompida no meio) é ignorada.
+    def carregar(self):
+        resultados = {}
+        if not os.path.exists(self.caminho):
+            return resultados
+        with open(self.caminho, "r", encoding="utf-8") as arquivo:
+            for linha in arquivo:
+                try:
+                    registro = json.loads(linha)
+                except ValueError:
+                    continue
+                resultados[registro["ip"]] = tuple(registro["resultado"])
+        return resultados
+
+    # Indica se o diário existe e tem algum resultado gravado (de uma execução interrompida).
+    def tem_resultados(self):
+        return os.path.exists(self.caminho) and os.path.getsize(self.caminho) > 0
+
+    # Prepara o diário para acrescentar resultados, em um bloco 'with': o arquivo é aberto ao entrar
+    # e fechado ao sair, mesmo que as consultas sejam interrompidas. Com 'continuar=False' o diário
+    # anterior é descartado.
+    def abrir(self, continuar=False):
+        self._modo = "a" if continuar else "w"
+        return self
+
+    def __enter__(self):
+        self._arquivo = open(self.caminho, self._modo, encoding="utf-8")
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    # Acrescenta o resultado de um IP ao diário e o descarrega imediatamente no disco.
+    def registrar(self, ip, resultado):
+        linha = json.dumps({"ip": ip, "resultado": list(resultado)}, ensure_ascii=False)
+        with self._trava:
+            self._arquivo.write(linha + "\n")
+            self._arquivo.flush()
+
+    def fechar(self):
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+    # Fecha e apaga o diário: chamado quando o relatório foi salvo e o checkpoint não é mais necessário.
+    def concluir(self):
+        self.fechar()
+        if os.path.exists(self.caminho):
+            os.remove(self.caminho)
@@ -0,0 +1,198 @@
+import argparse  # Exportações comparadas, filtro de listas e arquivo de saída.
+import os  # Verificação das exportações e nome do arquivo de saída.
+import time  # Tempo de leitura e de comparação.
+from datetime import datetime  # Carimbo de data e hora no nome do relatório.
+
+import numpy as np  # Chaves (lista, IP, prefixo) em arrays int64 e junção das duas exportações.
+import pandas as pd  # Conjunto de mudanças e deltas por País/Estado no relatório.
+
+from cache_geolocalizacao import (  # Geolocalização já conhecida dos IPs.
+    ARQUIVO_CACHE_PADRAO,
+    CacheGeolocalizacao,
+)
+from enderecos import textos_cidr  # Texto dos endereços e redes das entradas alteradas.
+from leitor_colunar import (  # Exportações em arrays e timeouts em segundos.
+    decodificar_timeouts,
+    ler_exportacao_colunar,
+)
+
+# --- Diferença entre Exportações das Address-Lists ---
+
+# Maior quantidade de linhas de uma aba do Excel; conjuntos de mudanças maiores vão para CSV.
+LINHAS_MAXIMAS_EXCEL = 1_048_575
+
+# Resultado da comparação: índices (nas exportações anterior e atual) das entradas removidas,
+# adicionadas, renovadas e mantidas sem mudança.
+class DiferencaExportacoes:
+    def __init__(self, anterior, atual, removidas, adicionadas, pares_anterior, pares_atual, renovadas):
+        self.anterior = anterior
+        self.atual = atual
+        self.removidas = removidas
+        self.adicionadas = adicionadas
+        self.pares_anterior = pares_anterior
+        self.pares_atual = pares_atual
+        self.renovadas = renovadas
+
+    def resumo(self):
+        mantidas = len(self.pares_atual) - int(self.renovadas.sum())
+        return (
+            f"Entradas: {len(self.anterior)} -> {len(self.atual)}. Adicionadas: {len(self.adicionadas)}, "
+            f"removidas (expiradas ou apagadas): {len(self.removidas)}, timeout renovado: {int(self.renovadas.sum())}, "
+            f"sem mudança: {mantidas}."
+        )
+
+    # Conjunto compacto de mudanças: uma linha por entrada adicionada, removida ou renovada.
+    def mudancas(self):
+        partes = [
+            self._tabela("Removida", self.anterior, self.removidas, None, None),
+            self._tabela("Adicionada", self.atual, self.adicionadas, None, None),
+            self._tabela("Renovada", self.atual, self.pares_atual[self.renovadas], self.anterior, self.pares_anterior[self.renovadas]),
+        ]
+        return pd.concat(partes, ignore_index=True)
+
+    @staticmethod
+    def _tabela(mudanca, exportacao, indices, exportacao_anterior, indices_anteriores):
+        tabela = pd.DataFrame({
+            "Mudança": mudanca,
+            "Lista": np.asarray(exportacao.listas, dtype=object)[exportacao.codigos_lista[indices]] if len(exportacao.listas) else [],
+            "Endereço": textos_cidr(exportacao.ips[indices], exportacao.prefixos[indices]),
+            "Criação": exportacao.criacao[indices],
+            "Timeout": np.char.decode(exportacao.timeouts[indices].astype("S"), "ascii"),
+        })
+        if exportacao_anterior is not None:
+            tabela["Criação Anterior"] = exportacao_anterior.criacao[indices_anteriores]
+            tabela["Timeout Anterior"] = np.char.decode(exportacao_anterior.timeouts[indices_anteriores].astype("S"), "ascii")
+        return tabela
+
+# Chave int64 de cada entrada: código global da lista (bits 40 em diante), IP (bits 8 a 39) e
+# prefixo (bits 0 a 7), de modo que a ordem das chaves é a ordem (lista, IP, prefixo).
+# Retorna as chaves ordenadas e o índice de cada uma na exportação; entradas repetidas na
+# mesma exportação ficam só uma vez.
+def _chaves_ordenadas(exportacao, codigos_globais):
+    chaves = (
+        (codigos_globais[exportacao.codigos_lista].astype(np.int64) << 40)
+        | (exportacao.ips.astype(np.int64) << 8)
+        | exportacao.prefixos.astype(np.int64)
+    )
+    ordem = np.argsort(chaves, kind="stable")
+    chaves = chaves[ordem]
+    unicas = np.concatenate(([True], chaves[1:] != chaves[:-1])) if len(chaves) else np.zeros(0, dtype=bool)
+    return chaves[unicas], ordem[unicas]
+
+# Data de expiração (CREATION-TIME + timeout) das entradas 'indices'; NaT para as entradas sem timeout.
+def _expiracao(exportacao, indices):
+    segundos = decodificar_timeouts(exportacao.timeouts[indices])
+    criacao = exportacao.criacao[indices]
+    return np.where(segundos >= 0, criacao + np.maximum(segundos, 0).astype("timedelta64[s]"), np.datetime64("NaT"))
+
+# Compara duas exportações (ExportacaoColunar). As duas são ordenadas por (lista, IP, prefixo) e
+# juntadas em uma única passada: as chaves ordenadas de cada uma são concatenadas e a ordenação
+# estável (timsort) só intercala as duas sequências já ordenadas, em tempo linear. Chaves iguais
+# ficam lado a lado, a da exportação anterior primeiro. Uma entrada presente nas duas é
+# "renovada" quando foi recriada (CREATION-TIME diferente) ou quando a expiração passou a ser mais tarde.
+def comparar_exportacoes(anterior, atual):
+    nomes = sorted(set(anterior.listas) | set(atual.listas))
+    codigo_do_nome = {nome: codigo for codigo, nome in enumerate(nomes)}
+    codigos_anterior = np.array([codigo_do_nome[nome] for nome in anterior.listas], dtype=np.int64)
+    codigos_atual = np.array([codigo_do_nome[nome] for nome in atual.listas], dtype=np.int64)
+    chaves_anterior, indices_anterior = _chaves_ordenadas(anterior, codigos_anterior)
+    chaves_atual, indices_atual = _chaves_ordenadas(atual, codigos_atual)
+
+    juntas = np.concatenate((chaves_anterior, chaves_atual))
+    ordem = np.argsort(juntas, kind="stable")
+    juntas = juntas[ordem]
+    # Posições (na sequência intercalada) onde a chave se repete: o par anterior/atual da mesma entrada.
+    pares = np.flatnonzero(juntas[1:] == juntas[:-1])
+    emparelhadas = np.zeros(len(juntas), dtype=bool)
+    emparelhadas[pares] = True
+    emparelhadas[pares + 1] = True
+    sozinhas = ordem[~emparelhadas]
+    separacao = len(chaves_anterior)
+    removidas = indices_anterior[sozinhas[sozinhas < separacao]]
+    adicionadas = indices_atual[sozinhas[sozinhas >= separacao] - separacao]
+    pares_anterior = indices_anterior[ordem[pares]]
+    pares_atual = indices_atual[ordem[pares + 1] - separacao]
+
+    # Com o mesmo CREATION-TIME e o mesmo texto de timeout a expiração é a mesma: só os pares em que
+    # o texto do timeout mudou precisam ser decodificados.
+    renovadas = anterior.criacao[pares_anterior] != atual.criacao[pares_atual]
+    comparar = ~renovadas & (anterior.timeouts[pares_anterior] != atual.timeouts[pares_atual])
+    renovadas[comparar] = _expiracao(atual, pares_atual[comparar]) > _expiracao(anterior, pares_anterior[comparar])
+    return DiferencaExportacoes(anterior, atual, removidas, adicionadas, pares_anterior, pares_atual, renovadas)
+
+# Deltas por País e por País/Estado das mudanças, com a geolocalização já guardada no cache
+# (IPs ainda não consultados ficam como "Desconhecido"). 'Saldo' = adicionadas - removidas.
+def deltas_por_localizacao(mudancas, cache):
+    localizacoes = {}
+    for endereco in mudancas["Endereço"].unique():
+        resultado = cache.obter(endereco.partition("/")[0])
+        localizacoes[endereco] = (resultado[2], resultado[1]) if resultado else ("Desconhecido", "Desconhecido")
+    mudancas = mudancas.assign(
+        País=mudancas["Endereço"].map(lambda endereco: localizacoes[endereco][0]),
+        Estado=mudancas["Endereço"].map(lambda endereco: localizacoes[endereco][1]),
+    )
+
+    def contar(colunas):
+        tabela = pd.crosstab([mudancas[coluna] for coluna in colunas], mudancas["Mudança"])
+        for mudanca in ("Adicionada", "Removida", "Renovada"):
+            if mudanca not in tabela.columns:
+                tabela[mudanca] = 0
+        tabela = tabela[["Adicionada", "Removida", "Renovada"]].rename(
+            columns={"Adicionada": "Adicionadas", "Removida": "Removidas", "Renovada": "Renovadas"}
+        )
+        tabela["Saldo"] = tabela["Adicionadas"] - tabela["Removidas"]
+        return tabela.sort_values("Saldo", ascending=False, kind="stable").reset_index()
+
+    return contar(["País"]), contar(["País", "Estado"])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mostra o que mudou entre duas exportações das address-lists do RouterOS.")
+    parser.add_argument("anterior", help="exportação mais antiga (ex.: portascan-list-2024-12-29.txt)")
+    parser.add_argument("atual", help="exportação mais recente")
+    parser.add_argument("--alvo", help="comparar só as listas cujo nome contém este texto (ex.: PORTASCAN)")
+    parser.add_argument("--cache", default=ARQUIVO_CACHE_PADRAO, help=f"cache de geolocalização usado nos deltas por país (padrão: {ARQUIVO_CACHE_PADRAO})")
+    parser.add_argument("--saida", help="relatório em Excel (padrão: Diferenca_Exportacoes_<data>.xlsx)")
+    argumentos = parser.parse_args()
+    for caminho in (argumentos.anterior, argumentos.atual):
+        if not os.path.exists(caminho):
+            print(f"Erro: O arquivo '{caminho}' não foi encontrado.")
+            raise SystemExit(1)
+
+    inicio = time.perf_counter()
+    anterior = ler_exportacao_colunar(argumentos.anterior)
+    atual = ler_exportacao_colunar(argumentos.atual)
+    if argumentos.alvo:
+        anterior = anterior.filtrar(anterior.mascara_listas(lambda nome: argumentos.alvo in nome))
+        atual = atual.filtrar(atual.mascara_listas(lambda nome: argumentos.alvo in nome))
+    leitura = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    diferenca = comparar_exportacoes(anterior, atual)
+    comparacao = time.perf_counter() - inicio
+    print(f"Leitura em {leitura:.2f} s, comparação em {comparacao:.2f} s.")
+    print(diferenca.resumo())
+
+    mudancas = diferenca.mudancas()
+    cache = CacheGeolocalizacao(argumentos.cache)
+    delta_pais, delta_estado = deltas_por_localizacao(mudancas, cache)
+    cache.fechar()
+    print(delta_pais.head(10).to_string(index=False))
+
+    arquivo_saida = argumentos.saida or f"Diferenca_Exportacoes_{datetime.now():%Y-%m-%d_%H-%M-%S}.xlsx"
+    resumo = pd.DataFrame({
+        "Item": ["Exportação anterior", "Exportação atual", "Entradas antes", "Entradas depois", "Adicionadas", "Removidas", "Renovadas"],
+        "Valor": [
+            argumentos.anterior, argumentos.atual, len(anterior), len(atual),
+            len(diferenca.adicionadas), len(diferenca.removidas), int(diferenca.renovadas.sum()),
+        ],
+    })
+    with pd.ExcelWriter(arquivo_saida, engine="openpyxl") as writer:
+        resumo.to_excel(writer, sheet_name="Resumo", index=False)
+        if len(mudancas) <= LINHAS_MAXIMAS_EXCEL:
+            mudancas.to_excel(writer, sheet_name="Mudanças", index=False)
+        delta_pais.to_excel(writer, sheet_name="Delta por País", index=False)
+        delta_estado.to_excel(writer, sheet_name="Delta por Estado", index=False)
+    if len(mudancas) > LINHAS_MAXIMAS_EXCEL:
+        arquivo_mudancas = os.path.splitext(arquivo_saida)[0] + "_mudancas.csv"
+        mudancas.to_csv(arquivo_mudancas, index=False)
+        print(f"Mudanças demais para uma aba do Excel: salvas em {arquivo_mudancas}")
+    print(f"Relatório salvo com sucesso em: {arquivo_saida}")
@@ -0,0 +1,154 @@
+import re  # Módulo para validar o formato dos endereços IPv4 antes da conversão.
+
+import numpy as np  # Biblioteca para operações vetorizadas com os endereços convertidos em inteiros.
+
+# --- Conversão de Endereços IPv4 ---
+
+# Converte um endereço IPv4 em texto ("203.0.113.10") para inteiro sem sinal de 32 bits.
+def ip_para_int(ip):
+    a, b, c, d = ip.split(".")
+    return (int(a) << 24) | (int(b) << 16) | (int(c) << 8) | int(d)
+
+# Converte um inteiro de 32 bits de volta para o texto do endereço IPv4.
+def int_para_ip(valor):
+    valor = int(valor)
+    return f"{valor >> 24 & 255}.{valor >> 16 & 255}.{valor >> 8 & 255}.{valor & 255}"
+
+# Converte uma sequência de endereços IPv4 em texto para um array uint32, sem laço Python por IP:
+# todos os octetos são separados de uma vez e combinados com operações vetorizadas.
+def ips_para_uint32(ips):
+    ips = list(ips)
+    if not ips:
+        return np.empty(0, dtype=np.uint32)
+    octetos = np.array(".".join(ips).split("."), dtype=np.uint32).reshape(-1, 4)
+    return (octetos[:, 0] << 24) | (octetos[:, 1] << 16) | (octetos[:, 2] << 8) | octetos[:, 3]
+
+# Converte uma rede em notação CIDR ("192.168.0.0/16") na faixa (primeiro, último) de inteiros de 32 bits.
+def cidr_para_faixa(cidr):
+    endereco, _, prefixo = cidr.partition("/")
+    prefixo = int(prefixo) if prefixo else 32
+    tamanho = 1 << (32 - prefixo)
+    inicio = ip_para_int(endereco) & ~(tamanho - 1) & 0xFFFFFFFF
+    return inicio, inicio + tamanho - 1
+
+# Textos de redes ("1.2.3.0/24") a partir de arrays de redes e prefixos; um único endereço (/32)
+# fica sem o prefixo, como no RouterOS. Os textos dos octetos e dos sufixos são montados uma única
+# vez, para os scripts com centenas de milhares de blocos.
+_TEXTOS_OCTETOS = [str(octeto) for octeto in range(256)]
+_TEXTOS_PREFIXOS = [f"/{prefixo}" for prefixo in range(32)] + [""]
+
+def textos_cidr(redes, prefixos):
+    o, p = _TEXTOS_OCTETOS, _TEXTOS_PREFIXOS
+    return [
+        f"{o[rede >> 24]}.{o[rede >> 16 & 255]}.{o[rede >> 8 & 255]}.{o[rede & 255]}{p[prefixo]}"
+        for rede, prefixo in zip(np.asarray(redes, dtype=np.int64).tolist(), np.asarray(prefixos).tolist())
+    ]
+
+# --- Agregação em Blocos CIDR ---
+
+# Junta faixas [inicio, fim] que se sobrepõem ou são vizinhas (o fim de uma encosta no início da
+# próxima). Retorna (inicios, fins) em int64, ordenados e sem sobreposição, sem laço por faixa.
+def unir_faixas(inicios, fins):
+    inicios = np.asarray(inicios, dtype=np.int64)
+    fins = np.asarray(fins, dtype=np.int64)
+    if len(inicios) == 0:
+        return inicios, fins
+    ordem = np.argsort(inicios, kind="stable")
+    inicios, fins = inicios[ordem], fins[ordem]
+    maiores_fins = np.maximum.accumulate(fins)
+    # Uma faixa começa um bloco novo quando não encosta em nenhuma das anteriores.
+    novos = np.concatenate(([True], inicios[1:] > maiores_fins[:-1] + 1))
+    posicoes = np.flatnonzero(novos)
+    return inicios[posicoes], np.maximum.reduceat(fins, posicoes)
+
+# Decompõe cada faixa [inicio, fim] no menor conjunto de blocos CIDR que a cobre exatamente.
+# A cada passo, todas as faixas pendentes emitem de uma vez o maior bloco alinhado que cabe no
+# início delas; uma faixa precisa de no máximo 62 blocos, então são no máximo 62 passos
+# vetorizados, qualquer que seja a quantidade de faixas. Retorna (redes uint32, prefixos uint8)
+# ordenados pelo endereço, para faixas já sem sobreposição (ex.: saída de unir_faixas).
+def faixas_para_cidrs(inicios, fins):
+    inicios = np.asarray(inicios, dtype=np.int64)
+    fins = np.asarray(fins, dtype=np.int64)
+    redes, prefixos = [], []
+    while len(inicios):
+        # Maior potência de 2 que divide o início (o alinhamento; 2^32 para o endereço 0) e maior
+        # potência de 2 que cabe no restante da faixa.
+        alinhamento = np.where(inicios == 0, 1 << 32, inicios & -inicios)
+        cabe = np.left_shift(1, np.frexp((fins - inicios + 1).astype(np.float64))[1].astype(np.int64) - 1)
+        tamanhos = np.minimum(alinhamento, cabe)
+        redes.append(inicios)
+        prefixos.append(32 - (np.frexp(tamanhos.astype(np.float64))[1] - 1))
+        inicios = inicios + tamanhos
+        restantes = inicios <= fins
+        inicios, fins = inicios[restantes], fins[restantes]
+    if not redes:
+        return np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.uint8)
+    redes = np.concatenate(redes)
+    prefixos = np.concatenate(prefixos)
+    ordem = np.argsort(redes, kind="stable")
+    return redes[ordem].astype(np.uint32), prefixos[ordem].astype(np.uint8)
+
+# Agrega endereços IPv4 (uint32) no menor conjunto de blocos CIDR que cobre exatamente os mesmos
+# endereços: repetidos são descartados e endereços vizinhos viram faixas antes da decomposição.
+def agregar_enderecos(enderecos):
+    enderecos = np.unique(np.asarray(enderecos, dtype=np.int64))
+    return faixas_para_cidrs(*unir_faixas(enderecos, enderecos))
+
+# --- Endereços Privados e Reservados ---
+
+# Valor usado no campo País para endereços que nunca têm geolocalização.
+PAIS_ENDERECO_ESPECIAL = "Privado/Reservado"
+
+# Faixas IPv4 que não pertencem a nenhum provedor na internet pública (RFC 1918, RFC 3330/5735,
+# RFC 6598 e espaço de multicast/reservado). Consultar esses endereços nas APIs só gasta cota
+# e devolve "Desconhecido"; eles são classificados localmente. As faixas não se sobrepõem.
+FAIXAS_ESPECIAIS = [
+    ("0.0.0.0/8", "Esta rede (RFC 1122)"),
+    ("10.0.0.0/8", "Rede privada (RFC 1918)"),
+    ("100.64.0.0/10", "CGNAT (RFC 6598)"),
+    ("127.0.0.0/8", "Loopback (RFC 3330)"),
+    ("169.254.0.0/16", "Link local (RFC 3927)"),
+    ("172.16.0.0/12", "Rede privada (RFC 1918)"),
+    ("192.0.0.0/24", "Reservado IETF (RFC 5736)"),
+    ("192.0.2.0/24", "Documentação TEST-NET-1 (RFC 5737)"),
+    ("192.88.99.0/24", "Relay 6to4 (RFC 3068)"),
+    ("192.168.0.0/16", "Rede privada (RFC 1918)"),
+    ("198.18.0.0/15", "Testes de desempenho (RFC 2544)"),
+    ("198.51.100.0/24", "Documentação TEST-NET-2 (RFC 5737)"),
+    ("203.0.113.0/24", "Documentação TEST-NET-3 (RFC 5737)"),
+    ("224.0.0.0/4", "Multicast (RFC 5771)"),
+    ("240.0.0.0/4", "Reservado (RFC 1112)"),
+]
+
+# Rótulo dado a textos que não são um endereço IPv4 válido (ex.: "1.2.3" ou "300.1.1.1").
+ROTULO_ENDERECO_INVALIDO = "Endereço inválido"
+
+# Faixas pré-calculadas em arrays uint32 ordenados, para a busca binária de classificar_varios.
+_faixas_especiais = sorted(cidr_para_faixa(cidr) + (rotulo,) for cidr, rotulo in FAIXAS_ESPECIAIS)
+_inicios_especiais = np.array([inicio for inicio, _, _ in _faixas_especiais], dtype=np.uint32)
+_fins_especiais = np.array([fim for _, fim, _ in _faixas_especiais], dtype=np.uint32)
+_rotulos_especiais = np.array([rotulo for _, _, rotulo in _faixas_especiais], dtype=object)
+
+_padrao_ipv4 = re.compile(r"(?:(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)\.){3}(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)")
+
+# Classifica vários endereços de uma vez. Retorna um dicionário {ip: rótulo} apenas com os
+# endereços privados, reservados ou inválidos; os demais podem ser geolocalizados normalmente.
+def classificar_varios(ips):
+    especiais = {}
+    validos = []
+    for ip in dict.fromkeys(ips):
+        if _padrao_ipv4.fullmatch(ip):
+            validos.append(ip)
+        else:
+            especiais[ip] = ROTULO_ENDERECO_INVALIDO
+    if validos:
+        valores = ips_para_uint32(validos)
+        posicoes = np.searchsorted(_inicios_especiais, valores, side="right") - 1
+        dentro = (posicoes >= 0) & (valores <= _fins_especiais[np.maximum(posicoes, 0)])
+        for i in np.flatnonzero(dentro):
+            especiais[validos[i]] = _rotulos_especiais[posicoes[i]]
+    return especiais
+
+# Classifica um único endereço: retorna o rótulo da faixa especial (ou de endereço inválido), ou None.
+def classificar_endereco(ip):
+    return classificar_varios([ip]).get(ip)
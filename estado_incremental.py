@@ -0,0 +1,48 @@
+import json  # O estado é guardado em um arquivo JSON compacto.
+import os  # Módulo para verificar o arquivo e substituí-lo de forma atômica.
+
+# --- Estado da Última Exportação Processada ---
+
+# Estado compacto da última lista processada: a chave de cada entrada (lista, IP, CREATION-TIME)
+# e o resultado de geolocalização de cada IP. Com ele, a execução seguinte calcula quais entradas
+# foram adicionadas ou removidas na nova exportação e só consulta as adicionadas.
+class EstadoExportacao:
+    def __init__(self, caminho):
+        self.caminho = caminho
+
+    # Retorna (chaves, resultados): o conjunto de chaves (lista, ip, criacao) e o dicionário
+    # {ip: (cidade, estado, pais, cep, provedor)}. Sem estado anterior, ambos vêm vazios.
+    def carregar(self):
+        if not os.path.exists(self.caminho):
+            return set(), {}
+        with open(self.caminho, "r", encoding="utf-8") as arquivo:
+            estado = json.load(arquivo)
+        # As chaves são agrupadas por lista e por IP para não repetir os mesmos textos a cada entrada.
+        chaves = {
+            (lista, ip, criacao)
+            for lista, por_ip in estado["entradas"].items()
+            for ip, criacoes in por_ip.items()
+            for criacao in criacoes
+        }
+        resultados = {ip: tuple(resultado) for ip, resultado in estado["resultados"].items()}
+        return chaves, resultados
+
+    # Grava o estado da exportação atual. O arquivo é escrito ao lado e depois renomeado,
+    # para que uma interrupção no meio da gravação não corrompa o estado anterior.
+    def salvar(self, chaves, resultados):
+        entradas = {}
+        for lista, ip, criacao in sorted(chaves):
+            entradas.setdefault(lista, {}).setdefault(ip, []).append(criacao)
+        estado = {
+            "entradas": entradas,
+            "resultados": {ip: list(resultado) for ip, resultado in resultados.items()},
+        }
+        temporario = self.caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            json.dump(estado, arquivo, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temporario, self.caminho)
+
+# Compara as chaves da exportação anterior com as da atual.
+# Retorna (adicionadas, removidas), ambos conjuntos de chaves (lista, ip, criacao).
+def comparar_exportacoes(chaves_anteriores, chaves_atuais):
+    return chaves_atuais - chaves_anteriores, chaves_anteriores - chaves_atuais
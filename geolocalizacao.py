@@ -0,0 +1,536 @@
+import threading  # Módulo para controlar o acesso simultâneo às APIs (semáforos por provedor).
+import time  # Módulo para medir a latência de cada consulta.
+from collections import deque  # Janela limitada das latências mais recentes.
+from concurrent.futures import (  # Pool de threads para manter várias consultas em andamento.
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+
+import requests  # Exceções de rede e de timeout das requisições.
+
+from base_offline import (
+    BaseGeolocalizacaoOffline,  # Base local de faixas de IP, consultada sem rede.
+)
+from cache_geolocalizacao import (
+    CacheGeolocalizacao,  # Cache persistente em disco dos resultados.
+)
+from enderecos import (  # Endereços privados/reservados, resolvidos sem rede.
+    PAIS_ENDERECO_ESPECIAL,
+    classificar_endereco,
+    classificar_varios,
+)
+from limitador_taxa import (  # Limite de taxa (balde de fichas) por provedor.
+    aguardar_vez,
+    registrar_resposta,
+)
+from saude_provedores import (  # Disjuntor (circuit breaker) por provedor.
+    obter_disjuntor,
+    provedor_disponivel,
+    registrar_resultado,
+)
+from sessoes_http import (  # Sessões HTTP com keep-alive e pool de conexões por provedor.
+    TIMEOUT_PADRAO,
+    obter_sessao,
+)
+
+# --- Configurações dos Provedores ---
+
+# Resultado padrão devolvido quando nenhuma API consegue localizar o IP.
+# Ordem dos campos: Cidade, Estado, País, CEP e Provedor.
+RESULTADO_DESCONHECIDO = ("Desconhecida", "Desconhecida", "Desconhecido", "Desconhecido", "Desconhecido")
+
+# Resultado de um endereço privado, reservado ou inválido: o País indica a classificação
+# e o Provedor traz o tipo de faixa (ex.: "Rede privada (RFC 1918)").
+def resultado_endereco_especial(rotulo):
+    return ("Desconhecida", "Desconhecida", PAIS_ENDERECO_ESPECIAL, "Desconhecido", rotulo)
+
+# Endereços das APIs. Ficam em variáveis do módulo para que possam ser apontados
+# para outro servidor (por exemplo, um servidor local usado no benchmark).
+URL_API1 = "https://ipwhois.app/json/{ip}"
+URL_API2 = "http://api.ipstack.com/{ip}?access_key={access_key}"
+URL_API3 = "http://ip-api.com/json/{ip}?fields=city,regionName,country,zip,isp,org"
+# Endpoint em lote do ip-api.com: recebe (via POST) uma lista JSON de até 100 IPs por requisição.
+URL_API3_LOTE = "http://ip-api.com/batch?fields=status,message,query,city,regionName,country,zip,isp,org"
+TAMANHO_LOTE_API3 = 100
+
+# ATENÇÃO: Substitua "SUA_CHAVE_DE_API" pela sua chave de API real do ipstack.com.
+# Sem uma chave válida, esta API não funcionará corretamente ou retornará erros.
+ACCESS_KEY_IPSTACK = "SUA_CHAVE_DE_API" # <-- SUBSTITUA PELA SUA CHAVE DE API
+
+# Quantidade máxima de requisições simultâneas para cada provedor.
+# Mesmo com muitas threads em execução, cada API nunca recebe mais consultas
+# ao mesmo tempo do que o valor definido aqui. O ritmo (requisições por segundo)
+# é controlado à parte, pelos baldes de fichas de limitador_taxa.py.
+LIMITE_SIMULTANEAS = {
+    "api1": 4, # ipwhois.app
+    "api2": 2, # ipstack.com
+    "api3": 2, # ip-api.com
+}
+
+# Um semáforo por provedor garante o limite de requisições simultâneas.
+_semaforos = {nome: threading.BoundedSemaphore(limite) for nome, limite in LIMITE_SIMULTANEAS.items()}
+
+# Quantidade padrão de threads usadas para manter consultas em andamento.
+MAX_THREADS_PADRAO = 16
+
+# Requisições "de reforço" (hedge): se o provedor consultado não responder dentro do percentil
+# PERCENTIL_HEDGE da sua latência recente, o próximo provedor é consultado em paralelo e vale a
+# primeira resposta válida. Enquanto não há amostras de latência, usa-se ATRASO_HEDGE_PADRAO.
+# O atraso conta a partir do envio da requisição: enquanto a consulta espera uma ficha do limite
+# de taxa ou uma vaga no semáforo do provedor, ela está na fila, e não lenta. Essa espera é
+# verificada a cada INTERVALO_VERIFICACAO_ENVIO segundos.
+PERCENTIL_HEDGE = 95
+ATRASO_HEDGE_PADRAO = 1.0
+ATRASO_HEDGE_MINIMO = 0.1
+INTERVALO_VERIFICACAO_ENVIO = 0.01
+
+# Orçamento dos reforços: cada IP consultado com hedge rende FRACAO_HEDGE de ficha, até
+# MAXIMO_FICHAS_HEDGE, e cada reforço disparado por demora gasta uma ficha. Assim os reforços
+# ficam limitados a cerca de 10% das consultas e não gastam a cota das APIs quando todas ficam
+# lentas ao mesmo tempo. Passar ao próximo provedor porque o anterior não localizou o IP é a
+# cadeia normal e não gasta fichas.
+FRACAO_HEDGE = 0.1
+MAXIMO_FICHAS_HEDGE = 10.0
+_fichas_hedge = MAXIMO_FICHAS_HEDGE
+_trava_fichas_hedge = threading.Lock()
+
+# Pool separado para as requisições de reforço: as threads do motor concorrente ficam
+# esperando por elas, então não podem disputar o mesmo pool.
+_executor_hedge = None
+_trava_executor_hedge = threading.Lock()
+
+# Latência (em segundos) de cada consulta de IP feita às APIs pelo motor concorrente.
+# Só as mais recentes são guardadas, para que execuções contínuas (acompanhar_portascan.py)
+# não acumulem memória indefinidamente.
+latencias_consultas = deque(maxlen=100_000)
+
+# Cache persistente consultado antes de qualquer requisição HTTP.
+# Fica desativado (None) até que 'configurar_cache' seja chamada pelo script.
+cache = None
+
+# Ativa o cache em disco compartilhado. 'ttl' é a validade de cada resultado, em segundos.
+def configurar_cache(caminho=None, ttl=None):
+    global cache
+    parametros = {}
+    if caminho is not None:
+        parametros["caminho"] = caminho
+    if ttl is not None:
+        parametros["ttl"] = ttl
+    cache = CacheGeolocalizacao(**parametros)
+    return cache
+
+# --- Funções para Consultar Múltiplas APIs de Geolocalização ---
+
+# Estado, por thread, da consulta de um IP a um provedor:
+# - 'valida': se a última requisição recebeu uma resposta válida. Um IP só é gravado no cache como
+#   não localizado quando alguma API respondeu de fato, e não quando todas falharam (rede fora do
+#   ar, disjuntores abertos, erro de chave);
+# - 'envio': lista que recebe o momento (perf_counter) em que a requisição saiu, usada pelo hedge.
+_requisicao_atual = threading.local()
+
+# Envia uma requisição ao provedor respeitando o limite de taxa ('balde') e o limite de conexões
+# simultâneas, e registra o resultado no disjuntor do provedor. Erros de conexão, timeouts e
+# respostas diferentes de 200 contam como falha; um 429 é limite de taxa, não falha do provedor.
+# 'resposta_valida', se informada, verifica o conteúdo de uma resposta 200 (ex.: erro de chave do ipstack).
+def _requisitar(provedor, balde, metodo, url, resposta_valida=None, **kwargs):
+    aguardar_vez(balde)
+    with _semaforos[provedor]:
+        inicio = time.perf_counter()
+        envio = getattr(_requisicao_atual, "envio", None)
+        if envio is not None:
+            envio.append(inicio)
+        try:
+            response = obter_sessao(provedor).request(metodo, url, timeout=TIMEOUT_PADRAO, **kwargs)
+        except Exception:
+            registrar_resultado(provedor, False, time.perf_counter() - inicio)
+            raise
+        latencia = time.perf_counter() - inicio
+    registrar_resposta(balde, response)
+    # O resultado vai para o disjuntor mesmo que a verificação falhe (ex.: 200 com um corpo que não
+    # é JSON): no estado semiaberto, só o registro libera o próximo teste do provedor.
+    sucesso = False
+    try:
+        if response.status_code == 200:
+            sucesso = resposta_valida(response) if resposta_valida else True
+        else:
+            sucesso = response.status_code == 429
+    finally:
+        registrar_resultado(provedor, sucesso, latencia)
+        _requisicao_atual.valida = response.status_code == 200 and sucesso
+    return response
+
+# Erros que fazem uma consulta devolver "não localizado": falhas de rede e timeouts
+# (requests.RequestException), corpo que não é JSON (ValueError) e JSON em outro formato
+# (AttributeError, TypeError). Qualquer outro erro é um defeito do programa e não é escondido.
+ERROS_CONSULTA = (requests.RequestException, ValueError, AttributeError, TypeError)
+
+# Função para consultar a API ipwhois.app (agora ipwhois.io).
+# Retorna Cidade, Estado, País, CEP e Provedor.
+def consultar_geolocalizacao_api1(ip):
+    try:
+        # Timeouts separados de conexão e de leitura evitam travamentos (ver sessoes_http.py).
+        response = _requisitar("api1", "api1", "GET", URL_API1.format(ip=ip))
+        if response.status_code == 200:
+            data = response.json()
+            # O campo 'isp' contém o nome do provedor.
+            return (
+                data.get("city", "Desconhecida"),
+                data.get("region", "Desconhecida"),
+                data.get("country", "Desconhecido"),
+                data.get("zip", "Desconhecido"),
+                data.get("isp", "Desconhecido"),
+            )
+    except ERROS_CONSULTA as e:
+        print(f"Erro na API 1 (ipwhois.app) para {ip}: {e}")
+    return RESULTADO_DESCONHECIDO
+
+# Função para consultar a API ipstack.com.
+# Requer uma chave de API (access_key) para funcionar.
+def consultar_geolocalizacao_api2(ip):
+    try:
+        # O ipstack responde 200 com "success": false quando a chave é inválida ou a cota acabou.
+        response = _requisitar(
+            "api2", "api2", "GET", URL_API2.format(ip=ip, access_key=ACCESS_KEY_IPSTACK),
+            resposta_valida=lambda r: r.json().get("success", True) is not False,
+        )
+        if response.status_code == 200:
+            data = response.json()
+            # ipstack pode ter o ISP em 'connection.isp' ou 'organization'. Tentamos ambos.
+            isp_name = data.get("connection", {}).get("isp", data.get("organization", "Desconhecido"))
+            return (
+                data.get("city", "Desconhecida"),
+                data.get("region_name", "Desconhecida"),
+                data.get("country_name", "Desconhecido"),
+                data.get("zip", "Desconhecido"),
+                isp_name,
+            )
+    except ERROS_CONSULTA as e:
+        print(f"Erro na API 2 (ipstack.com) para {ip}: {e}")
+    return RESULTADO_DESCONHECIDO
+
+# Função para consultar a API ip-api.com.
+# Esta API é geralmente gratuita para uso não comercial e não requer uma chave de API.
+def consultar_geolocalizacao_api3(ip):
+    try:
+        response = _requisitar("api3", "api3", "GET", URL_API3.format(ip=ip))
+        if response.status_code == 200:
+            data = response.json()
+            # ip-api.com pode retornar o nome do provedor no campo 'isp' ou 'org'. Priorizamos 'isp'.
+            isp_name = data.get("isp", data.get("org", "Desconhecido"))
+            return (
+                data.get("city", "Desconhecida"),
+                data.get("regionName", "Desconhecida"),
+                data.get("country", "Desconhecido"),
+                data.get("zip", "Desconhecido"),
+                isp_name,
+            )
+    except ERROS_CONSULTA as e:
+        print(f"Erro na API 3 (ip-api.com) para {ip}: {e}")
+    return RESULTADO_DESCONHECIDO
+
+# Função para consultar vários IPs de uma vez no endpoint em lote do ip-api.com.
+# Retorna um dicionário {ip: (cidade, estado, pais, cep, provedor)} apenas com os IPs localizados;
+# IPs com "status": "fail" (ou um lote inteiro que falhou) ficam de fora e devem ser consultados individualmente.
+def consultar_lote_api3(ips):
+    resultados = {}
+    try:
+        response = _requisitar("api3", "api3_lote", "POST", URL_API3_LOTE, json=list(ips))
+        if response.status_code == 200:
+            # A resposta mantém a ordem do pedido, mas usamos o campo 'query' para associar cada item ao seu IP.
+            for data in response.json():
+                if data.get("status") != "success":
+                    continue
+                isp_name = data.get("isp", data.get("org", "Desconhecido"))
+                resultado = (
+                    data.get("city", "Desconhecida"),
+                    data.get("regionName", "Desconhecida"),
+                    data.get("country", "Desconhecido"),
+                    data.get("zip", "Desconhecido"),
+                    isp_name,
+                )
+                if resultado[2] != "Desconhecido":
+                    resultados[data.get("query")] = resultado
+        else:
+            print(f"Erro na API 3 em lote (ip-api.com): HTTP {response.status_code} para {len(ips)} IPs")
+    except ERROS_CONSULTA as e:
+        print(f"Erro na API 3 em lote (ip-api.com) para {len(ips)} IPs: {e}")
+    return resultados
+
+# Base de geolocalização offline (faixas de IP em CSV). Fica desativada (None) até que
+# 'configurar_base_offline' seja chamada pelo script.
+base_offline = None
+
+# Função para consultar a base offline carregada na memória. Não faz nenhuma requisição de rede.
+def consultar_geolocalizacao_offline(ip):
+    if base_offline is not None:
+        resultado = base_offline.consultar(ip)
+        if resultado is not None:
+            return resultado
+    return RESULTADO_DESCONHECIDO
+
+# Lista de funções de API a serem tentadas. A ordem pode ser ajustada conforme a preferência.
+PROVEDORES = [consultar_geolocalizacao_api1, consultar_geolocalizacao_api2, consultar_geolocalizacao_api3]
+
+# Nome de cada API no disjuntor (saude_provedores.py). A base offline não tem disjuntor: nunca fica indisponível.
+NOMES_PROVEDORES = {
+    consultar_geolocalizacao_api1: "api1",
+    consultar_geolocalizacao_api2: "api2",
+    consultar_geolocalizacao_api3: "api3",
+}
+
+# Indica se a função de consulta pode ser usada agora (disjuntor do provedor fechado ou em teste).
+def _disponivel(consulta):
+    nome = NOMES_PROVEDORES.get(consulta)
+    return nome is None or provedor_disponivel(nome)
+
+# Carrega a base offline e a coloca na cadeia de provedores, como "primaria" (antes das APIs)
+# ou como "fallback" (depois das APIs, usada apenas quando todas falham).
+def configurar_base_offline(caminho, posicao="primaria"):
+    global base_offline
+    if posicao not in ("primaria", "fallback"):
+        raise ValueError(f"Posição inválida para a base offline: {posicao!r} (use 'primaria' ou 'fallback').")
+    base_offline = BaseGeolocalizacaoOffline(caminho)
+    if consultar_geolocalizacao_offline in PROVEDORES:
+        PROVEDORES.remove(consultar_geolocalizacao_offline)
+    if posicao == "primaria":
+        PROVEDORES.insert(0, consultar_geolocalizacao_offline)
+    else:
+        PROVEDORES.append(consultar_geolocalizacao_offline)
+    return base_offline
+
+# Função principal para consultar geolocalização de um IP, tentando várias APIs em sequência.
+# Endereços privados/reservados são classificados localmente, sem cache nem requisição HTTP.
+# Se o cache estiver ativo, ele é consultado antes de qualquer requisição HTTP.
+# Itera pelas funções de consulta até encontrar um resultado válido (onde o País não é "Desconhecido").
+# Com 'hedge=True', a cadeia usa requisições de reforço em vez de esperar cada provedor até o timeout.
+def consultar_geolocalizacao(ip, hedge=False):
+    rotulo = classificar_endereco(ip)
+    if rotulo is not None:
+        return resultado_endereco_especial(rotulo)
+    if cache is not None:
+        em_cache = cache.obter(ip)
+        if em_cache is not None:
+            return em_cache
+    return _consultar_provedores(ip, hedge)
+
+# Consulta um provedor e informa também se alguma API respondeu de fato: (resultado, respondeu).
+# 'envio', se informada, é a lista que recebe o momento em que a requisição foi enviada.
+def _consultar_provedor(consulta, ip, envio=None):
+    _requisicao_atual.valida = False
+    _requisicao_atual.envio = envio
+    try:
+        resultado = consulta(ip)
+    finally:
+        _requisicao_atual.envio = None
+    return resultado, _requisicao_atual.valida
+
+# Percorre a cadeia de provedores para um IP que não está no cache.
+# Provedores com o disjuntor aberto (falhando em sequência) são pulados automaticamente.
+def _consultar_provedores(ip, hedge=False):
+    if hedge:
+        resultado, respondeu = _consultar_provedores_hedge(ip)
+    else:
+        resultado, respondeu = RESULTADO_DESCONHECIDO, False
+        for consulta in PROVEDORES:
+            if not _disponivel(consulta):
+                continue
+            resultado, respondeu_agora = _consultar_provedor(consulta, ip)
+            respondeu = respondeu or respondeu_agora
+            if resultado[2] != "Desconhecido":
+                break
+    if resultado[2] == "Desconhecido":
+        # Um IP que as APIs responderam sem localizar fica no cache com a validade curta dos
+        # resultados negativos; se nenhuma API respondeu, ele é tentado de novo na próxima execução.
+        if cache is not None and respondeu:
+            cache.gravar(ip, RESULTADO_DESCONHECIDO)
+        return RESULTADO_DESCONHECIDO
+    if cache is not None:
+        cache.gravar(ip, resultado)
+    return resultado
+
+def _obter_executor_hedge():
+    global _executor_hedge
+    with _trava_executor_hedge:
+        if _executor_hedge is None:
+            _executor_hedge = ThreadPoolExecutor(max_workers=MAX_THREADS_PADRAO * len(PROVEDORES), thread_name_prefix="hedge")
+        return _executor_hedge
+
+# Cada IP consultado com hedge rende FRACAO_HEDGE de ficha para os reforços.
+def _acumular_ficha_hedge():
+    global _fichas_hedge
+    with _trava_fichas_hedge:
+        _fichas_hedge = min(MAXIMO_FICHAS_HEDGE, _fichas_hedge + FRACAO_HEDGE)
+
+# Gasta uma ficha para disparar um reforço; False se o orçamento acabou.
+def _gastar_ficha_hedge():
+    global _fichas_hedge
+    with _trava_fichas_hedge:
+        if _fichas_hedge < 1:
+            return False
+        _fichas_hedge -= 1
+        return True
+
+# Quanto esperar pelo provedor, depois do envio da requisição, antes de disparar o próximo:
+# o percentil PERCENTIL_HEDGE da latência recente.
+def _atraso_hedge(consulta):
+    nome = NOMES_PROVEDORES.get(consulta)
+    if nome is None:
+        return ATRASO_HEDGE_MINIMO
+    percentil = obter_disjuntor(nome).percentil_latencia(PERCENTIL_HEDGE)
+    return ATRASO_HEDGE_PADRAO if percentil is None else max(percentil, ATRASO_HEDGE_MINIMO)
+
+# Cadeia de provedores com requisições de reforço: consulta o primeiro provedor disponível e,
+# se ele demorar mais que o atraso de reforço depois de enviar a requisição (e ainda houver
+# orçamento), ou responder sem localizar o IP, dispara o próximo em paralelo. Vale a primeira
+# resposta válida (País diferente de "Desconhecido").
+# As consultas ainda não iniciadas são canceladas; as que já estão em andamento terminam
+# em segundo plano e seu resultado é descartado. Retorna (resultado, respondeu), como _consultar_provedor.
+def _consultar_provedores_hedge(ip):
+    executor = _obter_executor_hedge()
+    cadeia = iter(PROVEDORES)
+    _acumular_ficha_hedge()
+
+    def disparar_proximo():
+        # O disjuntor só é consultado no momento do disparo, para não reservar testes à toa.
+        for consulta in cadeia:
+            if _disponivel(consulta):
+                envio = []
+                return executor.submit(_consultar_provedor, consulta, ip, envio), consulta, envio
+        return None, None, None
+
+    futuro, ultima, envio = disparar_proximo()
+    if futuro is None:
+        return RESULTADO_DESCONHECIDO, False
+    em_andamento = {futuro}
+    respondeu = False
+    while em_andamento:
+        # A requisição pode sair durante a espera: vale o que se sabia antes de esperar.
+        enviada = bool(envio)
+        if ultima is None:
+            espera = None
+        elif enviada:
+            espera = max(0.0, envio[0] + _atraso_hedge(ultima) - time.perf_counter())
+        else:
+            espera = INTERVALO_VERIFICACAO_ENVIO
+        concluidos, em_andamento = wait(em_andamento, timeout=espera, return_when=FIRST_COMPLETED)
+        for concluido in concluidos:
+            resultado, respondeu_agora = concluido.result()
+            respondeu = respondeu or respondeu_agora
+            if resultado[2] != "Desconhecido":
+                for restante in em_andamento:
+                    restante.cancel()
+                return resultado, respondeu
+        if not concluidos:
+            # A última requisição ainda não saiu (está na fila): não é demora do provedor.
+            if not enviada:
+                continue
+            # Demorou mais que o atraso depois de enviada: reforço, se houver orçamento. Sem
+            # orçamento, as consultas em andamento são esperadas sem limite de tempo.
+            if not _gastar_ficha_hedge():
+                ultima = None
+                continue
+        # Reforço ou resposta sem localização: dispara o próximo provedor da cadeia.
+        futuro, consulta, envio_proximo = disparar_proximo()
+        if futuro is not None:
+            em_andamento.add(futuro)
+            ultima, envio = consulta, envio_proximo
+        else:
+            ultima = None
+    return RESULTADO_DESCONHECIDO, respondeu
+
+# Consulta a cadeia de provedores para um IP fora do cache e registra quanto tempo levou.
+def _consultar_medindo(ip, hedge):
+    inicio = time.perf_counter()
+    resultado = _consultar_provedores(ip, hedge)
+    latencias_consultas.append(time.perf_counter() - inicio)
+    return resultado
+
+# Texto com os percentis p50/p95/p99 da latência por IP registrada pelo motor concorrente.
+def resumo_latencias():
+    if not latencias_consultas:
+        return "Latência por IP: nenhuma consulta às APIs."
+    ordenadas = sorted(latencias_consultas)
+
+    def percentil(p):
+        return ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p / 100))] * 1000
+
+    return (
+        f"Latência por IP ({len(ordenadas)} consultas): p50 {percentil(50):.0f} ms, "
+        f"p95 {percentil(95):.0f} ms, p99 {percentil(99):.0f} ms"
+    )
+
+# --- Motor de Consultas Concorrentes ---
+
+# Consulta a geolocalização de vários IPs ao mesmo tempo usando um pool de threads.
+# Cada IP repetido é consultado apenas uma vez. Retorna um dicionário {ip: (cidade, estado, pais, cep, provedor)}.
+# 'ao_concluir', se informado, é chamado a cada IP finalizado com (ip, resultado, concluidos, total).
+# Com 'usar_lote_api3=True', os IPs fora do cache são enviados primeiro ao endpoint em lote do
+# ip-api.com (100 IPs por requisição); apenas os que o lote não localizar passam pela cadeia de provedores.
+# Com 'usar_hedge=True', a cadeia de cada IP usa requisições de reforço (ver _consultar_provedores_hedge).
+def consultar_em_paralelo(ips, max_threads=MAX_THREADS_PADRAO, ao_concluir=None, usar_lote_api3=False, usar_hedge=False):
+    ips_unicos = list(dict.fromkeys(ips))
+    resultados = {}
+    if not ips_unicos:
+        return resultados
+    # Cidades, estados, países e provedores se repetem entre os IPs: cada valor igual é guardado
+    # uma vez só, e os resultados de todos os IPs apontam para o mesmo objeto.
+    valores_compartilhados = {}
+
+    def concluir(ip, resultado):
+        resultado = tuple(valores_compartilhados.setdefault(valor, valor) for valor in resultado)
+        resultados[ip] = resultado
+        if ao_concluir:
+            ao_concluir(ip, resultado, len(resultados), len(ips_unicos))
+
+    # Endereços privados, reservados (bogons, CGNAT, multicast...) ou inválidos nunca têm
+    # geolocalização: são classificados localmente e não gastam cota de nenhuma API.
+    for ip, rotulo in classificar_varios(ips_unicos).items():
+        concluir(ip, resultado_endereco_especial(rotulo))
+    pendentes = [ip for ip in ips_unicos if ip not in resultados]
+    if not pendentes:
+        return resultados
+
+    # Com a base offline como provedor primário, todos os IPs são resolvidos de uma vez
+    # (busca binária vetorizada) e só os que ficarem de fora seguem para o cache e as APIs.
+    if base_offline is not None and PROVEDORES[0] is consultar_geolocalizacao_offline:
+        localizados = base_offline.consultar_varios(pendentes)
+        for ip, resultado in localizados.items():
+            if resultado[2] != "Desconhecido":
+                concluir(ip, resultado)
+        pendentes = [ip for ip in pendentes if ip not in resultados]
+        if not pendentes:
+            return resultados
+
+    with ThreadPoolExecutor(max_workers=min(max_threads, len(pendentes))) as executor:
+        # IPs já presentes no cache são concluídos sem nenhuma requisição.
+        if cache is not None:
+            fora_do_cache = []
+            for ip in pendentes:
+                em_cache = cache.obter(ip)
+                if em_cache is not None:
+                    concluir(ip, em_cache)
+                else:
+                    fora_do_cache.append(ip)
+            pendentes = fora_do_cache
+        if usar_lote_api3:
+            lotes = [pendentes[i:i + TAMANHO_LOTE_API3] for i in range(0, len(pendentes), TAMANHO_LOTE_API3)]
+            # O lote só é usado enquanto o ip-api.com estiver na cadeia (disjuntor não aberto).
+            if lotes and provedor_disponivel("api3"):
+                futuros = {executor.submit(consultar_lote_api3, lote): lote for lote in lotes}
+                pendentes = []
+                for futuro in as_completed(futuros):
+                    localizados = futuro.result()
+                    for ip in futuros[futuro]:
+                        if ip in localizados:
+                            if cache is not None:
+                                cache.gravar(ip, localizados[ip])
+                            concluir(ip, localizados[ip])
+                        else:
+                            # Falha parcial dentro do lote: o IP segue para a consulta individual.
+                            pendentes.append(ip)
+        futuros = {executor.submit(_consultar_medindo, ip, usar_hedge): ip for ip in pendentes}
+        for futuro in as_completed(futuros):
+            concluir(futuros[futuro], futuro.result())
+    return resultados
@@ -0,0 +1,122 @@
+import argparse  # Política de bloqueio (países e estados), origem dos resultados e opções do script gerado.
+import os  # Verificação da origem dos resultados.
+from datetime import datetime  # Data de geração registrada no cabeçalho do script.
+
+import pandas as pd  # Leitura da aba Detalhes_IPs do relatório do 10G.py.
+
+from enderecos import (  # Conversão e agregação CIDR.
+    PAIS_ENDERECO_ESPECIAL,
+    agregar_enderecos,
+    ips_para_uint32,
+    textos_cidr,
+)
+from estado_incremental import (
+    EstadoExportacao,  # Resultados de geolocalização guardados pelo 10G.py.
+)
+
+# --- Gerador de Scripts de Bloqueio por País e Estado ---
+
+# Nome padrão da address-list criada pelo script; a regra de firewall que bloqueia os endereços
+# (ex.: /ip firewall raw add chain=prerouting src-address-list=BLOQUEIO_PAIS_ESTADO action=drop)
+# é criada uma vez no roteador.
+LISTA_PADRAO = "BLOQUEIO_PAIS_ESTADO"
+
+# Lê os resultados de geolocalização {ip: (cidade, estado, país, cep, provedor)}: do arquivo de estado
+# do 10G.py (.estado.json) ou da aba Detalhes_IPs de um relatório em Excel.
+def carregar_resultados(caminho):
+    if caminho.lower().endswith((".xlsx", ".xls")):
+        detalhes = pd.read_excel(caminho, sheet_name="Detalhes_IPs", usecols=["IP", "Cidade", "Estado", "País", "CEP", "Provedor"], dtype=str)
+        detalhes = detalhes.drop_duplicates("IP")
+        return {
+            ip: (cidade, estado, pais, cep, provedor)
+            for ip, cidade, estado, pais, cep, provedor in detalhes[["IP", "Cidade", "Estado", "País", "CEP", "Provedor"]].itertuples(index=False)
+        }
+    return EstadoExportacao(caminho).carregar()[1]
+
+# Política de bloqueio: uma regra por país ("China") e por estado ("Guangdong" ou "China/Guangdong",
+# para distinguir estados de mesmo nome em países diferentes). Os nomes são comparados sem
+# diferenciar maiúsculas de minúsculas, com os mesmos valores de País/Estado dos relatórios.
+def montar_politica(paises, estados):
+    regras = [("País", pais, None) for pais in paises]
+    for texto in estados:
+        pais, separador, estado = texto.rpartition("/")
+        regras.append(("Estado", estado, pais if separador else None))
+    return regras
+
+def descricao_regra(regra):
+    tipo, nome, pais = regra
+    return f"{tipo} {pais}/{nome}" if pais else f"{tipo} {nome}"
+
+# Separa os IPs de cada regra da política. Cada IP fica só na primeira regra que o seleciona,
+# para que o script não tente adicionar o mesmo endereço duas vezes à lista. Endereços
+# privados/reservados nunca são selecionados.
+def selecionar_ips(resultados, regras):
+    selecionados = [[] for _ in regras]
+    chaves = [(tipo, nome.casefold(), pais.casefold() if pais else None) for tipo, nome, pais in regras]
+    for ip, (_, estado, pais, _, _) in resultados.items():
+        if pais == PAIS_ENDERECO_ESPECIAL:
+            continue
+        pais_ip, estado_ip = str(pais).casefold(), str(estado).casefold()
+        for posicao, (tipo, nome, pais_regra) in enumerate(chaves):
+            if (tipo == "País" and pais_ip == nome) or (
+                tipo == "Estado" and estado_ip == nome and (pais_regra is None or pais_ip == pais_regra)
+            ):
+                selecionados[posicao].append(ip)
+                break
+    return selecionados
+
+# Gera o script .rsc com um 'add' por bloco CIDR agregado. Retorna [(regra, IPs, blocos)] com a
+# contagem de entradas antes e depois da agregação de cada regra.
+def gerar_script(caminho, regras, selecionados, lista=LISTA_PADRAO, timeout=None, substituir=False):
+    blocos = [agregar_enderecos(ips_para_uint32(ips)) for ips in selecionados]
+    escrever_script(caminho, regras, blocos, lista, timeout, substituir, origem="gerador_bloqueio.py")
+    return [(regra, len(ips), len(redes)) for regra, ips, (redes, _) in zip(regras, selecionados, blocos)]
+
+# Escreve o script .rsc: para cada regra, um 'add' por bloco de 'blocos' ((redes, prefixos) da regra),
+# comentado com a regra. Com 'substituir', as entradas atuais da lista são removidas antes. Sem ele,
+# cada 'add' fica em um ':do { } on-error={}': um endereço que já está na lista faria o RouterOS
+# interromper a importação do script no primeiro erro ("already have such entry").
+def escrever_script(caminho, regras, blocos, lista=LISTA_PADRAO, timeout=None, substituir=False, origem="gerador_bloqueio.py"):
+    complemento = f" timeout={timeout}" if timeout else ""
+    inicio, fim = ("", "") if substituir else (":do { ", " } on-error={}")
+    with open(caminho, "w", encoding="utf-8", newline="\n") as arquivo:
+        arquivo.write(f"# Gerado por {origem} em {datetime.now():%Y-%m-%d %H:%M:%S}\n")
+        arquivo.write(f"# Política: {'; '.join(descricao_regra(regra) for regra in regras)}\n")
+        arquivo.write("/ip firewall address-list\n")
+        if substituir:
+            arquivo.write(f'remove [find list="{lista}"]\n')
+        for regra, (redes, prefixos) in zip(regras, blocos):
+            comentario = descricao_regra(regra).replace('"', "'")
+            arquivo.writelines(
+                f'{inicio}add list="{lista}" address={endereco}{complemento} comment="{comentario}"{fim}\n'
+                for endereco in textos_cidr(redes, prefixos)
+            )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera um script .rsc do RouterOS que bloqueia os IPs dos países/estados escolhidos.")
+    parser.add_argument("--resultados", default="portascan-list.txt.estado.json", help="estado do 10G.py (.estado.json) ou relatório em Excel (padrão: portascan-list.txt.estado.json)")
+    parser.add_argument("--pais", action="append", default=[], help="bloquear os IPs deste país (pode repetir)")
+    parser.add_argument("--estado", action="append", default=[], help="bloquear os IPs deste estado, ou País/Estado (pode repetir)")
+    parser.add_argument("--lista", default=LISTA_PADRAO, help=f"address-list de destino (padrão: {LISTA_PADRAO})")
+    parser.add_argument("--timeout", help="timeout das entradas no roteador (ex.: 4w); sem ele, as entradas são permanentes")
+    parser.add_argument("--substituir", action="store_true", help="remover as entradas atuais da lista antes de adicionar as novas")
+    parser.add_argument("--saida", default="bloqueio_pais_estado.rsc", help="script gerado (padrão: bloqueio_pais_estado.rsc)")
+    argumentos = parser.parse_args()
+    if not argumentos.pais and not argumentos.estado:
+        parser.error("informe ao menos um --pais ou --estado")
+    if not os.path.exists(argumentos.resultados):
+        print(f"Erro: O arquivo '{argumentos.resultados}' não foi encontrado. Rode o 10G.py antes, ou informe --resultados.")
+        raise SystemExit(1)
+
+    resultados = carregar_resultados(argumentos.resultados)
+    regras = montar_politica(argumentos.pais, argumentos.estado)
+    selecionados = selecionar_ips(resultados, regras)
+    contagens = gerar_script(argumentos.saida, regras, selecionados, argumentos.lista, argumentos.timeout, argumentos.substituir)
+
+    for regra, antes, depois in contagens:
+        print(f"{descricao_regra(regra):<40} {antes:>8} IPs -> {depois:>8} entradas")
+    total_antes = sum(antes for _, antes, _ in contagens)
+    total_depois = sum(depois for _, _, depois in contagens)
+    reducao = f" ({100 * (1 - total_depois / total_antes):.1f}% a menos)" if total_antes else ""
+    print(f"{'Total':<40} {total_antes:>8} IPs -> {total_depois:>8} entradas{reducao}")
+    print(f"Script salvo em: {argumentos.saida} (importe no roteador com /import file-name={os.path.basename(argumentos.saida)})")
@@ -0,0 +1,165 @@
+import argparse  # Consulta de tendências pela linha de comando (agrupamento, período, filtros).
+import sqlite3  # Banco de dados local do histórico, no mesmo formato do cache de geolocalização.
+from datetime import datetime  # Momento em que cada execução foi gravada.
+
+import pandas as pd  # Conversão das colunas do relatório e resultado das consultas de tendência.
+
+# --- Histórico das Execuções ---
+
+# Arquivo SQLite do histórico, compartilhado por todas as execuções do 10G.py (e pelo importador).
+ARQUIVO_HISTORICO_PADRAO = "historico_portascan.sqlite3"
+
+# Colunas do relatório gravadas por entrada, na ordem da tabela 'entradas'.
+COLUNAS_RELATORIO = ("IP", "Data", "Hora", "Timeout", "Timeout (s)", "Cidade", "Estado", "País", "CEP", "Provedor")
+
+# Campos que podem agrupar ou filtrar as consultas de tendência (nome da opção -> coluna da tabela).
+CAMPOS_AGRUPAMENTO = {"pais": "pais", "estado": "estado", "cidade": "cidade", "provedor": "provedor"}
+
+# Períodos das consultas de tendência (expressão do SQLite sobre a data da exportação). A semana é
+# identificada pela segunda-feira em que começa: com o número da semana no ano ("%Y-S%W"), a
+# semana de 2024-12-30 ficaria dividida em "2024-S52" e "2025-S00".
+PERIODOS = {
+    "dia": "date(data_exportacao)",
+    "semana": "date(data_exportacao, 'weekday 0', '-6 days')",
+    "mes": "strftime('%Y-%m', data_exportacao)",
+}
+
+# Histórico somente de acréscimo das entradas enriquecidas de cada execução. Cada execução grava uma
+# linha em 'execucoes' e as suas entradas em 'entradas', sem alterar nem apagar o que já existe.
+# A tabela 'entradas' é WITHOUT ROWID com chave primária começando pela data da exportação: as
+# linhas ficam guardadas em ordem de data, como partições por dia, e uma consulta de um intervalo
+# de datas lê só as páginas desse intervalo. Os índices (país, data) e (provedor, data) levam
+# direto às entradas de um país ou provedor. Eles não incluem o IP de propósito: como cada entrada
+# do índice termina com a chave primária, as entradas de uma execução são acrescentadas no fim de
+# cada grupo, em vez de espalhadas pela ordem dos IPs (a gravação de 1 milhão de entradas leva
+# menos da metade do tempo que levava com o IP nos índices).
+class HistoricoPortascan:
+    def __init__(self, caminho=ARQUIVO_HISTORICO_PADRAO):
+        self.caminho = caminho
+        self._conexao = sqlite3.connect(caminho, timeout=30)
+        # O modo WAL permite consultar o histórico enquanto uma execução grava.
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.executescript(
+            """CREATE TABLE IF NOT EXISTS execucoes (
+                id INTEGER PRIMARY KEY,
+                data_exportacao TEXT NOT NULL,
+                hora_exportacao TEXT,
+                origem TEXT,
+                script TEXT,
+                gravado_em TEXT,
+                entradas INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS entradas (
+                data_exportacao TEXT NOT NULL,
+                execucao INTEGER NOT NULL,
+                posicao INTEGER NOT NULL,
+                ip TEXT,
+                data TEXT,
+                hora TEXT,
+                timeout TEXT,
+                timeout_s INTEGER,
+                cidade TEXT,
+                estado TEXT,
+                pais TEXT,
+                cep TEXT,
+                provedor TEXT,
+                PRIMARY KEY (data_exportacao, execucao, posicao)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS entradas_por_pais ON entradas (pais, data_exportacao);
+            CREATE INDEX IF NOT EXISTS entradas_por_provedor ON entradas (provedor, data_exportacao);"""
+        )
+        self._conexao.commit()
+
+    # Acrescenta uma execução e as suas entradas, em uma única transação. 'exportado_em' é a data
+    # ("AAAA-MM-DD") ou data e hora da exportação; 'linhas' gera tuplas na ordem de COLUNAS_RELATORIO
+    # (campos ausentes como None). Retorna o número da execução.
+    def acrescentar(self, exportado_em, linhas, origem=None, script=None):
+        data_exportacao, _, hora_exportacao = str(exportado_em).partition(" ")
+        with self._conexao:
+            cursor = self._conexao.execute(
+                "INSERT INTO execucoes (data_exportacao, hora_exportacao, origem, script, gravado_em) VALUES (?, ?, ?, ?, ?)",
+                (data_exportacao, hora_exportacao or None, origem, script, datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+            )
+            execucao = cursor.lastrowid
+            cursor = self._conexao.executemany(
+                "INSERT INTO entradas VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ((data_exportacao, execucao, posicao, *linha) for posicao, linha in enumerate(linhas)),
+            )
+            self._conexao.execute("UPDATE execucoes SET entradas = ? WHERE id = ?", (cursor.rowcount, execucao))
+        return execucao
+
+    # Acrescenta as entradas do DataFrame do relatório (colunas de COLUNAS_RELATORIO; as que não
+    # existirem ficam vazias). Valores ausentes (NaN, NA) são gravados como NULL.
+    def acrescentar_dataframe(self, exportado_em, df, origem=None, script=None):
+        colunas = []
+        for nome in COLUNAS_RELATORIO:
+            if nome not in df.columns:
+                colunas.append([None] * len(df))
+                continue
+            valores = df[nome].astype(object)
+            colunas.append(valores.where(valores.notna(), None).tolist())
+        return self.acrescentar(exportado_em, zip(*colunas), origem, script)
+
+    # Execuções gravadas, da mais antiga para a mais recente.
+    def execucoes(self):
+        return pd.read_sql_query(
+            "SELECT id, data_exportacao, hora_exportacao, origem, script, gravado_em, entradas FROM execucoes ORDER BY data_exportacao, id",
+            self._conexao,
+        )
+
+    # Tendência por período: IPs distintos e entradas por 'periodo' (dia, semana ou mes; a semana vem
+    # como a data da segunda-feira) e por 'agrupar' (pais, estado, cidade ou provedor), entre as datas
+    # 'desde' e 'ate' ("AAAA-MM-DD").
+    # 'filtros' restringe os campos de CAMPOS_AGRUPAMENTO a um valor (ex.: {"pais": "China"}).
+    # Contar IPs distintos faz com que uma exportação importada duas vezes não seja contada em dobro.
+    def tendencia(self, agrupar="pais", periodo="semana", desde=None, ate=None, filtros=None):
+        coluna = CAMPOS_AGRUPAMENTO[agrupar]
+        condicoes, parametros = [], []
+        if desde:
+            condicoes.append("data_exportacao >= ?")
+            parametros.append(desde)
+        if ate:
+            condicoes.append("data_exportacao <= ?")
+            parametros.append(ate)
+        for campo, valor in (filtros or {}).items():
+            condicoes.append(f"{CAMPOS_AGRUPAMENTO[campo]} = ?")
+            parametros.append(valor)
+        onde = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+        return pd.read_sql_query(
+            f"""SELECT {PERIODOS[periodo]} AS periodo, {coluna} AS {agrupar},
+                       COUNT(DISTINCT ip) AS ips, COUNT(*) AS entradas
+                FROM entradas {onde}
+                GROUP BY periodo, {coluna}
+                ORDER BY periodo, ips DESC""",
+            self._conexao,
+            params=parametros,
+        )
+
+    def fechar(self):
+        self._conexao.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Consulta o histórico das execuções: IPs distintos por período e por país, estado ou provedor.")
+    parser.add_argument("--arquivo", default=ARQUIVO_HISTORICO_PADRAO, help=f"histórico SQLite (padrão: {ARQUIVO_HISTORICO_PADRAO})")
+    parser.add_argument("--por", choices=sorted(CAMPOS_AGRUPAMENTO), default="pais", help="campo de agrupamento (padrão: pais)")
+    parser.add_argument("--periodo", choices=sorted(PERIODOS), default="semana", help="período de agrupamento (padrão: semana)")
+    parser.add_argument("--desde", help="primeira data de exportação (AAAA-MM-DD)")
+    parser.add_argument("--ate", help="última data de exportação (AAAA-MM-DD)")
+    for campo in sorted(CAMPOS_AGRUPAMENTO):
+        parser.add_argument(f"--{campo}", dest=f"filtro_{campo}", metavar="VALOR", help=f"considerar só as entradas com este {campo}")
+    parser.add_argument("--execucoes", action="store_true", help="listar as execuções gravadas e sair")
+    parser.add_argument("--saida", help="gravar o resultado em CSV")
+    argumentos = parser.parse_args()
+
+    historico = HistoricoPortascan(argumentos.arquivo)
+    if argumentos.execucoes:
+        resultado = historico.execucoes()
+    else:
+        filtros = {campo: getattr(argumentos, f"filtro_{campo}") for campo in CAMPOS_AGRUPAMENTO if getattr(argumentos, f"filtro_{campo}")}
+        resultado = historico.tendencia(argumentos.por, argumentos.periodo, argumentos.desde, argumentos.ate, filtros)
+    historico.fechar()
+    print(resultado.to_string(index=False) if len(resultado) else "Nenhuma entrada no histórico para esta consulta.")
+    if argumentos.saida:
+        resultado.to_csv(argumentos.saida, index=False)
+        print(f"Resultado salvo em: {argumentos.saida}")
@@ -0,0 +1,228 @@
+import argparse  # Relatórios importados (padrões de arquivos) e opções do histórico e do cache.
+import glob  # Descoberta dos relatórios antigos por padrões (ex.: "*Relatorio_Completo*.xlsx").
+import os  # Nome e data de modificação de cada relatório.
+import re  # Data e hora do relatório no nome do arquivo.
+import time  # Tempo de importação de cada relatório.
+from datetime import (  # Células de data/hora convertidas para o texto usado nos relatórios.
+    date,
+    datetime,
+)
+from datetime import time as hora_do_dia
+from itertools import islice  # Linhas das planilhas lidas em lotes.
+
+import numpy as np  # Timeouts de cada lote decodificados de uma vez.
+import openpyxl  # Leitura em fluxo (somente leitura, linha a linha) dos relatórios .xlsx.
+
+from cache_geolocalizacao import (  # Resultados antigos reaproveitados pelo cache.
+    ARQUIVO_CACHE_PADRAO,
+    CacheGeolocalizacao,
+)
+from historico import (  # Histórico que recebe as entradas dos relatórios.
+    ARQUIVO_HISTORICO_PADRAO,
+    HistoricoPortascan,
+)
+from leitor_colunar import (
+    decodificar_timeouts,  # Timeout em segundos, como nas execuções do 10G.py.
+)
+
+try:
+    import xlrd  # Leitura dos relatórios .xls dos scripts ok7 a ok12 (opcional).
+except ImportError:
+    xlrd = None
+
+# --- Importação dos Relatórios Antigos para o Histórico ---
+
+# Relatórios procurados quando nenhum padrão é informado.
+PADROES_PADRAO = ("*Relatorio_Completo*.xlsx", "*Relatorio_Portascan*.xls", "*Portascan_Report*.xls")
+
+# Abas com as entradas, na ordem de preferência: "Detalhes_IPs" (10F/10G) e "Detalhes" (demais versões).
+ABAS_DETALHES = ("Detalhes_IPs", "Detalhes")
+
+# Cabeçalhos de cada versão dos scripts -> campo do registro único. O ok7 usa nomes em inglês
+# (Date/Time/City/Country), o V4 a V6 trazem 'Tipo' (a lista) e 'Linha Original', e o 10F/10G
+# acrescentam 'Provedor'. Colunas fora deste mapa ('Índice', 'Linha Original', 'Província',
+# 'Bairro', 'Email Provedor', a coluna sem nome do índice do pandas) são descartadas.
+CAMPOS_LEGADOS = {
+    "IP": "IP", "Data": "Data", "Date": "Data", "Hora": "Hora", "Time": "Hora", "Timeout": "Timeout",
+    "Cidade": "Cidade", "City": "Cidade", "Estado": "Estado", "País": "País", "Country": "País",
+    "CEP": "CEP", "Provedor": "Provedor", "Tipo": "Lista",
+}
+
+# Campos do registro único, na ordem do histórico (sem 'Timeout (s)', calculado na importação).
+CAMPOS_REGISTRO = ("IP", "Data", "Hora", "Timeout", "Cidade", "Estado", "País", "CEP", "Provedor")
+
+# Textos que as versões antigas gravavam no lugar de um valor ausente.
+VALORES_AUSENTES = {"", "Data Ausente", "Hora Ausente"}
+
+# Linhas convertidas e gravadas por vez: o relatório nunca é carregado inteiro na memória.
+TAMANHO_LOTE = 50_000
+
+SCRIPT_IMPORTADOR = "importar_relatorios.py"
+
+# Data e hora em que o relatório foi gerado, do nome do arquivo ("..._2025-01-23_22-15-01.xlsx"),
+# ou a data de modificação do arquivo. É a melhor aproximação da data da exportação que os
+# relatórios antigos têm.
+def data_do_relatorio(caminho):
+    encontrado = re.search(r"(\d{4}-\d{2}-\d{2})_(\d{2})-(\d{2})-(\d{2})", os.path.basename(caminho))
+    if encontrado:
+        return f"{encontrado.group(1)} {encontrado.group(2)}:{encontrado.group(3)}:{encontrado.group(4)}"
+    return datetime.fromtimestamp(os.path.getmtime(caminho)).strftime("%Y-%m-%d %H:%M:%S")
+
+# Gera as linhas (tuplas de valores) da aba de detalhes, começando pelo cabeçalho. Os .xlsx são
+# lidos pelo openpyxl em modo somente leitura, que percorre o XML da planilha linha a linha.
+# O formato .xls não permite leitura em fluxo: o xlrd carrega só a aba pedida (on_demand).
+def linhas_detalhes(caminho):
+    if caminho.lower().endswith(".xls"):
+        if xlrd is None:
+            raise ValueError("o xlrd não está instalado (pip install xlrd), necessário para os relatórios .xls")
+        pasta = xlrd.open_workbook(caminho, on_demand=True)
+        try:
+            aba = next((nome for nome in ABAS_DETALHES if nome in pasta.sheet_names()), None)
+            if aba is None:
+                raise ValueError(f"nenhuma das abas {', '.join(ABAS_DETALHES)} encontrada")
+            for linha in pasta.sheet_by_name(aba).get_rows():
+                yield tuple(
+                    xlrd.xldate_as_datetime(celula.value, pasta.datemode) if celula.ctype == xlrd.XL_CELL_DATE else celula.value
+                    for celula in linha
+                )
+        finally:
+            pasta.release_resources()
+    else:
+        pasta = openpyxl.load_workbook(caminho, read_only=True, data_only=True)
+        try:
+            aba = next((nome for nome in ABAS_DETALHES if nome in pasta.sheetnames), None)
+            if aba is None:
+                raise ValueError(f"nenhuma das abas {', '.join(ABAS_DETALHES)} encontrada")
+            yield from pasta[aba].iter_rows(values_only=True)
+        finally:
+            pasta.close()
+
+# Valor de uma célula no texto usado pelos relatórios: datas como "AAAA-MM-DD", horas como
+# "HH:MM:SS" e números inteiros sem ".0" (ex.: CEP gravado como número). Ausentes viram None.
+def _texto(valor):
+    if valor is None:
+        return None
+    if isinstance(valor, datetime):
+        valor = valor.strftime("%Y-%m-%d") if valor.time() == hora_do_dia() else valor.strftime("%Y-%m-%d %H:%M:%S")
+    elif isinstance(valor, (date, hora_do_dia)):
+        valor = valor.isoformat()
+    elif isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    texto = str(valor).strip()
+    return None if texto in VALORES_AUSENTES else texto
+
+# Contadores de uma importação: entradas gravadas, ignoradas (sem IP) e fora das listas PORTASCAN.
+class ContagemImportacao:
+    def __init__(self):
+        self.gravadas = 0
+        self.sem_ip = 0
+        self.outras_listas = 0
+
+# Registros do histórico a partir das linhas da aba (sem o cabeçalho), convertidos em lotes. Cada
+# registro segue a ordem de historico.COLUNAS_RELATORIO; os campos que a versão do relatório não
+# tinha ficam None. Como o 10G.py, só as listas PORTASCAN entram no histórico (a menos que
+# 'todas_as_listas'). Os resultados com país conhecido vão para 'conhecidos' ({ip: tupla}),
+# de todas as listas, para o cache de geolocalização.
+def registros_do_relatorio(linhas, cabecalho, contagem, conhecidos, todas_as_listas=False):
+    posicoes = {}
+    for indice, nome in enumerate(cabecalho):
+        campo = CAMPOS_LEGADOS.get(str(nome).strip()) if nome is not None else None
+        if campo is not None and campo not in posicoes:
+            posicoes[campo] = indice
+    if "IP" not in posicoes:
+        raise ValueError("a aba de detalhes não tem a coluna IP")
+    indices = [posicoes.get(campo) for campo in CAMPOS_REGISTRO]
+    indice_lista = posicoes.get("Lista")
+
+    while True:
+        lote = list(islice(linhas, TAMANHO_LOTE))
+        if not lote:
+            return
+        convertidos = []
+        for linha in lote:
+            valores = [_texto(linha[indice]) if indice is not None and indice < len(linha) else None for indice in indices]
+            ip, _, _, _, cidade, estado, pais, cep, provedor = valores
+            if ip is None:
+                contagem.sem_ip += 1
+                continue
+            if pais is not None and pais != "Desconhecido":
+                conhecidos[ip] = (
+                    cidade or "Desconhecida", estado or "Desconhecida", pais, cep or "Desconhecido", provedor or "Desconhecido",
+                )
+            lista = _texto(linha[indice_lista]) if indice_lista is not None and indice_lista < len(linha) else None
+            if not todas_as_listas and lista is not None and "PORTASCAN" not in lista:
+                contagem.outras_listas += 1
+                continue
+            convertidos.append(valores)
+        segundos = decodificar_timeouts(np.array([valores[3] or "" for valores in convertidos], dtype=str)).tolist()
+        for valores, segundos_timeout in zip(convertidos, segundos):
+            yield (*valores[:4], segundos_timeout if segundos_timeout >= 0 else None, *valores[4:])
+        contagem.gravadas += len(convertidos)
+
+# Importa um relatório para o histórico como uma execução. Retorna a ContagemImportacao.
+def importar_relatorio(caminho, historico, conhecidos, todas_as_listas=False):
+    linhas = linhas_detalhes(caminho)
+    cabecalho = next(linhas, None)
+    if cabecalho is None:
+        raise ValueError("a aba de detalhes está vazia")
+    contagem = ContagemImportacao()
+    historico.acrescentar(
+        data_do_relatorio(caminho),
+        registros_do_relatorio(linhas, cabecalho, contagem, conhecidos, todas_as_listas),
+        origem=os.path.basename(caminho),
+        script=SCRIPT_IMPORTADOR,
+    )
+    return contagem
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importa os relatórios antigos (Relatorio_Completo/Relatorio_Portascan) para o histórico e o cache de geolocalização.")
+    parser.add_argument("padroes", nargs="*", default=list(PADROES_PADRAO), help=f"relatórios ou padrões de arquivos (padrão: {' '.join(PADROES_PADRAO)})")
+    parser.add_argument("--historico", default=ARQUIVO_HISTORICO_PADRAO, help=f"histórico de destino (padrão: {ARQUIVO_HISTORICO_PADRAO})")
+    parser.add_argument("--cache", default=ARQUIVO_CACHE_PADRAO, help=f"cache de geolocalização alimentado com os resultados (padrão: {ARQUIVO_CACHE_PADRAO})")
+    parser.add_argument("--sem-cache", action="store_true", help="não gravar os resultados no cache de geolocalização")
+    parser.add_argument("--todas-as-listas", action="store_true", help="importar também as entradas fora das listas PORTASCAN (coluna Tipo)")
+    parser.add_argument("--reimportar", action="store_true", help="importar de novo relatórios que já estão no histórico")
+    argumentos = parser.parse_args()
+
+    caminhos = sorted(
+        {caminho for padrao in argumentos.padroes for caminho in glob.glob(padrao)},
+        key=lambda caminho: (data_do_relatorio(caminho), caminho),
+    )
+    if not caminhos:
+        print("Nenhum relatório encontrado.")
+        raise SystemExit(1)
+
+    historico = HistoricoPortascan(argumentos.historico)
+    execucoes = historico.execucoes()
+    importados = set(execucoes.loc[execucoes["script"] == SCRIPT_IMPORTADOR, "origem"])
+    # Resultados de geolocalização de cada IP; os relatórios são lidos do mais antigo para o mais
+    # recente, então vale o resultado mais recente de cada IP.
+    conhecidos = {}
+    total = 0
+    for caminho in caminhos:
+        if os.path.basename(caminho) in importados and not argumentos.reimportar:
+            print(f"{caminho}: já importado (use --reimportar para importar de novo)")
+            continue
+        inicio = time.perf_counter()
+        try:
+            contagem = importar_relatorio(caminho, historico, conhecidos, argumentos.todas_as_listas)
+        except ValueError as erro:
+            print(f"{caminho}: ignorado ({erro})")
+            continue
+        total += contagem.gravadas
+        print(
+            f"{caminho}: {contagem.gravadas} entradas de {data_do_relatorio(caminho)} em {time.perf_counter() - inicio:.1f} s"
+            f" ({contagem.outras_listas} fora das listas PORTASCAN, {contagem.sem_ip} sem IP)"
+        )
+    historico.fechar()
+    print(f"Histórico: {total} entradas importadas em '{argumentos.historico}'.")
+
+    # Os IPs já localizados pelos relatórios entram no cache, para não serem consultados nas APIs
+    # de novo. Resultados que já estão no cache são mantidos. As versões antigas não tinham a coluna
+    # Provedor: esses IPs ficam com o provedor "Desconhecido", mas com a validade completa do cache
+    # (e não a validade curta dos resultados sem provedor), porque a localização está completa.
+    if not argumentos.sem_cache and conhecidos:
+        cache = CacheGeolocalizacao(argumentos.cache)
+        gravados = cache.gravar_varios(conhecidos, substituir=False, validade=cache.ttl)
+        cache.fechar()
+        print(f"Cache de geolocalização: {gravados} IPs novos de {len(conhecidos)} localizados nos relatórios, em '{argumentos.cache}'.")
@@ -0,0 +1,180 @@
+import argparse  # Opções da linha de comando (exportação, listas alvo e de cobertura, IPs consultados).
+import csv  # Relatório das entradas redundantes em CSV (opção --saida).
+
+from enderecos import ip_para_int  # Endereços e redes como inteiros de 32 bits.
+from leitor_routeros import ler_registros  # Entradas da exportação do RouterOS.
+
+# --- Índice CIDR das Address-Lists ---
+
+# Listas cujas redes já bloqueiam tudo o que contêm: uma entrada das listas alvo dentro de uma
+# delas é redundante.
+LISTAS_COBERTURA_PADRAO = ("Blocked", "blocked-scanners", "bogons")
+
+# Árvore de prefixos binária com compressão de caminho (Patricia) sobre as entradas das
+# address-lists. Cada nó é uma rede (valor, comprimento do prefixo); um nó só existe se guarda
+# entradas ou se separa dois ramos, então a árvore tem no máximo 2 nós por rede distinta.
+# Os nós ficam em listas paralelas (valor, comprimento, filhos e entradas), indexadas pelo número
+# do nó, e as entradas guardam a posição do registro em 'registros'. Toda consulta desce no
+# máximo 32 níveis, qualquer que seja o tamanho das listas.
+class IndiceCIDR:
+    def __init__(self):
+        self.registros = []
+        self._valores = [0]
+        self._comprimentos = [0]
+        self._filhos = ([None], [None])
+        self._entradas = [None]
+
+    def __len__(self):
+        return len(self.registros)
+
+    # Acrescenta um RegistroEndereco. Entradas de nome de host (sem endereço) não entram no índice;
+    # nesse caso retorna False.
+    def adicionar(self, registro):
+        if registro.endereco is None:
+            return False
+        valor, comprimento = _rede(ip_para_int(registro.endereco), registro.prefixo)
+        no = self._no_da_rede(valor, comprimento)
+        if self._entradas[no] is None:
+            self._entradas[no] = []
+        self._entradas[no].append(len(self.registros))
+        self.registros.append(registro)
+        return True
+
+    # Registros cujas redes contêm o endereço (ou a rede 'endereco/prefixo' inteira), da rede mais
+    # ampla para a mais específica. Uma entrada com a mesma rede também conta como cobertura.
+    def cobrindo(self, endereco, prefixo=32):
+        valor, comprimento = _rede(ip_para_int(endereco) if isinstance(endereco, str) else endereco, prefixo)
+        encontrados = []
+        no = 0
+        while no is not None:
+            comprimento_no = self._comprimentos[no]
+            if comprimento_no > comprimento or _prefixo_comum(valor, self._valores[no]) < comprimento_no:
+                break
+            if self._entradas[no] is not None:
+                encontrados.extend(self.registros[posicao] for posicao in self._entradas[no])
+            if comprimento_no == 32:
+                break
+            no = self._filhos[_bit(valor, comprimento_no)][no]
+        return encontrados
+
+    # Primeiro registro (da rede mais ampla para a mais específica) que cobre o endereço, nas
+    # 'listas' informadas (ou em qualquer lista), ou None. Entradas desabilitadas (flag X) não contam.
+    def coberto(self, endereco, prefixo=32, listas=None):
+        for registro in self.cobrindo(endereco, prefixo):
+            if "X" not in registro.flags and (listas is None or registro.lista in listas):
+                return registro
+        return None
+
+    # Procura o nó da rede e o cria se não existir, dividindo um ramo comprimido quando a rede
+    # nova se separa dele no meio do caminho.
+    def _no_da_rede(self, valor, comprimento):
+        no = 0
+        while True:
+            comprimento_no = self._comprimentos[no]
+            if comprimento_no == comprimento:
+                return no
+            lado = _bit(valor, comprimento_no)
+            filho = self._filhos[lado][no]
+            if filho is None:
+                novo = self._novo_no(valor, comprimento)
+                self._filhos[lado][no] = novo
+                return novo
+            valor_filho, comprimento_filho = self._valores[filho], self._comprimentos[filho]
+            comum = min(_prefixo_comum(valor, valor_filho), comprimento, comprimento_filho)
+            if comum == comprimento_filho:
+                no = filho
+                continue
+            # A rede nova e o filho se separam no bit 'comum': um nó intermediário passa a ser o pai
+            # dos dois (ou a própria rede nova é o pai, se ela contém o filho).
+            intermediario = self._novo_no(*_rede(valor, comum))
+            self._filhos[lado][no] = intermediario
+            self._filhos[_bit(valor_filho, comum)][intermediario] = filho
+            if comum == comprimento:
+                return intermediario
+            novo = self._novo_no(valor, comprimento)
+            self._filhos[_bit(valor, comum)][intermediario] = novo
+            return novo
+
+    def _novo_no(self, valor, comprimento):
+        self._valores.append(valor)
+        self._comprimentos.append(comprimento)
+        self._filhos[0].append(None)
+        self._filhos[1].append(None)
+        self._entradas.append(None)
+        return len(self._valores) - 1
+
+# Rede (valor com os bits do host zerados, comprimento) de um endereço inteiro e prefixo.
+def _rede(valor, comprimento):
+    return valor & (0xFFFFFFFF << (32 - comprimento)) & 0xFFFFFFFF, comprimento
+
+# Quantidade de bits iniciais iguais entre dois endereços inteiros.
+def _prefixo_comum(a, b):
+    return 32 - (a ^ b).bit_length()
+
+# Bit do endereço na posição 'posicao' (0 = bit mais significativo).
+def _bit(valor, posicao):
+    return (valor >> (31 - posicao)) & 1
+
+# Monta o índice a partir de uma sequência de RegistroEndereco (ex.: ler_registros(caminho)).
+def indice_de_registros(registros):
+    indice = IndiceCIDR()
+    for registro in registros:
+        indice.adicionar(registro)
+    return indice
+
+# Entradas das listas alvo ('eh_alvo(nome da lista)') que já estão cobertas por outra entrada:
+# uma rede de uma das 'listas_cobertura', uma rede mais ampla da própria lista ou uma entrada
+# repetida anterior da mesma lista. Gera (registro redundante, registro que o cobre), na ordem do
+# índice. Entradas desabilitadas (flag X) não são avaliadas nem contam como cobertura.
+def entradas_redundantes(indice, eh_alvo=lambda nome: "PORTASCAN" in nome, listas_cobertura=LISTAS_COBERTURA_PADRAO):
+    listas_cobertura = set(listas_cobertura)
+    for registro in indice.registros:
+        if "X" in registro.flags or not eh_alvo(registro.lista):
+            continue
+        for cobertura in indice.cobrindo(registro.endereco, registro.prefixo):
+            if cobertura is registro or "X" in cobertura.flags:
+                continue
+            if cobertura.lista in listas_cobertura:
+                yield registro, cobertura
+                break
+            if cobertura.lista == registro.lista and (cobertura.prefixo < registro.prefixo or cobertura.linha < registro.linha):
+                yield registro, cobertura
+                break
+
+def _texto_rede(registro):
+    return registro.endereco if registro.prefixo == 32 else f"{registro.endereco}/{registro.prefixo}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Índice CIDR das address-lists: cobertura de IPs e entradas redundantes.")
+    parser.add_argument("arquivo", nargs="?", default="portascan-list.txt", help="exportação do RouterOS (padrão: portascan-list.txt)")
+    parser.add_argument("--alvo", default="PORTASCAN", help="texto que identifica as listas avaliadas (padrão: PORTASCAN)")
+    parser.add_argument("--cobertura", nargs="+", default=list(LISTAS_COBERTURA_PADRAO), help="listas que tornam redundantes as entradas contidas nelas")
+    parser.add_argument("--consultar", nargs="+", metavar="IP", help="mostrar as entradas que cobrem cada IP (ou rede) informado")
+    parser.add_argument("--saida", help="gravar as entradas redundantes em CSV")
+    argumentos = parser.parse_args()
+
+    indice = indice_de_registros(ler_registros(argumentos.arquivo))
+    print(f"Índice com {len(indice)} entradas de '{argumentos.arquivo}'.")
+
+    if argumentos.consultar:
+        for consulta in argumentos.consultar:
+            endereco, _, prefixo = consulta.partition("/")
+            cobertura = indice.cobrindo(endereco, int(prefixo) if prefixo else 32)
+            descricao = ", ".join(f"{registro.lista} {_texto_rede(registro)}" for registro in cobertura) or "nenhuma entrada"
+            print(f"{consulta}: {descricao}")
+        raise SystemExit
+
+    redundantes = list(entradas_redundantes(indice, lambda nome: argumentos.alvo in nome, argumentos.cobertura))
+    for registro, cobertura in redundantes:
+        print(
+            f"Linha {registro.linha}: {registro.lista} {_texto_rede(registro)} já coberta por "
+            f"{cobertura.lista} {_texto_rede(cobertura)} (linha {cobertura.linha})"
+        )
+    print(f"Entradas redundantes: {len(redundantes)}")
+    if argumentos.saida:
+        with open(argumentos.saida, "w", newline="", encoding="utf-8") as arquivo:
+            escritor = csv.writer(arquivo)
+            escritor.writerow(["Linha", "Número", "Lista", "Endereço", "Coberta por Lista", "Coberta por Endereço", "Linha da Cobertura"])
+            for registro, cobertura in redundantes:
+                escritor.writerow([registro.linha, registro.numero, registro.lista, _texto_rede(registro), cobertura.lista, _texto_rede(cobertura), cobertura.linha])
+        print(f"Relatório salvo em: {argumentos.saida}")
@@ -0,0 +1,446 @@
+import os  # Tamanho do arquivo, para ler o conteúdo direto em um array.
+import re  # Localiza as linhas de cabeçalho ("#  LIST  ADDRESS ...") no conteúdo do arquivo.
+
+import numpy as np  # Todo o arquivo é tratado como um array de bytes e cada coluna vira um array numérico.
+
+from leitor_routeros import (  # Mesmas flags válidas do leitor em fluxo.
+    FLAGS_PADRAO,
+    _ler_legenda_flags,
+)
+
+# --- Leitura Colunar da Exportação do RouterOS ---
+
+# Cabeçalho de colunas de '/ip firewall address-list print': "#", seguido dos nomes das colunas.
+_PADRAO_CABECALHO = re.compile(rb"( *)#((?: +[A-Z][A-Z-]*)+) *")
+
+# Meses no formato antigo de data do RouterOS ("dec/09/2024"), codificados como inteiros de 3 bytes.
+_MESES = [b"jan", b"feb", b"mar", b"apr", b"may", b"jun", b"jul", b"aug", b"sep", b"oct", b"nov", b"dec"]
+_CODIGOS_MESES = np.array([(m[0] << 16) | (m[1] << 8) | m[2] for m in _MESES], dtype=np.int32)
+_ORDEM_MESES = np.argsort(_CODIGOS_MESES)
+
+# Quantidade de linhas processadas por vez: limita o tamanho dos arrays temporários de caracteres.
+LINHAS_POR_BLOCO = 200_000
+
+# Maior largura lida da coluna TIMEOUT (a última coluna não tem largura fixa).
+LARGURA_MAXIMA_TIMEOUT = 24
+
+# Tamanho dos trechos do arquivo percorridos de uma vez na procura das quebras de linha.
+BYTES_POR_TRECHO = 16 * 1024 * 1024
+
+# Bytes acrescentados ao fim do conteúdo, mais largos que qualquer coluna lida.
+FOLGA_FINAL = 256
+
+ESPACO, PONTO, BARRA, HIFEN, DOIS_PONTOS = 32, 46, 47, 45, 58
+
+# Exportação carregada em colunas (struct of arrays), uma posição por entrada:
+# - 'linhas': número da linha no arquivo (int64);
+# - 'ips': endereço IPv4 (uint32) e 'prefixos': tamanho do prefixo (uint8, 32 para um IP isolado);
+# - 'criacao': CREATION-TIME (datetime64[s], NaT quando ausente);
+# - 'codigos_lista': código (int32) de cada entrada em 'listas', a lista de nomes distintos;
+# - 'flags' e 'timeouts': textos curtos em arrays de bytes de largura fixa (b"" quando ausentes).
+# Nenhum objeto Python é criado por entrada: só os nomes distintos de lista viram texto.
+# Entradas de nome de host não têm IPv4 e ficam de fora (contadas em 'hosts'); entradas com
+# qualquer campo inválido também ficam de fora (contadas em 'rejeitadas').
+class ExportacaoColunar:
+    def __init__(self, linhas, ips, prefixos, criacao, codigos_lista, listas, flags, timeouts, hosts=0, rejeitadas=0):
+        self.linhas = linhas
+        self.ips = ips
+        self.prefixos = prefixos
+        self.criacao = criacao
+        self.codigos_lista = codigos_lista
+        self.listas = listas
+        self.flags = flags
+        self.timeouts = timeouts
+        self.hosts = hosts
+        self.rejeitadas = rejeitadas
+
+    def __len__(self):
+        return len(self.ips)
+
+    # Nova exportação apenas com as entradas em que 'mascara' (array booleano) é verdadeira.
+    def filtrar(self, mascara):
+        return ExportacaoColunar(
+            self.linhas[mascara], self.ips[mascara], self.prefixos[mascara], self.criacao[mascara],
+            self.codigos_lista[mascara], self.listas, self.flags[mascara], self.timeouts[mascara],
+            self.hosts, self.rejeitadas,
+        )
+
+    # Máscara das entradas cujas listas satisfazem 'condicao' (função que recebe o nome da lista).
+    def mascara_listas(self, condicao):
+        escolhidas = np.array([condicao(nome) for nome in self.listas], dtype=bool)
+        return escolhidas[self.codigos_lista] if len(self.listas) else np.zeros(len(self), dtype=bool)
+
+# Lê a exportação inteira de uma vez para arrays NumPy. As colunas são recortadas pelas posições
+# do cabeçalho, como no leitor em fluxo (leitor_routeros.py), mas todas as linhas de um bloco
+# são convertidas juntas, com operações vetorizadas sobre a matriz de caracteres de cada coluna.
+def ler_exportacao_colunar(caminho):
+    # O arquivo é lido direto para um array já com a folga final e um '\n' depois do último byte
+    # (uma linha vazia a mais, se o arquivo já terminar em '\n'), sem cópias do conteúdo.
+    tamanho = os.path.getsize(caminho)
+    conteudo = np.full(tamanho + 1 + FOLGA_FINAL, ESPACO, dtype=np.uint8)
+    with open(caminho, "rb") as arquivo:
+        tamanho = arquivo.readinto(memoryview(conteudo)[:tamanho])
+    conteudo[tamanho] = ord("\n")
+    fins = _posicoes_do_byte(conteudo[:tamanho + 1], ord("\n"))
+    inicios = np.concatenate(([0], fins[:-1] + 1))
+    # Em arquivos com quebra de linha CRLF, o '\r' final não faz parte da linha.
+    fins = fins - (conteudo[np.maximum(fins - 1, 0)] == ord("\r"))
+
+    # Cabeçalhos e legendas de flags são poucas linhas: são localizados pelo '#' e pelo 'F' inicial
+    # e só essas linhas passam pela expressão regular.
+    def linha(indice):
+        return conteudo[inicios[indice]:fins[indice]].tobytes()
+
+    com_cerquilha = np.unique(np.searchsorted(inicios, _posicoes_do_byte(conteudo, ord("#")), side="right") - 1)
+    cabecalhos = []
+    for indice in com_cerquilha:
+        cabecalho = _PADRAO_CABECALHO.fullmatch(linha(indice))
+        if cabecalho:
+            cabecalhos.append((int(indice), cabecalho))
+    legendas = [
+        (int(indice), _ler_legenda_flags(linha(indice).decode(errors="replace")))
+        for indice in np.flatnonzero(conteudo[inicios] == ord("F"))
+        if linha(indice).startswith(b"Flags:")
+    ]
+
+    # Cada cabeçalho define as posições das colunas até o próximo cabeçalho (exportações concatenadas).
+    partes = []
+    listas = {}
+    hosts = rejeitadas = 0
+    for posicao_cabecalho, (indice_cabecalho, cabecalho) in enumerate(cabecalhos):
+        # Flags válidas: as da última legenda antes do cabeçalho, ou as padrão.
+        letras = "".join(FLAGS_PADRAO)
+        for indice_legenda, letras_legenda in legendas:
+            if indice_legenda < indice_cabecalho and letras_legenda:
+                letras = "".join(letras_legenda)
+        primeira_linha = indice_cabecalho + 1
+        ultima_linha = len(inicios)
+        if posicao_cabecalho + 1 < len(cabecalhos):
+            ultima_linha = cabecalhos[posicao_cabecalho + 1][0]
+        posicoes = _posicoes_colunas(cabecalho)
+        if posicoes is None:
+            continue
+        for bloco in range(primeira_linha, ultima_linha, LINHAS_POR_BLOCO):
+            fim_bloco = min(bloco + LINHAS_POR_BLOCO, ultima_linha)
+            resultado = _ler_bloco(conteudo, inicios[bloco:fim_bloco], fins[bloco:fim_bloco], posicoes, letras)
+            if resultado is None:
+                continue
+            colunas, hosts_bloco, rejeitadas_bloco = resultado
+            hosts += hosts_bloco
+            rejeitadas += rejeitadas_bloco
+            colunas["linhas"] += bloco + 1
+            # Os nomes de lista de cada bloco são trocados pelos códigos do dicionário geral de listas.
+            nomes, codigos = _codificar_textos(colunas.pop("lista"))
+            tradutor = np.array([listas.setdefault(nome.decode(), len(listas)) for nome in nomes], dtype=np.int32)
+            colunas["codigos_lista"] = tradutor[codigos] if len(nomes) else np.empty(0, dtype=np.int32)
+            partes.append(colunas)
+
+    def juntar(nome, tipo):
+        return np.concatenate([parte[nome] for parte in partes]) if partes else np.empty(0, dtype=tipo)
+
+    return ExportacaoColunar(
+        linhas=juntar("linhas", np.int64),
+        ips=juntar("ips", np.uint32),
+        prefixos=juntar("prefixos", np.uint8),
+        criacao=juntar("criacao", "datetime64[s]"),
+        codigos_lista=juntar("codigos_lista", np.int32),
+        listas=list(listas),
+        flags=juntar("flags", "S1"),
+        timeouts=juntar("timeouts", "S1"),
+        hosts=hosts,
+        rejeitadas=rejeitadas,
+    )
+
+# Posições de um byte no conteúdo, procuradas em trechos para não criar uma máscara do arquivo inteiro.
+def _posicoes_do_byte(conteudo, byte):
+    posicoes = [
+        np.flatnonzero(conteudo[inicio:inicio + BYTES_POR_TRECHO] == byte) + inicio
+        for inicio in range(0, len(conteudo), BYTES_POR_TRECHO)
+    ]
+    return np.concatenate(posicoes) if posicoes else np.empty(0, dtype=np.intp)
+
+# Posições das colunas no cabeçalho: fim da coluna do número ("#"), início de cada coluna conhecida
+# e a lista de todos os inícios (antes de cada um deve haver um espaço). None sem LIST e ADDRESS.
+def _posicoes_colunas(cabecalho):
+    linha = cabecalho.group(0)
+    inicio_numero = len(cabecalho.group(1))
+    nomes = {}
+    for encontrado in re.finditer(rb"[A-Z][A-Z-]*", linha):
+        nomes[encontrado.group(0).decode()] = encontrado.start()
+    if "LIST" not in nomes or "ADDRESS" not in nomes:
+        return None
+    inicios = sorted(nomes.values())
+    fins = {posicao: (inicios[i + 1] if i + 1 < len(inicios) else None) for i, posicao in enumerate(inicios)}
+    trechos = {nome: (posicao, fins[posicao]) for nome, posicao in nomes.items()}
+    return inicio_numero, trechos, inicios
+
+# Matriz (linhas x largura) com os caracteres de cada linha a partir de 'inicio'.
+# Posições além do fim da linha viram espaço, como se a linha estivesse completa.
+# Cada linha da matriz é copiada de uma vez de uma janela deslizante sobre o conteúdo, que termina
+# com FOLGA_FINAL bytes extras para que a janela da última linha não passe do fim do array.
+def _caracteres(conteudo, inicios, fins, inicio, largura):
+    janelas = np.lib.stride_tricks.sliding_window_view(conteudo, largura)
+    matriz = janelas[np.minimum(inicios + inicio, len(janelas) - 1)]
+    matriz[np.arange(largura) >= (fins - inicios - inicio)[:, None]] = ESPACO
+    return matriz
+
+# Linhas em que o texto da matriz não tem espaço no meio: depois do primeiro espaço só há espaços.
+def _sem_espaco_no_meio(matriz):
+    return ~np.any((matriz[:, :-1] == ESPACO) & (matriz[:, 1:] != ESPACO), axis=1)
+
+# Converte uma matriz de caracteres em um array de bytes de largura fixa, sem espaços.
+# Com 'compactar=True', os caracteres são antes movidos para o início (ex.: flags " D " → "D");
+# o laço percorre as colunas, que são poucas nesse caso.
+def _texto_fixo(matriz, compactar=False):
+    if matriz.shape[1] == 0:
+        return np.zeros(len(matriz), dtype="S1")
+    if compactar:
+        compactada = np.full(matriz.shape, ESPACO, dtype=np.uint8)
+        linhas = np.arange(len(matriz))
+        ocupadas = np.zeros(len(matriz), dtype=np.intp)
+        for coluna in range(matriz.shape[1]):
+            preenchida = matriz[:, coluna] != ESPACO
+            compactada[linhas[preenchida], ocupadas[preenchida]] = matriz[preenchida, coluna]
+            ocupadas += preenchida
+        matriz = compactada
+    sem_espacos = np.ascontiguousarray(np.where(matriz == ESPACO, 0, matriz))
+    return sem_espacos.view(f"S{matriz.shape[1]}").ravel()
+
+# Códigos dos textos de uma matriz de caracteres (ex.: a coluna LIST): retorna (nomes distintos em
+# bytes, código de cada linha). As linhas são agrupadas por um hash de 64 bits, bem mais rápido de
+# ordenar que os textos; se dois textos diferentes colidirem, ordena os próprios textos.
+def _codificar_textos(matriz):
+    hashes = np.zeros(len(matriz), dtype=np.uint64)
+    for coluna in range(matriz.shape[1]):
+        hashes = hashes * np.uint64(1099511628211) + matriz[:, coluna]
+    _, primeiras, codigos = np.unique(hashes, return_index=True, return_inverse=True)
+    # Nomes na ordem em que aparecem no arquivo.
+    ordem = np.argsort(primeiras)
+    codigos = np.argsort(ordem)[codigos]
+    representantes = matriz[primeiras[ordem]]
+    if not np.array_equal(matriz, representantes[codigos]):
+        nomes, codigos = np.unique(_texto_fixo(matriz), return_inverse=True)
+        return list(nomes), codigos
+    return list(_texto_fixo(representantes)), codigos
+
+def _digitos(matriz):
+    return (matriz >= ord("0")) & (matriz <= ord("9"))
+
+# Converte um bloco de linhas. Retorna (colunas, hosts, rejeitadas) ou None se não houver entradas.
+def _ler_bloco(conteudo, inicios, fins, posicoes, letras_flags):
+    inicio_numero, trechos, inicios_colunas = posicoes
+    inicio_lista, fim_lista = trechos["LIST"]
+    inicio_endereco, fim_endereco = trechos["ADDRESS"]
+
+    # Entradas: linha começando com espaço ou dígito e com dígito na posição do "#" do cabeçalho.
+    # Comentários ';;;', linhas 'Flags:'/'Columns:' e linhas vazias ficam de fora aqui.
+    largura_numero = inicio_lista
+    numero = _caracteres(conteudo, inicios, fins, 0, largura_numero)
+    primeiro = numero[:, 0]
+    candidatas = ((primeiro == ESPACO) | _digitos(primeiro)) & _digitos(numero[:, min(inicio_numero, largura_numero - 1)])
+    if not candidatas.any():
+        return None
+    inicios, fins, numero = inicios[candidatas], fins[candidatas], numero[candidatas]
+    linhas = np.flatnonzero(candidatas).astype(np.int64)
+    validas = np.ones(len(inicios), dtype=bool)
+
+    # Número (alinhado à direita até o "#") e flags (entre o número e a coluna LIST).
+    parte_numero = numero[:, :inicio_numero + 1]
+    validas &= np.all((parte_numero == ESPACO) | _digitos(parte_numero), axis=1)
+    parte_flags = numero[:, inicio_numero + 1:]
+    validas &= np.all(np.isin(parte_flags, np.frombuffer(b" " + letras_flags.encode(), dtype=np.uint8)), axis=1)
+    flags = _texto_fixo(parte_flags, compactar=True)
+
+    # Antes de cada coluna deve haver um espaço; senão o valor anterior não coube na largura.
+    for posicao in inicios_colunas:
+        if posicao > 0:
+            validas &= _caracteres(conteudo, inicios, fins, posicao - 1, 1)[:, 0] == ESPACO
+
+    lista = _caracteres(conteudo, inicios, fins, inicio_lista, (fim_lista or inicio_lista + 64) - inicio_lista)
+    validas &= lista[:, 0] != ESPACO
+    # Um espaço no meio do nome indicaria colunas desalinhadas.
+    validas &= _sem_espaco_no_meio(lista)
+
+    largura_endereco = (fim_endereco or inicio_endereco + 24) - inicio_endereco
+    endereco = _caracteres(conteudo, inicios, fins, inicio_endereco, largura_endereco)
+    ips, prefixos, endereco_valido, eh_host = _converter_enderecos(endereco)
+    eh_host &= validas
+    hosts = int(np.count_nonzero(eh_host))
+    validas &= endereco_valido
+
+    if "CREATION-TIME" in trechos:
+        inicio_criacao, _ = trechos["CREATION-TIME"]
+        criacao, criacao_valida = _converter_criacao(_caracteres(conteudo, inicios, fins, inicio_criacao, 21))
+        validas &= criacao_valida
+    else:
+        criacao = np.full(len(inicios), np.datetime64("NaT"), dtype="datetime64[s]")
+
+    if "TIMEOUT" in trechos:
+        inicio_timeout, _ = trechos["TIMEOUT"]
+        timeout = _caracteres(conteudo, inicios, fins, inicio_timeout, LARGURA_MAXIMA_TIMEOUT)
+        permitido = _digitos(timeout) | np.isin(timeout, np.frombuffer(b"wdhms: ", dtype=np.uint8))
+        validas &= np.all(permitido, axis=1) & _sem_espaco_no_meio(timeout)
+        timeouts = _texto_fixo(timeout)
+    else:
+        timeouts = np.zeros(len(inicios), dtype="S1")
+
+    rejeitadas = int(np.count_nonzero(~validas & ~eh_host))
+    colunas = {
+        "linhas": linhas[validas],
+        "ips": ips[validas],
+        "prefixos": prefixos[validas],
+        "criacao": criacao[validas],
+        "lista": lista[validas],
+        "flags": flags[validas],
+        "timeouts": timeouts[validas],
+    }
+    return colunas, hosts, rejeitadas
+
+# Converte a coluna ADDRESS ("203.0.113.7", "123.45.67.0/24") em IPv4 uint32 e prefixo uint8.
+# O laço percorre as posições da coluna (poucas dezenas), cada passo valendo para todas as linhas.
+# Retorna (ips, prefixos, validos, eh_host): nomes de host são marcados à parte.
+def _converter_enderecos(matriz):
+    quantidade, largura = matriz.shape
+    partes = [np.zeros(quantidade, dtype=np.uint32) for _ in range(5)] # 4 octetos e o prefixo
+    digitos = [np.zeros(quantidade, dtype=np.uint8) for _ in range(5)]
+    segmento = np.zeros(quantidade, dtype=np.uint8)
+    terminou = np.zeros(quantidade, dtype=bool)
+    invalido = np.zeros(quantidade, dtype=bool)
+    for coluna in range(largura):
+        if terminou.all():
+            break
+        caractere = matriz[:, coluna]
+        espaco = caractere == ESPACO
+        ativo = ~terminou & ~espaco
+        digito = ativo & (caractere >= ord("0")) & (caractere <= ord("9"))
+        ponto = ativo & (caractere == PONTO)
+        barra = ativo & (caractere == BARRA)
+        invalido |= terminou & ~espaco # nada pode vir depois do espaço que encerra o endereço
+        invalido |= ativo & ~(digito | ponto | barra)
+        invalido |= ponto & (segmento >= 3)
+        invalido |= barra & (segmento != 3)
+        valor = caractere.astype(np.uint32) - ord("0")
+        for indice in range(5):
+            no_segmento = digito & (segmento == indice)
+            if no_segmento.any():
+                partes[indice] = np.where(no_segmento, partes[indice] * 10 + valor, partes[indice])
+                digitos[indice] += no_segmento
+        segmento += ponto
+        segmento[barra] = 4
+        terminou |= espaco
+    octetos_validos = np.ones(quantidade, dtype=bool)
+    for indice in range(4):
+        octetos_validos &= (digitos[indice] >= 1) & (digitos[indice] <= 3) & (partes[indice] <= 255)
+    com_prefixo = segmento == 4
+    prefixo_valido = ~com_prefixo | ((digitos[4] >= 1) & (digitos[4] <= 2) & (partes[4] <= 32))
+    validos = ~invalido & (segmento >= 3) & octetos_validos & prefixo_valido
+    # Nome de host: letras, dígitos, '-' e '.', com pelo menos uma letra e nada depois do primeiro espaço.
+    letras = ((matriz | 0x20) >= ord("a")) & ((matriz | 0x20) <= ord("z"))
+    permitidos = letras | _digitos(matriz) | (matriz == HIFEN) | (matriz == PONTO)
+    eh_host = (
+        ~validos & np.any(letras, axis=1) & (matriz[:, 0] != ESPACO) & _sem_espaco_no_meio(matriz)
+        & np.all(permitidos | (matriz == ESPACO), axis=1)
+    )
+    ips = (partes[0] << 24) | (partes[1] << 16) | (partes[2] << 8) | partes[3]
+    prefixos = np.where(com_prefixo, partes[4], 32).astype(np.uint8)
+    return ips.astype(np.uint32), prefixos, validos, eh_host
+
+# Converte a coluna CREATION-TIME em datetime64[s]. Aceita "2024-12-09 09:37:17" e "dec/09/2024 09:37:17".
+# Coluna em branco vira NaT. Retorna (criacao, validas).
+def _converter_criacao(matriz):
+    def numero(inicio, fim):
+        valor = np.zeros(len(matriz), dtype=np.int64)
+        so_digitos = np.ones(len(matriz), dtype=bool)
+        for coluna in range(inicio, fim):
+            caractere = matriz[:, coluna]
+            so_digitos &= _digitos(caractere)
+            valor = valor * 10 + caractere - ord("0")
+        return valor, so_digitos
+
+    em_branco = np.all(matriz == ESPACO, axis=1)
+    atual = (matriz[:, 4] == HIFEN) & (matriz[:, 7] == HIFEN) & (matriz[:, 10] == ESPACO)
+    antiga = (matriz[:, 3] == BARRA) & (matriz[:, 6] == BARRA) & (matriz[:, 11] == ESPACO)
+
+    # Formato atual: AAAA-MM-DD HH:MM:SS
+    ano, ok_ano = numero(0, 4)
+    mes, ok_mes = numero(5, 7)
+    dia, ok_dia = numero(8, 10)
+    validas_atual = atual & ok_ano & ok_mes & ok_dia & (matriz[:, 19] == ESPACO)
+    relogio = 11
+
+    # Formato antigo: mmm/DD/AAAA HH:MM:SS (um caractere mais longo)
+    codigo = ((matriz[:, 0] | 0x20).astype(np.int32) << 16) | ((matriz[:, 1] | 0x20).astype(np.int32) << 8) | (matriz[:, 2] | 0x20)
+    posicao = np.searchsorted(_CODIGOS_MESES[_ORDEM_MESES], codigo)
+    posicao = np.minimum(posicao, len(_MESES) - 1)
+    mes_antigo_valido = _CODIGOS_MESES[_ORDEM_MESES][posicao] == codigo
+    dia_antigo, ok_dia_antigo = numero(4, 6)
+    ano_antigo, ok_ano_antigo = numero(7, 11)
+    validas_antiga = antiga & mes_antigo_valido & ok_dia_antigo & ok_ano_antigo & (matriz[:, 20] == ESPACO)
+    ano = np.where(antiga, ano_antigo, ano)
+    mes = np.where(antiga, _ORDEM_MESES[posicao] + 1, mes)
+    dia = np.where(antiga, dia_antigo, dia)
+
+    hora = np.where(antiga, numero(relogio + 1, relogio + 3)[0], numero(relogio, relogio + 2)[0])
+    minuto = np.where(antiga, numero(relogio + 4, relogio + 6)[0], numero(relogio + 3, relogio + 5)[0])
+    segundo = np.where(antiga, numero(relogio + 7, relogio + 9)[0], numero(relogio + 6, relogio + 8)[0])
+    deslocamento = np.where(antiga, 1, 0)
+    linhas = np.arange(len(matriz))
+    separadores_ok = np.ones(len(matriz), dtype=bool)
+    for relativa, caractere in ((2, DOIS_PONTOS), (5, DOIS_PONTOS)):
+        separadores_ok &= matriz[linhas, relogio + relativa + deslocamento] == caractere
+    for relativa in (0, 1, 3, 4, 6, 7):
+        separadores_ok &= _digitos(matriz[linhas, relogio + relativa + deslocamento])
+
+    validas = (validas_atual | validas_antiga) & separadores_ok
+    validas &= (mes >= 1) & (mes <= 12) & (hora <= 23) & (minuto <= 59) & (segundo <= 59) & (dia >= 1)
+    inicio_mes = ((ano - 1970) * 12 + np.clip(mes, 1, 12) - 1).astype("datetime64[M]")
+    dias_no_mes = ((inicio_mes + 1).astype("datetime64[D]") - inicio_mes.astype("datetime64[D]")).astype(np.int64)
+    validas &= dia <= dias_no_mes
+    criacao = (
+        inicio_mes.astype("datetime64[D]").astype("datetime64[s]")
+        + ((dia - 1) * 86400 + hora * 3600 + minuto * 60 + segundo).astype("timedelta64[s]")
+    )
+    criacao = np.where(em_branco, np.datetime64("NaT"), criacao).astype("datetime64[s]")
+    return criacao, validas | em_branco
+
+# --- Decodificação dos Timeouts ---
+
+# Tabelas indexadas pelo byte de cada caractere do timeout do RouterOS ("2w3d6h48m34s", "1d02:03:04"):
+# fator e valor do dígito, segundos da unidade, ':' do relógio e se o número em andamento continua.
+_FATOR_DIGITO = np.ones(256, dtype=np.int64)
+_FATOR_DIGITO[48:58] = 10
+_VALOR_DIGITO = np.zeros(256, dtype=np.int64)
+_VALOR_DIGITO[48:58] = np.arange(10)
+_SEGUNDOS_UNIDADE = np.zeros(256, dtype=np.int64)
+for _letra, _segundos in zip(b"wdhms", (604800, 86400, 3600, 60, 1)):
+    _SEGUNDOS_UNIDADE[_letra] = _segundos
+_EH_DOIS_PONTOS = np.zeros(256, dtype=np.int64)
+_EH_DOIS_PONTOS[DOIS_PONTOS] = 1
+_MANTEM_NUMERO = np.where((_SEGUNDOS_UNIDADE > 0) | (_EH_DOIS_PONTOS > 0), 0, 1)
+
+# Converte uma coluna inteira de timeouts do RouterOS em segundos (int64), sem laço por entrada.
+# Aceita os dois formatos do TIMEOUT ("2w3d6h48m34s" e "1d02:03:04") em um array de bytes de
+# largura fixa (ExportacaoColunar.timeouts) ou em qualquer sequência de textos (coluna do DataFrame).
+# Entradas vazias ou que não começam por um dígito ("Sem Timeout") ficam com -1.
+# O laço é sobre as colunas de caracteres (no máximo LARGURA_MAXIMA_TIMEOUT), não sobre as entradas:
+# os dígitos se acumulam em 'atual', cada unidade soma 'atual' ao total e cada ':' desloca o relógio.
+def decodificar_timeouts(timeouts):
+    textos = np.asarray(timeouts)
+    if textos.dtype.kind != "S":
+        textos = np.char.encode(textos.astype(str), "ascii", "replace")
+    if len(textos) == 0:
+        return np.zeros(0, dtype=np.int64)
+    matriz = textos.view(np.uint8).reshape(len(textos), textos.dtype.itemsize)
+    # Só as colunas até o último caractere usado por alguma entrada.
+    largura = int(np.flatnonzero(matriz.any(axis=0))[-1]) + 1 if matriz.any() else 1
+    matriz = matriz[:, :largura]
+    total = np.zeros(len(matriz), dtype=np.int64)
+    relogio = np.zeros(len(matriz), dtype=np.int64)
+    atual = np.zeros(len(matriz), dtype=np.int64)
+    for coluna in np.ascontiguousarray(matriz.T):
+        atual = atual * _FATOR_DIGITO[coluna] + _VALOR_DIGITO[coluna]
+        total += atual * _SEGUNDOS_UNIDADE[coluna]
+        relogio += _EH_DOIS_PONTOS[coluna] * (relogio * 59 + atual * 60)
+        atual *= _MANTEM_NUMERO[coluna]
+    validos = (matriz[:, 0] >= 48) & (matriz[:, 0] <= 57)
+    return np.where(validos, total + relogio + atual, -1)
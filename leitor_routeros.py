@@ -0,0 +1,311 @@
+import glob  # Descoberta dos arquivos de exportação por padrões (ex.: "exportacoes/**/*.txt").
+import os  # Número de processadores e normalização dos caminhos encontrados.
+import re  # Expressões regulares usadas apenas para validar endereços e nomes de host, compiladas uma única vez.
+import sys  # Leitura da exportação pela entrada padrão ("-").
+from collections import (
+    namedtuple,  # Registro leve e imutável para cada entrada da lista.
+)
+from concurrent.futures import (
+    ProcessPoolExecutor,  # Leitura de vários arquivos em processos separados.
+)
+from itertools import repeat  # Mesmo filtro de listas enviado a cada arquivo do pool.
+from operator import (
+    itemgetter,  # Leitura, em uma única chamada, dos caracteres que separam as colunas.
+)
+
+# --- Leitor em Fluxo da Exportação do RouterOS ---
+
+# Uma entrada de '/ip firewall address-list print'.
+# - 'flags': letras da coluna de flags (ex.: "D" = dinâmica), ou "" quando não há nenhuma.
+# - 'endereco' e 'prefixo': IP (ou rede) e tamanho do prefixo; 32 para um IP isolado.
+#   Em entradas de nome de host, 'endereco' e 'prefixo' ficam None e o nome vai em 'host'.
+# - 'data', 'hora' e 'timeout': ficam None quando ausentes.
+# - 'comentario': texto da linha ';;;' imediatamente anterior à entrada, ou None.
+RegistroEndereco = namedtuple(
+    "RegistroEndereco",
+    ["linha", "numero", "flags", "lista", "endereco", "prefixo", "host", "data", "hora", "timeout", "comentario"],
+)
+
+# Cria o registro direto da tupla de campos, sem a verificação de argumentos do construtor do namedtuple.
+_novo_registro = tuple.__new__
+
+# Flags conhecidas da coluna de flags do RouterOS, usadas quando a exportação não traz a legenda 'Flags:'.
+FLAGS_PADRAO = {"X": "DISABLED", "D": "DYNAMIC", "I": "INVALID"}
+
+# Ordem das colunas quando a exportação não tem cabeçalho 'Columns:'.
+COLUNAS_PADRAO = ["LIST", "ADDRESS", "CREATION-TIME", "TIMEOUT"]
+
+# Meses no formato antigo de data do RouterOS ("dec/09/2024 09:37:17").
+MESES = {nome: f"{numero:02d}" for numero, nome in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1
+)}
+
+_PADRAO_IPV4 = re.compile(r"(?:(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)\.){3}(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)")
+_PADRAO_HOST = re.compile(r"(?=.*[A-Za-z])(?:[A-Za-z0-9](?:[A-Za-z0-9-]*[A-Za-z0-9])?\.)*[A-Za-z0-9](?:[A-Za-z0-9-]*[A-Za-z0-9])?")
+_PADRAO_CRIACAO = re.compile(r"\d{4}-[01]\d-[0-3]\d [0-2]\d:[0-5]\d:[0-5]\d")
+_PADRAO_CRIACAO_ANTIGA = re.compile(r"([A-Za-z]{3})/([0-3]\d)/(\d{4}) ([0-2]\d:[0-5]\d:[0-5]\d)")
+_PADRAO_TIMEOUT = re.compile(r"(?:\d+w)?(?:\d+d)?(?:\d+h)?(?:\d+m)?(?:\d+s)?|(?:\d+w)?(?:\d+d)?\d+:\d\d:\d\d")
+
+# Tamanho do buffer de leitura: poucas chamadas ao sistema operacional em exportações grandes.
+TAMANHO_BUFFER = 1024 * 1024
+
+# Lê a exportação linha a linha e gera um RegistroEndereco por entrada, sem carregar o arquivo
+# na memória: o consumo fica constante mesmo em exportações de vários gigabytes.
+# 'origem' pode ser o caminho do arquivo, "-" para a entrada padrão, ou um arquivo já aberto.
+# 'ao_ignorar', se informado, é chamado com (numero_da_linha, linha) para cada linha que não pôde
+# ser interpretada. Cabeçalhos, legendas e comentários ';;;' fazem parte do formato e não são avisados.
+def ler_registros(origem, ao_ignorar=None):
+    if origem == "-":
+        yield from _ler_linhas(sys.stdin, ao_ignorar)
+    elif isinstance(origem, str):
+        with open(origem, "r", buffering=TAMANHO_BUFFER) as arquivo:
+            yield from _ler_linhas(arquivo, ao_ignorar)
+    else:
+        yield from _ler_linhas(origem, ao_ignorar)
+
+# Interpretador de uma passada só. O formato de '/ip firewall address-list print' é:
+#   # 2024-12-30 21:50:21 by RouterOS 7.16.2      <- comentários do arquivo
+#   Flags: D - DYNAMIC                             <- legenda das flags
+#   Columns: LIST, ADDRESS, CREATION-TIME          <- nomes das colunas
+#     #   LIST        ADDRESS         CREATION-TIME <- cabeçalho: define a posição de cada coluna
+#   ;;; Loopback [RFC 3330]                         <- comentário da entrada seguinte
+#     6   bogons      127.0.0.0/8     2024-12-09 09:39:29
+#    13 D PORTASCAN   192.0.2.15      2024-12-29 19:50:48  2w3d6h
+# As colunas são recortadas pelas posições do cabeçalho, então valores vazios (ex.: TIMEOUT de
+# uma entrada estática) não deslocam as colunas seguintes. Sem cabeçalho, a linha é dividida nos espaços.
+def _ler_linhas(arquivo, ao_ignorar):
+    flags_validas = "".join(FLAGS_PADRAO)
+    colunas = COLUNAS_PADRAO
+    recortes = None
+    comentario = None
+    for numero_linha, linha in enumerate(arquivo, start=1):
+        texto = linha.lstrip()
+        if not texto or texto.isspace():
+            continue
+        inicio = texto[0]
+        if inicio.isdigit():
+            if recortes is not None:
+                # Caminho principal, recortado aqui mesmo para evitar chamadas extras por linha.
+                primeira, (a, b, c, d, e, f, g, h), largura, pegar_separadores, espacos = recortes
+                corpo = linha.rstrip().ljust(largura)
+                if pegar_separadores(corpo) != espacos:
+                    registro = None
+                else:
+                    registro = _montar_registro(
+                        numero_linha, corpo[:primeira].split(), corpo[a:b].strip(), corpo[c:d].strip(),
+                        corpo[e:f].strip(), corpo[g:h].strip(), flags_validas, comentario,
+                    )
+            else:
+                registro = _dividir_entrada(linha, numero_linha, flags_validas, comentario)
+            comentario = None
+            if registro is not None:
+                yield registro
+            elif ao_ignorar is not None:
+                ao_ignorar(numero_linha, linha)
+        elif inicio == ";" and texto.startswith(";;;"):
+            comentario = texto[3:].strip()
+        elif inicio == "#":
+            # Comentário do arquivo ou linha de cabeçalho ("#   LIST   ADDRESS ...").
+            novos = _recortes_colunas(linha, colunas)
+            if novos is not None:
+                recortes = novos
+        elif texto.startswith("Flags:"):
+            flags_validas = "".join(_ler_legenda_flags(texto)) or flags_validas
+        elif texto.startswith("Columns:"):
+            colunas = [nome.strip() for nome in texto[len("Columns:"):].split(",") if nome.strip()]
+            recortes = None
+        else:
+            comentario = None
+            if ao_ignorar is not None:
+                ao_ignorar(numero_linha, linha)
+
+# Lê a legenda "Flags: X - DISABLED; D - DYNAMIC" e retorna o conjunto de letras válidas.
+def _ler_legenda_flags(texto):
+    letras = set()
+    for item in texto[len("Flags:"):].split(";"):
+        letra = item.split("-", 1)[0].strip()
+        if len(letra) == 1:
+            letras.add(letra)
+    return letras
+
+# A partir da linha de cabeçalho, calcula onde recortar cada coluna. Retorna None se a linha não
+# for o cabeçalho. O resultado é:
+# - o início da primeira coluna (antes dele ficam o número e as flags);
+# - os trechos início/fim de LIST, ADDRESS, CREATION-TIME e TIMEOUT (colunas ausentes viram o trecho vazio);
+# - a largura mínima da linha e uma função que lê os caracteres logo antes de cada coluna, que devem
+#   ser espaços: senão o valor da coluna anterior não coube na largura e a linha seria mal recortada.
+def _recortes_colunas(linha, colunas):
+    posicoes = []
+    for nome in colunas:
+        posicao = linha.find(nome, posicoes[-1] + 1 if posicoes else 0)
+        if posicao < 0:
+            return None
+        posicoes.append(posicao)
+    fins = posicoes[1:] + [None]
+    trechos = {nome: (inicio, fim) for nome, inicio, fim in zip(colunas, posicoes, fins)}
+    separadores = [posicao - 1 for posicao in posicoes if posicao > 0]
+    return (
+        posicoes[0],
+        tuple(limite for nome in COLUNAS_PADRAO for limite in trechos.get(nome, (0, 0))),
+        posicoes[-1],
+        itemgetter(*separadores) if separadores else (lambda corpo: ()),
+        (" ",) * len(separadores) if len(separadores) != 1 else " ",
+    )
+
+# Divide nos espaços uma entrada de exportação sem cabeçalho:
+# número, flags (se houver), lista, endereço, data e hora (se houver) e timeout (se houver).
+def _dividir_entrada(linha, numero_linha, flags_validas, comentario):
+    partes = linha.split()
+    indice = 2 if len(partes) > 3 and not partes[1].strip(flags_validas) else 1
+    restantes = partes[indice:]
+    quantidade = len(restantes)
+    if quantidade < 2 or quantidade == 3 or quantidade > 5:
+        return None
+    criacao = f"{restantes[2]} {restantes[3]}" if quantidade >= 4 else ""
+    timeout = restantes[4] if quantidade == 5 else ""
+    return _montar_registro(
+        numero_linha, partes[:indice], restantes[0], restantes[1], criacao, timeout, flags_validas, comentario,
+    )
+
+# Valida os campos recortados de uma entrada e monta o RegistroEndereco, ou retorna None se algum
+# campo for inválido: uma linha mal interpretada nunca segue adiante.
+def _montar_registro(numero_linha, numero_e_flags, lista, texto_endereco, criacao, timeout, flags_validas, comentario):
+    if len(numero_e_flags) == 1:
+        flags = ""
+    elif len(numero_e_flags) == 2 and not numero_e_flags[1].strip(flags_validas):
+        flags = numero_e_flags[1]
+    else:
+        return None
+    numero = numero_e_flags[0]
+    if not numero.isdigit() or not lista or " " in lista:
+        return None
+
+    # Endereço: "203.0.113.7", "123.45.67.0/24" ou um nome de host.
+    host = None
+    if "/" in texto_endereco:
+        endereco, _, prefixo = texto_endereco.partition("/")
+        if not (_PADRAO_IPV4.fullmatch(endereco) and prefixo.isdigit() and int(prefixo) <= 32):
+            return None
+        prefixo = int(prefixo)
+    elif _PADRAO_IPV4.fullmatch(texto_endereco):
+        endereco, prefixo = texto_endereco, 32
+    elif len(texto_endereco) <= 253 and _PADRAO_HOST.fullmatch(texto_endereco):
+        endereco, prefixo, host = None, None, texto_endereco
+    else:
+        return None
+
+    # Data de criação no formato atual ("2024-12-09 09:37:17") ou no antigo ("dec/09/2024 09:37:17").
+    if not criacao:
+        data = hora = None
+    elif _PADRAO_CRIACAO.fullmatch(criacao):
+        data, hora = criacao[:10], criacao[11:]
+    else:
+        antiga = _PADRAO_CRIACAO_ANTIGA.fullmatch(criacao)
+        mes = MESES.get(antiga.group(1).lower()) if antiga else None
+        if mes is None:
+            return None
+        data, hora = f"{antiga.group(3)}-{mes}-{antiga.group(2)}", antiga.group(4)
+
+    if not timeout:
+        timeout = None
+    elif not _PADRAO_TIMEOUT.fullmatch(timeout):
+        return None
+
+    return _novo_registro(RegistroEndereco, (numero_linha, int(numero), flags, lista, endereco, prefixo, host, data, hora, timeout, comentario))
+
+# Data e hora em que a exportação foi gerada, da linha de comentário que o RouterOS escreve no início
+# do arquivo ("# 2024-12-30 21:50:21 by RouterOS 7.16.2", ou "# dec/30/2024 21:50:21 by RouterOS ...").
+# Retorna "AAAA-MM-DD HH:MM:SS", ou None se o arquivo não começar com essa linha.
+def data_da_exportacao(caminho):
+    with open(caminho, "r", errors="replace") as arquivo:
+        for linha in arquivo:
+            texto = linha.strip()
+            if not texto:
+                continue
+            if not texto.startswith("#") or " by RouterOS" not in texto:
+                return None
+            criacao = texto[1:texto.index(" by RouterOS")].strip()
+            if _PADRAO_CRIACAO.fullmatch(criacao):
+                return criacao
+            antiga = _PADRAO_CRIACAO_ANTIGA.fullmatch(criacao)
+            mes = MESES.get(antiga.group(1).lower()) if antiga else None
+            return f"{antiga.group(3)}-{mes}-{antiga.group(2)} {antiga.group(4)}" if mes else None
+    return None
+
+# --- Etapas do Fluxo ---
+
+# Encadeia a leitura de vários arquivos. 'ao_ignorar' recebe (caminho, numero_da_linha, linha).
+def ler_varios_arquivos(caminhos, ao_ignorar=None):
+    for caminho in caminhos:
+        avisar = None
+        if ao_ignorar is not None:
+            avisar = lambda numero_linha, linha, caminho=caminho: ao_ignorar(caminho, numero_linha, linha)
+        yield from ler_registros(caminho, avisar)
+
+# Mantém apenas os registros das listas informadas (ex.: {"PORTASCAN", "API_PORTASCAN"}).
+def filtrar_listas(registros, listas):
+    listas = set(listas)
+    return (registro for registro in registros if registro.lista in listas)
+
+# Mantém apenas o primeiro registro de cada endereço (ou host). Guarda só os endereços já vistos,
+# não os registros, então a memória acompanha a quantidade de endereços distintos.
+def remover_repetidos(registros):
+    vistos = set()
+    for registro in registros:
+        chave = registro.endereco if registro.endereco is not None else registro.host
+        if chave not in vistos:
+            vistos.add(chave)
+            yield registro
+
+# --- Várias Exportações em Paralelo ---
+
+# Ordem natural dos caminhos: "portascan-list2.txt" vem antes de "portascan-list10.txt".
+def _chave_natural(caminho):
+    return [int(parte) if parte.isdigit() else parte.lower() for parte in re.split(r"(\d+)", caminho)]
+
+# Encontra os arquivos de exportação que casam com os padrões glob (ex.: ["portascan-list*.txt",
+# "roteadores/**/*.txt"]). Cada arquivo aparece uma vez, em ordem natural do caminho.
+def descobrir_exportacoes(padroes):
+    caminhos = {
+        os.path.normpath(caminho)
+        for padrao in padroes
+        for caminho in glob.glob(padrao, recursive=True)
+        if os.path.isfile(caminho)
+    }
+    return sorted(caminhos, key=_chave_natural)
+
+# Lê um arquivo inteiro dentro de um processo do pool. Retorna (registros, linhas ignoradas), já
+# filtrados pelas listas pedidas para que menos registros voltem ao processo principal.
+def _ler_arquivo(caminho, listas):
+    ignoradas = []
+    registros = ler_registros(caminho, lambda numero_linha, linha: ignoradas.append((numero_linha, linha)))
+    if listas is not None:
+        registros = filtrar_listas(registros, listas)
+    return list(registros), ignoradas
+
+# Lê vários arquivos de exportação ao mesmo tempo, um por processo (até 'processos', por padrão
+# um por núcleo). Gera pares (caminho, registro) na ordem dos caminhos e, dentro de cada arquivo,
+# na ordem das linhas: o resultado é o mesmo da leitura sequencial, e 'registro.linha' continua
+# sendo o número da linha no arquivo de origem. 'ao_ignorar(caminho, numero_linha, linha)' é
+# chamado no processo principal, também na ordem dos arquivos.
+# Cada arquivo é lido por um único processo: o ganho vem de ter muitos arquivos, não arquivos grandes.
+def ler_em_paralelo(caminhos, listas=None, ao_ignorar=None, processos=None):
+    caminhos = list(caminhos)
+    if processos is None:
+        processos = min(len(caminhos), os.cpu_count() or 1)
+    executor = None
+    if processos > 1:
+        executor = ProcessPoolExecutor(max_workers=processos)
+        resultados = executor.map(_ler_arquivo, caminhos, repeat(listas))
+    else:
+        resultados = (_ler_arquivo(caminho, listas) for caminho in caminhos)
+    try:
+        for caminho, (registros, ignoradas) in zip(caminhos, resultados):
+            if ao_ignorar is not None:
+                for numero_linha, linha in ignoradas:
+                    ao_ignorar(caminho, numero_linha, linha)
+            for registro in registros:
+                yield caminho, registro
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
@@ -0,0 +1,110 @@
+import threading  # Módulo para proteger o estado de cada balde quando várias threads consultam a mesma API.
+import time  # Módulo para medir o tempo decorrido e pausar até haver uma ficha disponível.
+
+# --- Configuração dos Limites ---
+
+# Limite de cada provedor: (requisições por segundo, rajada máxima).
+# A rajada é quantas requisições podem sair de uma vez depois de um período ocioso.
+# Os valores seguem os limites publicados dos planos gratuitos e são ajustados em tempo
+# real pelos cabeçalhos de limite de taxa que a API devolver.
+LIMITES_TAXA = {
+    "api1": (5.0, 10), # ipwhois.app
+    "api2": (1.0, 1), # ipstack.com (plano gratuito com cota mensal pequena)
+    "api3": (45 / 60, 45), # ip-api.com: 45 requisições por minuto
+    "api3_lote": (15 / 60, 15), # ip-api.com /batch: 15 requisições por minuto
+}
+
+# Limite usado para provedores que não estão em LIMITES_TAXA: 1 requisição por segundo, como antes.
+LIMITE_PADRAO = (1.0, 1)
+
+# Pausa aplicada após um HTTP 429 quando a API não informa quanto tempo esperar.
+PAUSA_PADRAO_429 = 60
+
+# --- Balde de Fichas ---
+
+# Balde de fichas (token bucket) de um provedor: cada requisição consome uma ficha, e as
+# fichas são repostas continuamente na taxa configurada, até o limite da rajada.
+class BaldeDeFichas:
+    def __init__(self, taxa, capacidade):
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self.fichas = float(capacidade)
+        self.atualizado_em = time.monotonic()
+        # Momento (relógio monotônico) até o qual nenhuma requisição deve sair, após um 429 ou cota esgotada.
+        self.bloqueado_ate = 0.0
+        self._trava = threading.Lock()
+
+    def _repor(self, agora):
+        # Durante uma pausa 'atualizado_em' fica no futuro; nenhuma ficha é reposta até lá.
+        if agora > self.atualizado_em:
+            self.fichas = min(self.capacidade, self.fichas + (agora - self.atualizado_em) * self.taxa)
+            self.atualizado_em = agora
+
+    # Bloqueia a thread atual até haver uma ficha disponível e a consome.
+    def aguardar(self):
+        while True:
+            with self._trava:
+                agora = time.monotonic()
+                if agora < self.bloqueado_ate:
+                    espera = self.bloqueado_ate - agora
+                else:
+                    self._repor(agora)
+                    if self.fichas >= 1:
+                        self.fichas -= 1
+                        return
+                    espera = (1 - self.fichas) / self.taxa
+            time.sleep(espera)
+
+    # Impede novas requisições pelos próximos 'segundos' e esvazia o balde.
+    def pausar(self, segundos):
+        with self._trava:
+            agora = time.monotonic()
+            self.bloqueado_ate = max(self.bloqueado_ate, agora + segundos)
+            self.fichas = 0.0
+            self.atualizado_em = max(agora, self.bloqueado_ate)
+
+    # Ajusta o balde pelo que a API informou: 'restantes' requisições na janela atual,
+    # que reinicia em 'segundos_para_reiniciar'. Nunca deixa sair mais do que a API ainda aceita.
+    def ajustar(self, restantes, segundos_para_reiniciar):
+        if restantes <= 0:
+            self.pausar(segundos_para_reiniciar)
+            return
+        with self._trava:
+            self._repor(time.monotonic())
+            self.fichas = min(self.fichas, float(restantes))
+
+# --- Baldes por Provedor ---
+
+_baldes = {}
+_trava_baldes = threading.Lock()
+
+# Retorna o balde do provedor, criando-o a partir de LIMITES_TAXA na primeira vez.
+def obter_balde(provedor):
+    with _trava_baldes:
+        if provedor not in _baldes:
+            taxa, capacidade = LIMITES_TAXA.get(provedor, LIMITE_PADRAO)
+            _baldes[provedor] = BaldeDeFichas(taxa, capacidade)
+        return _baldes[provedor]
+
+# Aguarda a vez do provedor antes de enviar uma requisição.
+def aguardar_vez(provedor):
+    obter_balde(provedor).aguardar()
+
+# Lê os cabeçalhos de limite de taxa de uma resposta HTTP e ajusta o balde do provedor.
+# Entende os cabeçalhos do ip-api.com (X-Rl: requisições restantes, X-Ttl: segundos até a
+# janela reiniciar) e, em um HTTP 429, pausa o provedor pelo tempo de Retry-After ou X-Ttl.
+def registrar_resposta(provedor, response):
+    balde = obter_balde(provedor)
+    cabecalhos = response.headers
+    try:
+        restantes = int(cabecalhos["X-Rl"]) if "X-Rl" in cabecalhos else None
+        ttl = int(cabecalhos["X-Ttl"]) if "X-Ttl" in cabecalhos else None
+        retry_after = int(cabecalhos["Retry-After"]) if "Retry-After" in cabecalhos else None
+    except ValueError:
+        restantes = ttl = retry_after = None
+    if response.status_code == 429:
+        pausa = retry_after if retry_after is not None else ttl if ttl is not None else PAUSA_PADRAO_429
+        print(f"Limite de requisições atingido em {provedor} (HTTP 429); pausando por {pausa} s.")
+        balde.pausar(pausa)
+    elif restantes is not None and ttl is not None:
+        balde.ajustar(restantes, ttl)
@@ -1,9 +1,10 @@
 import re
 import pandas as pd
 from datetime import datetime
-from time import sleep
-import requests
 import os
+from cache_geolocalizacao import CacheGeolocalizacao
+from saude_provedores import provedor_disponivel, resumo_saude
+from geolocalizacao import consultar_geolocalizacao_api1, consultar_geolocalizacao_api2, consultar_geolocalizacao_api3
 
 # Caminho do arquivo exportado do Mikrotik
 file_path = "portascan-list.txt"
@@ -37,59 +38,33 @@ if not dados:
     print("Erro: Nenhum dado válido foi encontrado no arquivo.")
     exit()
 
-# Funções para consultar múltiplas APIs
-def consultar_geolocalizacao_api1(ip):
-    try:
-        response = requests.get(f"https://ipwhois.app/json/{ip}", timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            return (
-                data.get("city", "Desconhecida"),
-                data.get("region", "Desconhecida"),
-                data.get("country", "Desconhecido"),
-                data.get("zip", "Desconhecido"),
-            )
-    except Exception as e:
-        print(f"Erro na API 1 para {ip}: {e}")
-    return "Desconhecida", "Desconhecida", "Desconhecido", "Desconhecido"
-
-def consultar_geolocalizacao_api2(ip):
-    try:
-        access_key = "SUA_CHAVE_DE_API"
-        response = requests.get(f"http://api.ipstack.com/{ip}?access_key={access_key}", timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            return (
-                data.get("city", "Desconhecida"),
-                data.get("region_name", "Desconhecida"),
-                data.get("country_name", "Desconhecido"),
-                data.get("zip", "Desconhecido"),
-            )
-    except Exception as e:
-        print(f"Erro na API 2 para {ip}: {e}")
-    return "Desconhecida", "Desconhecida", "Desconhecido", "Desconhecido"
-
-def consultar_geolocalizacao_api3(ip):
-    try:
-        response = requests.get(f"http://ip-api.com/json/{ip}?fields=city,regionName,country,zip", timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            return (
-                data.get("city", "Desconhecida"),
-                data.get("regionName", "Desconhecida"),
-                data.get("country", "Desconhecido"),
-                data.get("zip", "Desconhecido"),
-            )
-    except Exception as e:
-        print(f"Erro na API 3 para {ip}: {e}")
-    return "Desconhecida", "Desconhecida", "Desconhecido", "Desconhecido"
+# Cadeia de APIs, com o nome de cada uma no disjuntor (ver saude_provedores.py). As consultas são as
+# de geolocalizacao.py, com limite de taxa, sessões HTTP e registro do resultado no disjuntor.
+apis = [
+    (consultar_geolocalizacao_api1, "api1"),
+    (consultar_geolocalizacao_api2, "api2"),
+    (consultar_geolocalizacao_api3, "api3"),
+]
+
+# Cache persistente compartilhado com os demais scripts (ver cache_geolocalizacao.py)
+cache = CacheGeolocalizacao()
 
 def consultar_geolocalizacao(ip):
-    for consulta in [consultar_geolocalizacao_api1, consultar_geolocalizacao_api2, consultar_geolocalizacao_api3]:
-        cidade, estado, pais, cep = consulta(ip)
+    # Consultar primeiro o cache em disco; as APIs só são chamadas quando o IP não está nele
+    em_cache = cache.obter(ip)
+    if em_cache is not None:
+        return em_cache[:4]
+    resultado = "Desconhecida", "Desconhecida", "Desconhecido", "Desconhecido"
+    for consulta, nome in apis:
+        if not provedor_disponivel(nome):
+            continue
+        cidade, estado, pais, cep, provedor = consulta(ip)
         if pais != "Desconhecido":
-            return cidade, estado, pais, cep
-    return "Desconhecida", "Desconhecida", "Desconhecido", "Desconhecido"
+            resultado = cidade, estado, pais, cep
+            # O provedor (ISP) não entra no relatório deste script, mas fica guardado no cache
+            cache.gravar(ip, resultado + (provedor,))
+            break
+    return resultado
 
 # Processar IPs e buscar geolocalização
 for idx, entrada in enumerate(dados, start=1):
@@ -102,7 +77,9 @@ for idx, entrada in enumerate(dados, start=1):
     entrada["CEP"] = cep
     entrada["Província"] = estado
     entrada["Bairro"] = cidade if cidade != "Desconhecida" else "Desconhecido"
-    sleep(1)
+
+print(cache.resumo())
+print(resumo_saude())
 
 # Criar um DataFrame do pandas
 df = pd.DataFrame(dados)
@@ -0,0 +1,132 @@
+from array import (
+    array,  # Códigos das entradas em arrays compactos de inteiros, sem um objeto Python por valor.
+)
+
+import numpy as np  # Expansão dos valores por IP distinto para as entradas, pelos códigos.
+import pandas as pd  # Colunas categóricas do DataFrame do relatório.
+
+from enderecos import (  # IPs guardados como inteiros de 32 bits.
+    int_para_ip,
+    ip_para_int,
+)
+
+# --- Entradas Enriquecidas em Colunas ---
+
+# Valor do campo 'Email Provedor': as APIs de geolocalização não informam o contato de abuso.
+EMAIL_NAO_DISPONIVEL = "Não disponível via API de Geolocalização"
+
+# Coluna de texto com muitos valores repetidos (datas, horas, timeouts): cada valor distinto é
+# guardado uma única vez e cada entrada guarda só o código dele, em um array de inteiros de 4 bytes.
+class ColunaCodificada:
+    __slots__ = ("_codigo_do_valor", "codigos", "valores")
+
+    def __init__(self):
+        self.codigos = array("i")
+        self.valores = []
+        self._codigo_do_valor = {}
+
+    def adicionar(self, valor):
+        codigo = self._codigo_do_valor.get(valor)
+        if codigo is None:
+            codigo = self._codigo_do_valor[valor] = len(self.valores)
+            self.valores.append(valor)
+        self.codigos.append(codigo)
+
+    def __len__(self):
+        return len(self.codigos)
+
+    # Códigos como array NumPy, sem copiar o conteúdo do array.
+    def indices(self):
+        return np.frombuffer(self.codigos, dtype=np.intc)
+
+    def categorica(self):
+        return pd.Categorical.from_codes(self.indices(), categories=self.valores)
+
+# Entradas do relatório em colunas (struct of arrays), no lugar de uma lista com um dicionário de
+# 12 chaves por entrada. Só IP (inteiro de 32 bits), Data, Hora e Timeout são guardados por entrada;
+# a geolocalização é guardada uma vez por IP distinto e expandida pelos índices do IP ao montar o
+# DataFrame. O texto de cada IP distinto só é criado quando os IPs são pedidos.
+class TabelaEntradas:
+    __slots__ = ("_indices_ips", "_ips", "data", "enderecos", "hora", "timeout")
+
+    def __init__(self):
+        self.enderecos = array("I")
+        self.data = ColunaCodificada()
+        self.hora = ColunaCodificada()
+        self.timeout = ColunaCodificada()
+        self._ips = None
+        self._indices_ips = None
+
+    def adicionar(self, ip, data, hora, timeout):
+        self.enderecos.append(ip_para_int(ip))
+        self.data.adicionar(data)
+        self.hora.adicionar(hora)
+        self.timeout.adicionar(timeout)
+        self._ips = None
+
+    def __len__(self):
+        return len(self.enderecos)
+
+    # IPs distintos, na ordem em que aparecem.
+    def ips(self):
+        self._indexar_ips()
+        return self._ips
+
+    # Índice de cada entrada na lista de 'ips()'.
+    def indices_ips(self):
+        self._indexar_ips()
+        return self._indices_ips
+
+    def _indexar_ips(self):
+        if self._ips is not None:
+            return
+        valores, primeiras, indices = np.unique(
+            np.frombuffer(self.enderecos, dtype=np.uintc), return_index=True, return_inverse=True
+        )
+        # 'np.unique' ordena os IPs numericamente; a ordem de aparição vem da primeira entrada de cada um.
+        ordem = np.argsort(primeiras, kind="stable")
+        posicoes = np.empty(len(ordem), dtype=np.intp)
+        posicoes[ordem] = np.arange(len(ordem))
+        self._ips = [int_para_ip(valor) for valor in valores[ordem].tolist()]
+        self._indices_ips = posicoes[indices]
+
+    # DataFrame do relatório, com as mesmas colunas do formato antigo ('resultados': IP -> tupla
+    # (cidade, estado, país, cep, provedor)). Todas as colunas são categóricas.
+    def dataframe(self, resultados):
+        colunas = {
+            "IP": pd.Categorical.from_codes(self.indices_ips(), categories=self.ips()),
+            "Data": self.data.categorica(),
+            "Hora": self.hora.categorica(),
+            "Timeout": self.timeout.categorica(),
+        }
+        colunas.update(colunas_geolocalizacao([resultados[ip] for ip in self.ips()], self.indices_ips()))
+        return pd.DataFrame(colunas, copy=False)
+
+# Coluna categórica a partir de um valor por item distinto e do índice do item em cada entrada:
+# cada valor diferente é guardado uma vez e as entradas guardam apenas o código dele.
+def coluna_categorica(valores, indices):
+    codigos, categorias = pd.factorize(np.asarray(valores, dtype=object))
+    return pd.Categorical.from_codes(codigos[indices], categories=categorias)
+
+# Colunas de geolocalização do relatório a partir dos resultados de cada IP distinto (na ordem de
+# 'resultados_por_ip') e do índice do IP em cada entrada. 'Província' é a própria coluna 'Estado'
+# (o DataFrame montado com copy=False guarda o mesmo objeto nas duas) e 'Bairro' reaproveita os
+# códigos de 'Cidade', trocando só a categoria "Desconhecida" por "Desconhecido".
+def colunas_geolocalizacao(resultados_por_ip, indices):
+    cidades, estados, paises, ceps, provedores = zip(*resultados_por_ip) if resultados_por_ip else ([],) * 5
+    cidade = coluna_categorica(cidades, indices)
+    estado = coluna_categorica(estados, indices)
+    return {
+        "Provedor": coluna_categorica(provedores, indices),
+        "Email Provedor": pd.Categorical.from_codes(np.zeros(len(indices), dtype=np.int8), categories=[EMAIL_NAO_DISPONIVEL]),
+        "Cidade": cidade,
+        "Estado": estado,
+        "País": coluna_categorica(paises, indices),
+        "CEP": coluna_categorica(ceps, indices),
+        "Província": estado,
+        "Bairro": _bairros(cidade),
+    }
+
+def _bairros(cidade):
+    nomes = [nome if nome != "Desconhecida" else "Desconhecido" for nome in cidade.categories]
+    return coluna_categorica(nomes, cidade.codes)
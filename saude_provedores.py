@@ -0,0 +1,127 @@
+import threading  # Módulo para proteger o estado de cada disjuntor entre as threads de consulta.
+import time  # Módulo para medir há quanto tempo o disjuntor está aberto.
+from collections import (
+    deque,  # Janela deslizante com os resultados mais recentes de cada provedor.
+)
+
+# --- Configurações do Disjuntor ---
+
+# Quantidade de consultas recentes consideradas no cálculo da taxa de erro e da latência.
+TAMANHO_JANELA = 20
+# Quantidade de latências recentes (consultas bem-sucedidas) usadas no cálculo dos percentis.
+# Maior que a janela de erros para que percentis altos como o p95 sejam estáveis.
+TAMANHO_JANELA_LATENCIA = 200
+# Mínimo de consultas na janela antes de a taxa de erro poder abrir o disjuntor.
+AMOSTRAS_MINIMAS = 5
+# Taxa de erro (0 a 1) na janela que abre o disjuntor.
+TAXA_ERRO_MAXIMA = 0.5
+# Falhas seguidas que abrem o disjuntor mesmo antes de a janela ter amostras suficientes.
+FALHAS_SEGUIDAS_MAXIMAS = 3
+# Respostas mais lentas que isto (em segundos) contam como falha.
+LATENCIA_MAXIMA = 8.0
+# Tempo (em segundos) que o disjuntor fica aberto antes de liberar uma consulta de teste.
+TEMPO_ABERTO = 30.0
+
+FECHADO = "fechado" # Provedor saudável: todas as consultas passam.
+ABERTO = "aberto" # Provedor fora da cadeia: nenhuma consulta passa até TEMPO_ABERTO.
+MEIO_ABERTO = "meio-aberto" # Uma única consulta de teste decide se o provedor volta ou não.
+
+# --- Disjuntor por Provedor ---
+
+# Disjuntor (circuit breaker) de um provedor: acompanha a taxa de erro e a latência das
+# consultas recentes e retira o provedor da cadeia quando ele começa a falhar, em vez de
+# pagar o timeout inteiro em cada IP. Depois de TEMPO_ABERTO, uma consulta de teste é liberada.
+class DisjuntorProvedor:
+    def __init__(self, nome):
+        self.nome = nome
+        self.estado = FECHADO
+        self.resultados = deque(maxlen=TAMANHO_JANELA) # (sucesso, latência em segundos)
+        self.latencias = deque(maxlen=TAMANHO_JANELA_LATENCIA) # latências das consultas bem-sucedidas
+        self.falhas_seguidas = 0
+        self.aberto_em = 0.0
+        self._teste_em_andamento = False
+        self._trava = threading.Lock()
+
+    # Indica se uma consulta pode ser enviada a este provedor agora.
+    def permitir(self):
+        with self._trava:
+            if self.estado == FECHADO:
+                return True
+            if self.estado == ABERTO:
+                if time.monotonic() - self.aberto_em < TEMPO_ABERTO:
+                    return False
+                self.estado = MEIO_ABERTO
+                self._teste_em_andamento = False
+            # Meio-aberto: libera só uma consulta de teste por vez.
+            if self._teste_em_andamento:
+                return False
+            self._teste_em_andamento = True
+            return True
+
+    # Registra o resultado de uma consulta e abre ou fecha o disjuntor conforme necessário.
+    def registrar(self, sucesso, latencia):
+        sucesso = sucesso and latencia <= LATENCIA_MAXIMA
+        with self._trava:
+            self.resultados.append((sucesso, latencia))
+            if sucesso:
+                self.latencias.append(latencia)
+            self.falhas_seguidas = 0 if sucesso else self.falhas_seguidas + 1
+            if self.estado == MEIO_ABERTO:
+                self._teste_em_andamento = False
+                if sucesso:
+                    print(f"Provedor {self.nome} voltou a responder; retornando à cadeia de consultas.")
+                    self.estado = FECHADO
+                    self.resultados.clear()
+                else:
+                    self._abrir()
+            elif self.estado == FECHADO and not sucesso:
+                if self.falhas_seguidas >= FALHAS_SEGUIDAS_MAXIMAS or (
+                    len(self.resultados) >= AMOSTRAS_MINIMAS and self._taxa_erro() >= TAXA_ERRO_MAXIMA
+                ):
+                    print(f"Provedor {self.nome} retirado da cadeia de consultas por falhas (taxa de erro {self._taxa_erro():.0%}).")
+                    self._abrir()
+
+    def _abrir(self):
+        self.estado = ABERTO
+        self.aberto_em = time.monotonic()
+
+    def _taxa_erro(self):
+        if not self.resultados:
+            return 0.0
+        return sum(1 for sucesso, _ in self.resultados if not sucesso) / len(self.resultados)
+
+    # Latência do percentil 'p' (0 a 100) entre as consultas bem-sucedidas recentes, ou None.
+    def percentil_latencia(self, p):
+        with self._trava:
+            latencias = sorted(self.latencias)
+        if not latencias:
+            return None
+        return latencias[min(len(latencias) - 1, int(len(latencias) * p / 100))]
+
+# --- Disjuntores Compartilhados ---
+
+_disjuntores = {}
+_trava_disjuntores = threading.Lock()
+
+def obter_disjuntor(provedor):
+    with _trava_disjuntores:
+        if provedor not in _disjuntores:
+            _disjuntores[provedor] = DisjuntorProvedor(provedor)
+        return _disjuntores[provedor]
+
+# Indica se o provedor está na cadeia de consultas (disjuntor fechado ou liberando um teste).
+def provedor_disponivel(provedor):
+    return obter_disjuntor(provedor).permitir()
+
+# Registra o resultado de uma consulta ao provedor. Falha = erro de conexão, timeout ou resposta inválida.
+def registrar_resultado(provedor, sucesso, latencia):
+    obter_disjuntor(provedor).registrar(sucesso, latencia)
+
+# Texto com o estado, a taxa de erro e a latência de cada provedor, para exibir ao final da execução.
+def resumo_saude():
+    linhas = []
+    for nome, disjuntor in sorted(_disjuntores.items()):
+        p95 = disjuntor.percentil_latencia(95)
+        latencia = f"{p95 * 1000:.0f} ms" if p95 is not None else "-"
+        linhas.append(f"Provedor {nome}: {disjuntor.estado}, taxa de erro recente {disjuntor._taxa_erro():.0%}, latência p95 {latencia}")
+    return "\n".join(linhas) if linhas else "Provedores: nenhuma consulta feita."
@@ -0,0 +1,139 @@
+import threading  # Módulo para proteger os contadores e o registro de sessões entre threads.
+import time  # Módulo para medir o tempo gasto em cada nova conexão (DNS + TCP + TLS).
+
+import requests  # Sessões HTTP com keep-alive e pool de conexões.
+from requests.adapters import (
+    HTTPAdapter,  # Adaptador que define o tamanho do pool de cada sessão.
+)
+from urllib3.connection import (  # Conexões instrumentadas abaixo.
+    HTTPConnection,
+    HTTPSConnection,
+)
+from urllib3.connectionpool import (  # Pools que usam essas conexões.
+    HTTPConnectionPool,
+    HTTPSConnectionPool,
+)
+
+# --- Configurações das Conexões ---
+
+# Tempo máximo para abrir a conexão (DNS + TCP + TLS) e tempo máximo de espera pela resposta.
+# Separados para que um servidor fora do ar falhe rápido sem cortar respostas lentas legítimas.
+TIMEOUT_CONEXAO = 3.05
+TIMEOUT_LEITURA = 10
+TIMEOUT_PADRAO = (TIMEOUT_CONEXAO, TIMEOUT_LEITURA)
+
+# Quantidade de conexões mantidas abertas (keep-alive) por provedor.
+# Deve acompanhar o número de threads do motor concorrente.
+TAMANHO_POOL = 16
+
+# --- Estatísticas de Reaproveitamento ---
+
+# Contadores de uma sessão: requisições enviadas, conexões abertas e tempo gasto abrindo conexões.
+class EstatisticasConexoes:
+    def __init__(self):
+        self.requisicoes = 0
+        self.conexoes_novas = 0
+        self.tempo_conexoes = 0.0
+        self._trava = threading.Lock()
+
+    def registrar_requisicao(self):
+        with self._trava:
+            self.requisicoes += 1
+
+    def registrar_conexao(self, duracao):
+        with self._trava:
+            self.conexoes_novas += 1
+            self.tempo_conexoes += duracao
+
+    # Requisições que aproveitaram uma conexão já aberta (sem DNS/TCP/TLS).
+    @property
+    def reaproveitadas(self):
+        return max(self.requisicoes - self.conexoes_novas, 0)
+
+    @property
+    def taxa_reaproveitamento(self):
+        return (self.reaproveitadas / self.requisicoes * 100) if self.requisicoes else 0.0
+
+    @property
+    def tempo_medio_conexao(self):
+        return (self.tempo_conexoes / self.conexoes_novas) if self.conexoes_novas else 0.0
+
+    # Estimativa do tempo economizado: cada requisição reaproveitada evitou uma conexão nova.
+    @property
+    def tempo_economizado(self):
+        return self.reaproveitadas * self.tempo_medio_conexao
+
+# Cria classes de conexão/pool do urllib3 que medem o tempo de cada 'connect()'.
+# Em HTTPS, 'connect()' inclui a resolução DNS, o handshake TCP e o handshake TLS.
+def _pools_instrumentados(estatisticas):
+    class ConexaoHTTP(HTTPConnection):
+        def connect(self):
+            inicio = time.perf_counter()
+            super().connect()
+            estatisticas.registrar_conexao(time.perf_counter() - inicio)
+
+    class ConexaoHTTPS(HTTPSConnection):
+        def connect(self):
+            inicio = time.perf_counter()
+            super().connect()
+            estatisticas.registrar_conexao(time.perf_counter() - inicio)
+
+    class PoolHTTP(HTTPConnectionPool):
+        ConnectionCls = ConexaoHTTP
+
+    class PoolHTTPS(HTTPSConnectionPool):
+        ConnectionCls = ConexaoHTTPS
+
+    return {"http": PoolHTTP, "https": PoolHTTPS}
+
+# Adaptador HTTP com pool de tamanho configurado e contagem de requisições e conexões.
+class AdaptadorInstrumentado(HTTPAdapter):
+    def __init__(self, estatisticas, **kwargs):
+        # Precisa existir antes do __init__ da classe base, que já cria o gerenciador de pools.
+        self.estatisticas = estatisticas
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = _pools_instrumentados(self.estatisticas)
+
+    def send(self, request, **kwargs):
+        self.estatisticas.registrar_requisicao()
+        return super().send(request, **kwargs)
+
+# --- Sessões por Provedor ---
+
+_sessoes = {}
+estatisticas = {}
+_trava_sessoes = threading.Lock()
+
+# Retorna a sessão HTTP compartilhada do provedor, criando-a na primeira chamada.
+# Todas as consultas a um mesmo provedor reaproveitam as conexões abertas (keep-alive),
+# pagando DNS, TCP e TLS apenas uma vez por conexão do pool.
+def obter_sessao(provedor):
+    with _trava_sessoes:
+        if provedor not in _sessoes:
+            estatisticas[provedor] = EstatisticasConexoes()
+            adaptador = AdaptadorInstrumentado(
+                estatisticas[provedor],
+                pool_connections=2,
+                pool_maxsize=TAMANHO_POOL,
+            )
+            sessao = requests.Session()
+            sessao.mount("http://", adaptador)
+            sessao.mount("https://", adaptador)
+            _sessoes[provedor] = sessao
+        return _sessoes[provedor]
+
+# Texto com o reaproveitamento de conexões de cada provedor, para exibir ao final da execução.
+def resumo_conexoes():
+    linhas = []
+    for provedor, estat in sorted(estatisticas.items()):
+        if not estat.requisicoes:
+            continue
+        linhas.append(
+            f"Conexões {provedor}: {estat.requisicoes} requisições, {estat.conexoes_novas} conexões novas, "
+            f"{estat.taxa_reaproveitamento:.1f}% reaproveitadas, handshake médio {estat.tempo_medio_conexao * 1000:.1f} ms, "
+            f"~{estat.tempo_economizado:.1f} s economizados"
+        )
+    return "\n".join(linhas) if linhas else "Conexões: nenhuma requisição HTTP feita."
@@ -0,0 +1,186 @@
+import argparse  # Opções da linha de comando (gravação, porta, usuário e senha).
+import json  # As sentenças gravadas ficam em JSON Lines, uma por linha.
+import socketserver  # Servidor TCP local, uma thread por conexão.
+import ssl  # Serviço api-ssl simulado, com o certificado informado.
+import threading  # Execução do simulador em segundo plano.
+
+from api_routeros import (  # Mesmo formato de sentença do cliente.
+    _separar_resposta,
+    codificar_sentenca,
+)
+from leitor_routeros import (
+    ler_registros,  # Monta uma gravação a partir de uma exportação em texto.
+)
+
+# --- Simulador da API do RouterOS ---
+
+# Lê uma gravação feita com 'api_routeros.py --gravar': lista de {"pedido": [...], "resposta": [...]},
+# onde 'pedido' são as palavras enviadas (comando, atributos e filtros) e 'resposta' a sentença recebida.
+def carregar_gravacao(caminho):
+    with open(caminho, "r", encoding="utf-8") as arquivo:
+        return [json.loads(linha) for linha in arquivo if linha.strip()]
+
+# Monta uma gravação de '/ip/firewall/address-list/print' a partir de uma exportação em texto
+# (ex.: portascan-list.txt), para usar o simulador sem ter gravado nada de um roteador real.
+def gravacao_da_exportacao(caminho):
+    gravacao = []
+    for indice, registro in enumerate(ler_registros(caminho)):
+        endereco = registro.host or (registro.endereco if registro.prefixo == 32 else f"{registro.endereco}/{registro.prefixo}")
+        palavras = ["!re", f"=.id=*{indice + 1:X}", f"=list={registro.lista}", f"=address={endereco}"]
+        if registro.data:
+            palavras.append(f"=creation-time={registro.data} {registro.hora}")
+        if registro.timeout:
+            palavras.append(f"=timeout={registro.timeout}")
+        palavras.append(f"=dynamic={'true' if 'D' in registro.flags else 'false'}")
+        palavras.append(f"=disabled={'true' if 'X' in registro.flags else 'false'}")
+        if registro.comentario:
+            palavras.append(f"=comment={registro.comentario}")
+        gravacao.append({"pedido": ["/ip/firewall/address-list/print"], "resposta": palavras})
+    return gravacao
+
+# Servidor que imita o serviço de API do RouterOS reproduzindo as sentenças gravadas.
+# - /login confere usuário e senha (login do RouterOS 6.43+).
+# - Qualquer outro pedido recebe as respostas '!re' gravadas para o mesmo pedido, com a tag nova. Se o
+#   pedido foi feito várias vezes na gravação, só a primeira vez é reproduzida. Sem um pedido igual,
+#   valem as respostas gravadas para o comando sozinho, com os filtros "?nome=valor" aplicados sobre
+#   os atributos, como o roteador faria.
+# - Comandos 'listen' não terminam sozinhos: depois das respostas gravadas, ficam abertos até um /cancel.
+# Com 'contexto_tls', cada conexão é envolvida em TLS, como o serviço api-ssl.
+class SimuladorRouterOS(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, gravacao, usuario="admin", senha="", endereco=("127.0.0.1", 0), contexto_tls=None):
+        self.respostas = {}
+        primeira_tag = {}
+        for item in gravacao:
+            resposta = item["resposta"]
+            if not resposta or resposta[0] != "!re":
+                continue
+            pedido = tuple(item["pedido"])
+            tag = next((palavra for palavra in resposta if palavra.startswith(".tag=")), None)
+            if primeira_tag.setdefault(pedido, tag) == tag:
+                self.respostas.setdefault(pedido, []).append(resposta)
+        self.usuario = usuario
+        self.senha = senha
+        self.contexto_tls = contexto_tls
+        super().__init__(endereco, _SessaoSimulada)
+
+    def get_request(self):
+        conexao, endereco = super().get_request()
+        if self.contexto_tls is not None:
+            conexao = self.contexto_tls.wrap_socket(conexao, server_side=True)
+        return conexao, endereco
+
+class _SessaoSimulada(socketserver.BaseRequestHandler):
+    def handle(self):
+        self._buffer = b""
+        escutando = set()
+        while True:
+            palavras = self._ler_sentenca()
+            if palavras is None:
+                return
+            comando = palavras[0]
+            _, campos = _separar_resposta(palavras)
+            tag = campos.get(".tag")
+            pedido = tuple(palavra for palavra in palavras if not palavra.startswith(".tag="))
+            consultas = dict(palavra[1:].split("=", 1) for palavra in palavras[1:] if palavra.startswith("?") and "=" in palavra)
+            if comando == "/login":
+                if campos.get("name") == self.server.usuario and campos.get("password") == self.server.senha:
+                    self._enviar(["!done"], tag)
+                else:
+                    self._enviar(["!trap", "=message=invalid user name or password (6)"], tag)
+                    self._enviar(["!done"], tag)
+            elif comando == "/cancel":
+                cancelada = campos.get("tag")
+                if cancelada in escutando:
+                    escutando.discard(cancelada)
+                    self._enviar(["!trap", "=category=2", "=message=interrupted"], cancelada)
+                    self._enviar(["!done"], cancelada)
+                self._enviar(["!done"], tag)
+            elif pedido in self.server.respostas or (comando,) in self.server.respostas or comando.endswith("/listen"):
+                if pedido in self.server.respostas:
+                    respostas = self.server.respostas[pedido]
+                else:
+                    respostas = [
+                        resposta for resposta in self.server.respostas.get((comando,), [])
+                        if all(_separar_resposta(resposta)[1].get(nome) == valor for nome, valor in consultas.items())
+                    ]
+                for resposta in respostas:
+                    self._enviar(resposta, tag)
+                if comando.endswith("/listen"):
+                    escutando.add(tag)
+                else:
+                    self._enviar(["!done"], tag)
+            elif comando.endswith("/print"):
+                self._enviar(["!done"], tag)
+            else:
+                self._enviar(["!trap", "=message=no such command"], tag)
+                self._enviar(["!done"], tag)
+
+    def _enviar(self, palavras, tag):
+        palavras = [palavra for palavra in palavras if not palavra.startswith(".tag=")]
+        if tag is not None:
+            palavras.append(f".tag={tag}")
+        self.request.sendall(codificar_sentenca(palavras))
+
+    def _receber(self, quantidade):
+        while len(self._buffer) < quantidade:
+            dados = self.request.recv(65536)
+            if not dados:
+                return None
+            self._buffer += dados
+        parte, self._buffer = self._buffer[:quantidade], self._buffer[quantidade:]
+        return parte
+
+    # Lê uma sentença do cliente (os tamanhos enviados pelo cliente cabem sempre em 1 ou 2 bytes
+    # nos comandos usados aqui, mas os cinco formatos são aceitos). Retorna None se a conexão fechar.
+    def _ler_sentenca(self):
+        palavras = []
+        while True:
+            inicio = self._receber(1)
+            if inicio is None:
+                return None
+            primeiro = inicio[0]
+            extras = 0 if primeiro < 0x80 else 1 if primeiro < 0xC0 else 2 if primeiro < 0xE0 else 3 if primeiro < 0xF0 else 4
+            resto = self._receber(extras) if extras else b""
+            if resto is None:
+                return None
+            mascara = (0x7F, 0x3F, 0x1F, 0x0F, 0x00)[extras]
+            tamanho = int.from_bytes(bytes([primeiro & mascara]) + resto, "big")
+            if tamanho == 0:
+                return palavras
+            palavra = self._receber(tamanho)
+            if palavra is None:
+                return None
+            palavras.append(palavra.decode("utf-8", errors="replace"))
+
+# Inicia o simulador em segundo plano e retorna o servidor (a porta fica em 'server_address[1]').
+def iniciar_simulador(gravacao, usuario="admin", senha="", porta=0, contexto_tls=None):
+    servidor = SimuladorRouterOS(gravacao, usuario, senha, ("127.0.0.1", porta), contexto_tls)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulador local da API do RouterOS, que reproduz sentenças gravadas.")
+    origem = parser.add_mutually_exclusive_group(required=True)
+    origem.add_argument("--gravacao", help="sentenças gravadas com 'api_routeros.py --gravar'")
+    origem.add_argument("--exportacao", help="exportação em texto (ex.: portascan-list.txt) servida como resposta do print")
+    parser.add_argument("--porta", type=int, default=8728, help="porta local (padrão: 8728)")
+    parser.add_argument("--usuario", default="admin")
+    parser.add_argument("--senha", default="")
+    parser.add_argument("--certificado", help="certificado PEM para simular o api-ssl")
+    parser.add_argument("--chave", help="chave privada PEM do certificado")
+    argumentos = parser.parse_args()
+
+    gravacao = carregar_gravacao(argumentos.gravacao) if argumentos.gravacao else gravacao_da_exportacao(argumentos.exportacao)
+    contexto = None
+    if argumentos.certificado:
+        contexto = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        contexto.load_cert_chain(argumentos.certificado, argumentos.chave)
+    servidor = SimuladorRouterOS(gravacao, argumentos.usuario, argumentos.senha, ("127.0.0.1", argumentos.porta), contexto)
+    print(f"Simulador da API do RouterOS em 127.0.0.1:{argumentos.porta} ({len(gravacao)} sentenças gravadas).")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
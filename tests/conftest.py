@@ -0,0 +1,5 @@
+import os  # Caminho da raiz do repositório.
+import sys  # Os módulos ficam na raiz do repositório, fora de um pacote.
+
+# Os testes importam os módulos da raiz (geolocalizacao, api_routeros...) como os scripts fazem.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,100 @@
+import os  # Rotação do arquivo de log acompanhado.
+import tempfile  # Diretório temporário do arquivo de log.
+import time  # Tempo até o acompanhamento terminar.
+import unittest  # Estrutura dos testes (executados também pelo pytest).
+from unittest import mock  # Substitui o motor de consultas, sem acesso à rede.
+
+import acompanhar_portascan  # Micro-lotes do acompanhamento ao vivo.
+from acompanhar_portascan import (  # Laço principal e micro-lotes.
+    ContadoresAoVivo,
+    ErroLeituraFonte,
+    _processar_lote,
+    acompanhar,
+    seguir_arquivo,
+)
+from leitor_routeros import RegistroEndereco  # Registro de cada entrada do lote.
+
+LINHA_LOG = (
+    "<134>Dec 30 21:50:21 192.168.88.1 firewall,info PORTASCAN input: in:ether1 out:(unknown 0), "
+    "src-mac 00:11:22:33:44:55, proto TCP (SYN), {ip}:54321->192.168.88.1:22, len 44"
+)
+RESULTADO = ("Cidade", "Estado", "País", "00000-000", "Provedor")
+
+def _registro(ip):
+    return RegistroEndereco(1, 0, "D", "PORTASCAN", ip, 32, None, "2024-12-30", "21:50:21", None, None)
+
+class TesteProcessarLote(unittest.TestCase):
+    # Com a janela de recentes com um só IP, contar o IP novo tira da janela o IP já conhecido, que
+    # aparece de novo no fim do lote: o resultado dele tem de vir do próprio lote.
+    def test_ip_tirado_da_janela_durante_o_lote(self):
+        contadores = ContadoresAoVivo(limite_ips=1)
+        conhecido = ("Cidade A", "Estado A", "País A", "00000-000", "Provedor A")
+        novo = ("Cidade B", "Estado B", "País B", "00000-000", "Provedor B")
+        contadores.contar("11.0.0.1", conhecido, 0.0)
+        lote = [(_registro(ip), 0.0) for ip in ("11.0.0.1", "11.0.0.2", "11.0.0.1")]
+        contados = []
+        with mock.patch.object(acompanhar_portascan, "consultar_em_paralelo", return_value={"11.0.0.2": novo}) as consulta:
+            _processar_lote(lote, contadores, lambda registro, resultado, foi_novo: contados.append((registro.endereco, resultado, foi_novo)), True, True)
+        consulta.assert_called_once_with(["11.0.0.2"], usar_lote_api3=True, usar_hedge=True)
+        self.assertEqual(contados, [
+            ("11.0.0.1", conhecido, False),
+            ("11.0.0.2", novo, True),
+            ("11.0.0.1", conhecido, True),
+        ])
+        self.assertEqual(contadores.paises["País A"], 2)
+
+class TesteFonte(unittest.TestCase):
+    def _acompanhar(self, fonte):
+        contados = []
+        with mock.patch.object(acompanhar_portascan, "consultar_em_paralelo", side_effect=lambda ips, **_: dict.fromkeys(ips, RESULTADO)):
+            try:
+                return acompanhar(fonte, espera_lote=0.05, intervalo_resumo=60, duracao=5,
+                                  ao_contar=lambda registro, resultado, novo: contados.append(registro.endereco))
+            finally:
+                self.contados = contados
+
+    # Uma falha na leitura chega ao laço principal, que processa o lote pendente e para com o erro,
+    # em vez de esperar até o fim da duração por linhas que não vêm mais.
+    def test_erro_na_leitura_encerra_o_acompanhamento(self):
+        def fonte():
+            yield LINHA_LOG.format(ip="11.0.0.1")
+            raise OSError("arquivo inacessível")
+        inicio = time.monotonic()
+        with self.assertRaises(ErroLeituraFonte) as contexto:
+            self._acompanhar(fonte())
+        self.assertLess(time.monotonic() - inicio, 2)
+        self.assertIn("arquivo inacessível", str(contexto.exception))
+        self.assertEqual(self.contados, ["11.0.0.1"])
+
+    def test_fim_da_fonte_encerra_o_acompanhamento(self):
+        inicio = time.monotonic()
+        contadores = self._acompanhar([LINHA_LOG.format(ip="11.0.0.1"), "linha sem o marcador", LINHA_LOG.format(ip="11.0.0.2")])
+        self.assertLess(time.monotonic() - inicio, 2)
+        self.assertEqual(self.contados, ["11.0.0.1", "11.0.0.2"])
+        self.assertEqual(contadores.paises["País"], 2)
+
+class TesteSeguirArquivo(unittest.TestCase):
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.diretorio.name, "mikrotik.log")
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def _acrescentar(self, texto, modo="a"):
+        with open(self.caminho, modo, encoding="utf-8") as arquivo:
+            arquivo.write(texto)
+
+    # Depois de uma rotação ou de um truncamento, o arquivo novo é lido desde o começo.
+    def test_rotacao_e_truncamento(self):
+        self._acrescentar("antiga\n", "w")
+        linhas = seguir_arquivo(self.caminho, do_inicio=True, intervalo=0.01)
+        self.assertEqual(next(linhas), "antiga\n")
+        self._acrescentar("nova\n")
+        self.assertEqual(next(linhas), "nova\n")
+        os.rename(self.caminho, self.caminho + ".1")
+        self._acrescentar("rotacionado\n", "w")
+        self.assertEqual(next(linhas), "rotacionado\n")
+        self._acrescentar("x\n", "w")
+        self.assertEqual(next(linhas), "x\n")
+        linhas.close()
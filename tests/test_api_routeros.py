@@ -0,0 +1,88 @@
+import os  # Caminho da exportação de exemplo do repositório.
+import unittest  # Estrutura dos testes (executados também pelo pytest).
+
+from api_routeros import (  # Cliente testado.
+    MENU_ENDERECOS,
+    ClienteRouterOS,
+    ErroRouterOS,
+    ler_enderecos,
+    seguir_enderecos,
+)
+from leitor_routeros import (
+    ler_registros,  # Leitura da mesma exportação em texto, para comparação.
+)
+from simulador_routeros import (  # Roteador simulado local.
+    gravacao_da_exportacao,
+    iniciar_simulador,
+)
+
+EXPORTACAO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "portascan-list.txt")
+
+# O simulador serve a exportação do repositório como resposta do print. O 'listen' gravado informa
+# a remoção da primeira entrada e a criação de uma entrada nova, e depois fica aberto até um /cancel.
+class TesteApiRouterOS(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.registros = list(ler_registros(EXPORTACAO))
+        gravacao = gravacao_da_exportacao(EXPORTACAO)
+        gravacao.append({"pedido": [f"{MENU_ENDERECOS}/listen"], "resposta": ["!re", "=.id=*1", "=.dead=yes"]})
+        gravacao.append({"pedido": [f"{MENU_ENDERECOS}/listen"], "resposta": [
+            "!re", "=.id=*FFFF", "=list=PORTASCAN", "=address=11.0.0.1", "=creation-time=2024-12-31 10:00:00",
+            "=timeout=1d", "=dynamic=true", "=disabled=false",
+        ]})
+        cls.servidor = iniciar_simulador(gravacao, "admin", "segredo")
+        cls.porta = cls.servidor.server_address[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+
+    def _cliente(self, senha="segredo"):
+        return ClienteRouterOS("127.0.0.1", "admin", senha, porta=self.porta, timeout=5)
+
+    def test_senha_errada_gera_erro(self):
+        cliente = self._cliente("errada")
+        try:
+            with self.assertRaises(ErroRouterOS):
+                cliente.conectar()
+        finally:
+            cliente.fechar()
+
+    # A API e a exportação em texto geram os mesmos registros; só a coluna 'linha' muda, porque na
+    # API ela é a posição da entrada e no arquivo é o número da linha.
+    def test_ler_enderecos_igual_a_exportacao_em_texto(self):
+        ignorados = []
+        with self._cliente() as cliente:
+            recebidos = list(ler_enderecos(cliente, ao_ignorar=lambda numero, atributos: ignorados.append(numero)))
+        self.assertEqual(ignorados, [])
+        self.assertEqual(len(recebidos), len(self.registros))
+        for recebido, esperado in zip(recebidos, self.registros):
+            self.assertEqual(recebido._replace(linha=None), esperado._replace(linha=None))
+
+    def test_filtro_de_listas_feito_no_roteador(self):
+        listas = {"PORTASCAN", "bogons"}
+        with self._cliente() as cliente:
+            recebidos = list(ler_enderecos(cliente, listas))
+        esperados = [registro for registro in self.registros if registro.lista in listas]
+        self.assertTrue(esperados)
+        # Cada lista é pedida separadamente, em ordem alfabética.
+        esperados.sort(key=lambda registro: sorted(listas).index(registro.lista))
+        self.assertEqual(
+            [(registro.lista, registro.endereco, registro.prefixo, registro.host) for registro in recebidos],
+            [(registro.lista, registro.endereco, registro.prefixo, registro.host) for registro in esperados],
+        )
+
+    # Fechar o acompanhamento cancela o 'listen' no roteador e deixa a conexão pronta para outro comando.
+    def test_fechar_acompanhamento_cancela_o_listen(self):
+        with self._cliente() as cliente:
+            eventos = seguir_enderecos(cliente)
+            existentes = [next(eventos) for _ in self.registros]
+            self.assertTrue(all(evento == "existente" for evento, _ in existentes))
+            evento, registro = next(eventos)
+            self.assertEqual((evento, registro), ("removida", existentes[0][1]))
+            evento, registro = next(eventos)
+            self.assertEqual((evento, registro.lista, registro.endereco, registro.timeout), ("adicionada", "PORTASCAN", "11.0.0.1", "1d"))
+            eventos.close()
+            cliente.definir_timeout(5)
+            self.assertEqual(len(list(ler_enderecos(cliente, ["bogons"]))), sum(r.lista == "bogons" for r in self.registros))
@@ -0,0 +1,119 @@
+import os  # Arquivos de cache temporários.
+import sqlite3  # Cache no formato antigo e ajuste do momento das consultas.
+import tempfile  # Diretório temporário de cada teste.
+import time  # Momento das consultas gravadas.
+import unittest  # Estrutura dos testes (executados também pelo pytest).
+
+import geolocalizacao  # Motor de consultas com o cache ativo.
+import saude_provedores  # Disjuntores zerados entre os testes.
+from benchmark_geolocalizacao import (  # Provedor HTTP local.
+    ProvedorSimulado,
+    iniciar_provedor_simulado,
+)
+from cache_geolocalizacao import CacheGeolocalizacao  # Cache testado.
+
+
+# Provedor simulado que responde às consultas individuais conforme o fim do IP: "9" sem localização,
+# "8" localizado sem provedor, "7" com HTTP 500 e os demais com o resultado completo. Cada IP
+# consultado fica em 'consultas' no servidor.
+class ProvedorIncompleto(ProvedorSimulado):
+    def do_GET(self):
+        self._contar()
+        ip = self.path.split("?")[0].rsplit("/", 1)[-1]
+        with self._trava:
+            self.server.consultas.append(ip)
+        if ip.endswith("7"):
+            self._responder(500, {"message": "erro interno"})
+        elif ip.endswith("9"):
+            self._responder(200, {"ip": ip})
+        elif ip.endswith("8"):
+            self._responder(200, {"ip": ip, "city": "Cidade", "region": "Estado", "country": "País", "zip": "00000-000"})
+        else:
+            self._responder(200, {
+                "ip": ip, "city": "Cidade", "region": "Estado", "country": "País", "zip": "00000-000", "isp": "Provedor",
+            })
+
+class TesteCacheNoMotor(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.servidor = iniciar_provedor_simulado(0, ProvedorIncompleto)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.servidor.consultas = []
+        saude_provedores._disjuntores.clear()
+        geolocalizacao.configurar_cache(os.path.join(self.diretorio.name, "cache.sqlite3"))
+
+    def tearDown(self):
+        geolocalizacao.cache.fechar()
+        geolocalizacao.cache = None
+        self.diretorio.cleanup()
+
+    # Os IPs não localizados e os localizados sem provedor também são acertos na execução seguinte.
+    def test_nova_execucao_nao_volta_as_apis(self):
+        ips = ["11.0.3.1", "11.0.3.8", "11.0.3.9"]
+        primeira = geolocalizacao.consultar_em_paralelo(ips, max_threads=2)
+        self.assertEqual(primeira["11.0.3.9"], geolocalizacao.RESULTADO_DESCONHECIDO)
+        self.assertEqual(primeira["11.0.3.8"][2:], ("País", "00000-000", "Desconhecido"))
+        consultas = len(self.servidor.consultas)
+        segunda = geolocalizacao.consultar_em_paralelo(ips, max_threads=2)
+        self.assertEqual(len(self.servidor.consultas), consultas)
+        self.assertEqual(segunda, primeira)
+
+    # Sem nenhuma resposta válida das APIs, o IP não é gravado como não localizado.
+    def test_falha_das_apis_nao_grava_resultado_negativo(self):
+        geolocalizacao.consultar_em_paralelo(["11.0.3.7"], max_threads=1)
+        self.assertEqual(self.servidor.consultas, ["11.0.3.7"] * 3)
+        self.assertIsNone(geolocalizacao.cache.obter("11.0.3.7"))
+
+class TesteValidade(unittest.TestCase):
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.diretorio.name, "cache.sqlite3")
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def _envelhecer(self, cache, ip, segundos):
+        with cache._trava:
+            cache._conexao.execute("UPDATE geolocalizacao SET consultado_em = consultado_em - ? WHERE ip = ?", (segundos, ip))
+            cache._conexao.commit()
+
+    def test_validade_pelo_tipo_de_resultado(self):
+        cache = CacheGeolocalizacao(self.caminho, ttl=1000, ttl_negativo=10, ttl_sem_provedor=100)
+        cache.gravar("11.0.0.1", ("Cidade", "Estado", "País", "0", "Provedor"))
+        cache.gravar("11.0.0.2", ("Cidade", "Estado", "País", "0", "Desconhecido"))
+        cache.gravar("11.0.0.3", geolocalizacao.RESULTADO_DESCONHECIDO)
+        cache.gravar("11.0.0.4", ("Cidade", "Estado", "País", "0", "Desconhecido"), validade=1000)
+        for ip in ("11.0.0.1", "11.0.0.2", "11.0.0.3", "11.0.0.4"):
+            self._envelhecer(cache, ip, 50)
+        self.assertIsNotNone(cache.obter("11.0.0.1"))
+        self.assertIsNotNone(cache.obter("11.0.0.2"))
+        self.assertIsNone(cache.obter("11.0.0.3"))
+        self.assertIsNotNone(cache.obter("11.0.0.4"))
+        for ip in ("11.0.0.1", "11.0.0.2", "11.0.0.4"):
+            self._envelhecer(cache, ip, 100)
+        self.assertIsNotNone(cache.obter("11.0.0.1"))
+        self.assertIsNone(cache.obter("11.0.0.2"))
+        self.assertIsNotNone(cache.obter("11.0.0.4"))
+        cache.fechar()
+
+    # Um cache criado antes da coluna 'validade' continua válido e passa a usar a validade pelo resultado.
+    def test_cache_sem_a_coluna_validade(self):
+        conexao = sqlite3.connect(self.caminho)
+        conexao.execute(
+            "CREATE TABLE geolocalizacao (ip TEXT PRIMARY KEY, cidade TEXT, estado TEXT, pais TEXT, cep TEXT, provedor TEXT, consultado_em REAL)"
+        )
+        conexao.execute("INSERT INTO geolocalizacao VALUES ('11.0.0.1', 'Cidade', 'Estado', 'País', '0', 'Provedor', ?)", (time.time(),))
+        conexao.commit()
+        conexao.close()
+        cache = CacheGeolocalizacao(self.caminho)
+        self.assertEqual(cache.obter("11.0.0.1"), ("Cidade", "Estado", "País", "0", "Provedor"))
+        self.assertEqual(cache.gravar_varios({"11.0.0.2": geolocalizacao.RESULTADO_DESCONHECIDO}), 1)
+        self.assertEqual(cache.obter("11.0.0.2"), geolocalizacao.RESULTADO_DESCONHECIDO)
+        cache.fechar()
@@ -0,0 +1,38 @@
+import os  # Diário temporário.
+import tempfile  # Diretório temporário de cada teste.
+import unittest  # Estrutura dos testes (executados também pelo pytest).
+
+from diario_consultas import DiarioConsultas  # Diário testado.
+
+RESULTADO = ("Cidade", "Estado", "País", "00000-000", "Provedor")
+
+class TesteDiario(unittest.TestCase):
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.diario = DiarioConsultas(os.path.join(self.diretorio.name, "diario.jsonl"))
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    # O 10G.py só aceita começar do zero, sem '--resume', quando o diário não tem resultados.
+    def test_tem_resultados(self):
+        self.assertFalse(self.diario.tem_resultados())
+        with self.diario.abrir():
+            self.assertFalse(self.diario.tem_resultados())
+            self.diario.registrar("11.0.0.1", RESULTADO)
+        self.assertTrue(self.diario.tem_resultados())
+
+    def test_continuar_mantem_os_resultados(self):
+        with self.diario.abrir():
+            self.diario.registrar("11.0.0.1", RESULTADO)
+        with self.diario.abrir(continuar=True):
+            self.diario.registrar("11.0.0.2", RESULTADO)
+        self.assertEqual(self.diario.carregar(), {"11.0.0.1": RESULTADO, "11.0.0.2": RESULTADO})
+
+    # Sem 'continuar', o diário de uma execução anterior é descartado ao abrir.
+    def test_abrir_sem_continuar_descarta_o_diario(self):
+        with self.diario.abrir():
+            self.diario.registrar("11.0.0.1", RESULTADO)
+        with self.diario:
+            self.assertFalse(self.diario.tem_resultados())
+        self.assertEqual(self.diario.carregar(), {})
@@ -0,0 +1,59 @@
+import unittest  # Estrutura dos testes (executados também pelo pytest).
+
+import geolocalizacao  # Cadeia de provedores com requisições de reforço.
+import limitador_taxa  # Limite de taxa apertado para formar fila.
+import saude_provedores  # Disjuntores (e latências) zerados entre os testes.
+from benchmark_geolocalizacao import (  # Provedor HTTP local.
+    ProvedorSimulado,
+    iniciar_provedor_simulado,
+)
+
+
+class TesteHedge(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.servidor = iniciar_provedor_simulado(0.02)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+
+    def setUp(self):
+        self.originais = (
+            geolocalizacao.ATRASO_HEDGE_PADRAO, geolocalizacao.FRACAO_HEDGE, geolocalizacao._fichas_hedge,
+            dict(limitador_taxa.LIMITES_TAXA), ProvedorSimulado.latencia,
+        )
+        saude_provedores._disjuntores.clear()
+        limitador_taxa._baldes.clear()
+        geolocalizacao.cache = None
+        geolocalizacao.ATRASO_HEDGE_PADRAO = 0.1
+        ProvedorSimulado.requisicoes = 0
+
+    def tearDown(self):
+        (
+            geolocalizacao.ATRASO_HEDGE_PADRAO, geolocalizacao.FRACAO_HEDGE, geolocalizacao._fichas_hedge,
+            limites, ProvedorSimulado.latencia,
+        ) = self.originais
+        limitador_taxa.LIMITES_TAXA.clear()
+        limitador_taxa.LIMITES_TAXA.update(limites)
+        limitador_taxa._baldes.clear()
+
+    # Com 10 requisições por segundo, as consultas esperam até 0,4 s pela ficha da API 1, mais que o
+    # atraso de reforço (0,1 s). A espera na fila não é demora do provedor: nenhum reforço é disparado.
+    def test_fila_do_limite_de_taxa_nao_dispara_reforco(self):
+        limitador_taxa.LIMITES_TAXA["api1"] = (10.0, 1)
+        ips = [f"11.0.4.{n}" for n in range(1, 6)]
+        resultados = geolocalizacao.consultar_em_paralelo(ips, max_threads=5, usar_hedge=True)
+        self.assertTrue(all(resultado[2] == "País Simulado" for resultado in resultados.values()))
+        self.assertEqual(ProvedorSimulado.requisicoes, len(ips))
+
+    # Todas as respostas demoram mais que o atraso de reforço, mas só há fichas para dois reforços.
+    def test_reforcos_limitados_pelo_orcamento(self):
+        ProvedorSimulado.latencia = 0.3
+        geolocalizacao.FRACAO_HEDGE = 0.0
+        geolocalizacao._fichas_hedge = 2.0
+        ips = [f"11.0.5.{n}" for n in range(1, 5)]
+        resultados = geolocalizacao.consultar_em_paralelo(ips, max_threads=4, usar_hedge=True)
+        self.assertTrue(all(resultado[2] == "País Simulado" for resultado in resultados.values()))
+        self.assertEqual(ProvedorSimulado.requisicoes, len(ips) + 2)
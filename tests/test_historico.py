@@ -0,0 +1,37 @@
+import os  # Banco do histórico temporário.
+import tempfile  # Diretório temporário de cada teste.
+import unittest  # Estrutura dos testes (executados também pelo pytest).
+
+from historico import HistoricoPortascan  # Histórico testado.
+
+
+def _entrada(ip, pais):
+    return (ip, None, None, None, None, "Cidade", "Estado", pais, "00000-000", "Provedor")
+
+class TesteTendencia(unittest.TestCase):
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.historico = HistoricoPortascan(os.path.join(self.diretorio.name, "historico.sqlite3"))
+
+    def tearDown(self):
+        self.historico.fechar()
+        self.diretorio.cleanup()
+
+    # A semana de segunda-feira 2024-12-30 a domingo 2025-01-05 atravessa a virada do ano e continua
+    # sendo uma só; a segunda-feira seguinte começa outra semana.
+    def test_semana_na_virada_do_ano(self):
+        self.historico.acrescentar("2024-12-30", [_entrada("11.0.0.1", "China"), _entrada("11.0.0.2", "China")])
+        self.historico.acrescentar("2025-01-02", [_entrada("11.0.0.1", "China"), _entrada("11.0.0.3", "China")])
+        self.historico.acrescentar("2025-01-05 23:59:59", [_entrada("11.0.0.4", "China")])
+        self.historico.acrescentar("2025-01-06", [_entrada("11.0.0.1", "China")])
+        tendencia = self.historico.tendencia(periodo="semana")
+        self.assertEqual(
+            tendencia[["periodo", "pais", "ips", "entradas"]].values.tolist(),
+            [["2024-12-30", "China", 4, 5], ["2025-01-06", "China", 1, 1]],
+        )
+
+    def test_mes_e_dia(self):
+        self.historico.acrescentar("2024-12-30", [_entrada("11.0.0.1", "China")])
+        self.historico.acrescentar("2025-01-02", [_entrada("11.0.0.1", "China")])
+        self.assertEqual(self.historico.tendencia(periodo="mes")["periodo"].tolist(), ["2024-12", "2025-01"])
+        self.assertEqual(self.historico.tendencia(periodo="dia")["periodo"].tolist(), ["2024-12-30", "2025-01-02"])
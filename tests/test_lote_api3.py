@@ -0,0 +1,113 @@
+import json  # Corpo dos lotes recebidos pelo provedor simulado.
+import unittest  # Estrutura dos testes (executados também pelo pytest).
+
+import geolocalizacao  # Consulta em lote do ip-api.com e motor concorrente.
+import saude_provedores  # Disjuntores zerados entre os testes.
+from benchmark_geolocalizacao import (  # Provedor HTTP local.
+    ProvedorSimulado,
+    iniciar_provedor_simulado,
+)
+
+
+# Provedor simulado que devolve o próprio IP em cada resposta, para conferir que cada resultado
+# foi associado ao IP certo. O lote responde em ordem inversa à do pedido (o cliente deve usar o
+# campo 'query', não a posição) e, como no ProvedorSimulado, IPs terminados em 0 voltam com
+# "status": "fail". As consultas individuais são marcadas com "Individual" na cidade. Os lotes e
+# os IPs consultados individualmente ficam no servidor ('lotes' e 'individuais').
+class ProvedorEco(ProvedorSimulado):
+    def do_GET(self):
+        self._contar()
+        ip = self.path.split("?")[0].rsplit("/", 1)[-1]
+        with self._trava:
+            self.server.individuais.append(ip)
+        self._responder(200, {
+            "ip": ip,
+            "city": f"Individual {ip}",
+            "region": "Estado Simulado",
+            "region_name": "Estado Simulado",
+            "regionName": "Estado Simulado",
+            "country": "País Simulado",
+            "country_name": "País Simulado",
+            "zip": "00000-000",
+            "isp": "Provedor Simulado",
+        })
+
+    def do_POST(self):
+        self._contar()
+        ips = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self._trava:
+            self.server.lotes.append(ips)
+        if len(ips) > 100:
+            self._responder(422, {"message": "too many queries"})
+            return
+        itens = []
+        for ip in reversed(ips):
+            if ip.endswith("0"):
+                itens.append({"status": "fail", "message": "invalid query", "query": ip})
+            else:
+                itens.append({
+                    "status": "success",
+                    "query": ip,
+                    "city": f"Lote {ip}",
+                    "regionName": "Estado Simulado",
+                    "country": "País Simulado",
+                    "zip": "00000-000",
+                    "isp": "Provedor Simulado",
+                })
+        self._responder(200, itens)
+
+class TesteLoteApi3(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.servidor = iniciar_provedor_simulado(0, ProvedorEco)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+
+    def setUp(self):
+        self.servidor.lotes = []
+        self.servidor.individuais = []
+        saude_provedores._disjuntores.clear()
+        geolocalizacao.cache = None
+
+    def test_resultados_associados_pelo_campo_query(self):
+        ips = ["11.0.0.1", "11.0.0.2", "11.0.0.3", "11.0.0.10", "11.0.0.5"]
+        resultados = geolocalizacao.consultar_lote_api3(ips)
+        self.assertEqual(set(resultados), {"11.0.0.1", "11.0.0.2", "11.0.0.3", "11.0.0.5"})
+        for ip, resultado in resultados.items():
+            self.assertEqual(resultado, (f"Lote {ip}", "Estado Simulado", "País Simulado", "00000-000", "Provedor Simulado"))
+        self.assertEqual(self.servidor.lotes, [ips])
+
+    def test_lote_recusado_nao_localiza_nenhum_ip(self):
+        ips = [f"11.0.1.{n}" for n in range(1, 102)]
+        self.assertEqual(geolocalizacao.consultar_lote_api3(ips), {})
+
+    def test_motor_divide_em_lotes_de_100_e_consulta_falhas_individualmente(self):
+        ips = [f"11.0.{n >> 8}.{n & 255}" for n in range(1, 251)]
+        resultados = geolocalizacao.consultar_em_paralelo(ips, max_threads=8, usar_lote_api3=True)
+
+        self.assertEqual(sorted(len(lote) for lote in self.servidor.lotes), [50, 100, 100])
+        self.assertEqual(sorted(ip for lote in self.servidor.lotes for ip in lote), sorted(ips))
+        falhas = [ip for ip in ips if ip.endswith("0")]
+        self.assertEqual(sorted(self.servidor.individuais), sorted(falhas))
+        self.assertEqual(set(resultados), set(ips))
+        for ip in ips:
+            origem = "Individual" if ip in falhas else "Lote"
+            self.assertEqual(resultados[ip][0], f"{origem} {ip}")
+            self.assertEqual(resultados[ip][2], "País Simulado")
+
+    def test_lote_recusado_cai_para_a_consulta_individual(self):
+        ips = [f"11.0.2.{n}" for n in range(1, 102)]
+        original = geolocalizacao.TAMANHO_LOTE_API3
+        # Com lotes de 101 IPs, o provedor recusa o lote inteiro com HTTP 422.
+        geolocalizacao.TAMANHO_LOTE_API3 = 101
+        try:
+            resultados = geolocalizacao.consultar_em_paralelo(ips, max_threads=4, usar_lote_api3=True)
+        finally:
+            geolocalizacao.TAMANHO_LOTE_API3 = original
+        self.assertEqual([len(lote) for lote in self.servidor.lotes], [101])
+        self.assertEqual(sorted(self.servidor.individuais), sorted(ips))
+        for ip in ips:
+            self.assertEqual(resultados[ip][0], f"Individual {ip}")
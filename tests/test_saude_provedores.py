@@ -0,0 +1,42 @@
+import unittest  # Estrutura dos testes (executados também pelo pytest).
+
+import geolocalizacao  # Consulta ao ipstack, que verifica o corpo das respostas 200.
+import saude_provedores  # Disjuntor do provedor no estado meio-aberto.
+from benchmark_geolocalizacao import (  # Provedor HTTP local.
+    ProvedorSimulado,
+    iniciar_provedor_simulado,
+)
+
+
+# Provedor simulado que responde 200 com um corpo que não é JSON (ex.: página de erro de um proxy).
+class ProvedorSemJson(ProvedorSimulado):
+    def do_GET(self):
+        corpo = b"<html>erro</html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+class TesteDisjuntorMeioAberto(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.servidor = iniciar_provedor_simulado(0, ProvedorSemJson)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+
+    def setUp(self):
+        saude_provedores._disjuntores.clear()
+
+    # A consulta de teste com um corpo inválido conta como falha e reabre o disjuntor, em vez de
+    # deixar o teste "em andamento" para sempre.
+    def test_resposta_invalida_no_teste_reabre_o_disjuntor(self):
+        disjuntor = saude_provedores.obter_disjuntor("api2")
+        disjuntor.estado = saude_provedores.MEIO_ABERTO
+        self.assertTrue(saude_provedores.provedor_disponivel("api2"))
+        self.assertEqual(geolocalizacao.consultar_geolocalizacao_api2("11.0.6.1"), geolocalizacao.RESULTADO_DESCONHECIDO)
+        self.assertEqual(disjuntor.estado, saude_provedores.ABERTO)
+        self.assertFalse(disjuntor._teste_em_andamento)